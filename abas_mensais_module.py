@@ -0,0 +1,112 @@
+# abas_mensais_module.py - Movimentações em uma aba por mês de emissão
+# Com a aba única 'Movimentacoes', toda leitura baixa o histórico inteiro e
+# toda reescrita o envia de novo. No layout mensal cada mês fica na sua aba
+# ('Mov_2026_10'; linhas sem data em 'Mov_sem_data') e a aba 'Manifesto'
+# lista as abas com o número de linhas e a primeira e a última data de cada
+# uma. A gravação só mexe nos meses que receberam linhas e a leitura só abre
+# os meses do período pedido. Enquanto a aba única existir (migração ainda
+# não feita), os meses que não estão no manifesto continuam vindo dela.
+
+import pandas as pd
+
+from envio_planilha_module import chamar_api
+from leitura_planilha_module import ler_abas
+
+ABA_UNICA = 'Movimentacoes'
+ABA_MANIFESTO = 'Manifesto'
+ABA_SEM_DATA = 'Mov_sem_data'
+COLUNAS_MANIFESTO = ['Aba', 'Linhas', 'Primeira Data', 'Ultima Data']
+TIPOS_MANIFESTO = {'Aba': 'auto', 'Linhas': 'numero', 'Primeira Data': 'data', 'Ultima Data': 'data'}
+
+
+def aba_do_mes(ano, mes):
+    return f"Mov_{ano}_{mes:02d}"
+
+
+def mes_da_aba(aba):
+    """(ano, mês) de uma aba mensal; None para a aba sem data ou um nome fora do padrão."""
+    partes = aba.split('_')
+    if len(partes) != 3 or partes[0] != 'Mov' or not (partes[1].isdigit() and partes[2].isdigit()):
+        return None
+    return int(partes[1]), int(partes[2])
+
+
+def abas_das_linhas(datas_emissao):
+    """Aba mensal de cada linha, a partir da 'Data Emissão' (datas ou texto dd/mm/aaaa)."""
+    datas = datas_emissao
+    if not pd.api.types.is_datetime64_any_dtype(datas):
+        datas = pd.to_datetime(datas.astype(object), format='%d/%m/%Y', errors='coerce')
+    return ('Mov_' + datas.dt.strftime('%Y_%m')).fillna(ABA_SEM_DATA)
+
+
+def linha_manifesto(aba, df_aba):
+    """Entrada do manifesto para o conteúdo de uma aba mensal."""
+    datas = df_aba['Data Emissão'] if 'Data Emissão' in df_aba.columns else pd.Series(dtype=object)
+    if not pd.api.types.is_datetime64_any_dtype(datas):
+        datas = pd.to_datetime(datas.astype(object), format='%d/%m/%Y', errors='coerce')
+    return {'Aba': aba, 'Linhas': len(df_aba), 'Primeira Data': datas.min(), 'Ultima Data': datas.max()}
+
+
+def ler_manifesto(spreadsheet):
+    """Manifesto da planilha (vazio se ela ainda não foi migrada para o layout mensal)."""
+    manifesto = ler_abas(spreadsheet, {ABA_MANIFESTO: COLUNAS_MANIFESTO}, TIPOS_MANIFESTO)[ABA_MANIFESTO]
+    if manifesto.empty:
+        return pd.DataFrame(columns=COLUNAS_MANIFESTO)
+    manifesto['Aba'] = manifesto['Aba'].astype(str)
+    return manifesto
+
+
+def periodo_do_manifesto(manifesto):
+    """(primeira, última) data de emissão registradas no manifesto, ou (None, None)."""
+    if manifesto.empty:
+        return None, None
+    primeira, ultima = manifesto['Primeira Data'].min(), manifesto['Ultima Data'].max()
+    return (None if pd.isnull(primeira) else primeira), (None if pd.isnull(ultima) else ultima)
+
+
+def abas_do_periodo(manifesto, data_inicial=None, data_final=None):
+    """
+    Abas do manifesto cujo mês cruza o período. Sem período, todas; com
+    período, a aba sem data fica de fora (o filtro de data a descartaria).
+    """
+    if data_inicial is None or data_final is None:
+        return list(manifesto['Aba'])
+    inicio = (pd.Timestamp(data_inicial).year, pd.Timestamp(data_inicial).month)
+    fim = (pd.Timestamp(data_final).year, pd.Timestamp(data_final).month)
+    abas = []
+    for aba in manifesto['Aba']:
+        mes = mes_da_aba(aba)
+        if mes is not None and inicio <= mes <= fim:
+            abas.append(aba)
+    return abas
+
+
+def ler_movimentacoes_periodo(spreadsheet, data_inicial=None, data_final=None, colunas=None, manifesto=None):
+    """
+    Movimentações dos meses que cruzam o período (todas sem período), lidas
+    das abas mensais em paralelo. Linhas da aba única cujo mês ainda não
+    está no manifesto também entram, já filtradas pelo período. 'colunas'
+    projeta a leitura como em ler_abas.
+    """
+    if manifesto is None:
+        manifesto = ler_manifesto(spreadsheet)
+    abas = abas_do_periodo(manifesto, data_inicial, data_final)
+    pedidos = {aba: colunas for aba in abas}
+    existentes = {aba.title for aba in chamar_api(spreadsheet.worksheets)}
+    if ABA_UNICA in existentes:
+        pedidos[ABA_UNICA] = None if colunas is None else list(dict.fromkeys(list(colunas) + ['Data Emissão']))
+    tabelas = ler_abas(spreadsheet, pedidos)
+
+    partes = [tabelas[aba] for aba in abas if not tabelas[aba].empty]
+    legado = tabelas.get(ABA_UNICA)
+    if legado is not None and not legado.empty:
+        legado = legado[~abas_das_linhas(legado['Data Emissão']).isin(set(manifesto['Aba'])).to_numpy()]
+        if data_inicial is not None and data_final is not None:
+            datas = legado['Data Emissão'].dt.normalize()
+            legado = legado[datas.between(pd.Timestamp(data_inicial), pd.Timestamp(data_final)).to_numpy()]
+        if colunas is not None:
+            legado = legado[[coluna for coluna in colunas if coluna in legado.columns]]
+        partes.append(legado)
+    if not partes:
+        return pd.DataFrame(columns=colunas or [])
+    return pd.concat(partes, ignore_index=True)
@@ -6,11 +6,21 @@ import os
 from PIL import Image
 from datetime import date
 import gspread
-from gspread_dataframe import get_as_dataframe
 import io
 
 # Importa as configurações do arquivo central
-from config import CAMINHO_LOGO, CAMINHO_EXCEL_LOCAL, MODO_ONLINE, NOME_PLANILHA_ONLINE
+from config import (CAMINHO_LOGO, CAMINHO_EXCEL_LOCAL, MODO_ONLINE, NOME_PLANILHA_ONLINE, ARMAZENAMENTO_LOCAL, CAMINHO_SQLITE, PASTA_PARQUET_LOCAL,
+                    PLANILHA_ABAS_MENSAIS)
+from data_processor_module import converter_numero_brasileiro
+from esquema_module import aplicar_esquema_movimentacoes
+from armazenamento_module import abrir_armazenamento_local
+from sessao_planilha_module import SessaoPlanilhas
+from leitura_planilha_module import ler_abas
+from abas_mensais_module import ler_manifesto, periodo_do_manifesto, ler_movimentacoes_periodo
+from dashboard_module import (opcoes_filtros, filtrar_movimentacoes, separar_transferencias, filtrar_vendas, calcular_kpis_vendas, calcular_vendas_por_dia,
+                              calcular_ranking_clientes, calcular_resumo_dre, calcular_maiores_por_operacao,
+                              calcular_totais_transferencias, calcular_movimentacao_diaria, calcular_ranking_produtos,
+                              calcular_ranking_vendedores)
 
 def formatar_numero_br(valor):
     """
@@ -53,18 +63,20 @@ carregar_css()
 # =================================================================================
 # --- FUNÇÕES DE CARREGAMENTO DE DADOS (Agora centralizadas aqui) ---
 # =================================================================================
+@st.cache_resource
+def abrir_sessao_planilhas():
+    # Autentica uma vez por processo do Streamlit; as recargas do cache de dados reusam o cliente e a planilha
+    return SessaoPlanilhas(lambda: gspread.service_account_from_dict(st.secrets["gcp_service_account"]))
+
 @st.cache_data(ttl=600)
 def carregar_dados():
     df_mov, df_est = pd.DataFrame(), pd.DataFrame()
     if MODO_ONLINE:
         try:
-            creds_dict = st.secrets["gcp_service_account"]
-            gc = gspread.service_account_from_dict(creds_dict)
-            spreadsheet = gc.open(NOME_PLANILHA_ONLINE)
-            mov_sheet = spreadsheet.worksheet('Movimentacoes')
-            est_sheet = spreadsheet.worksheet('Estoque')
-            df_mov = get_as_dataframe(mov_sheet, evaluate_formulas=True)
-            df_est = get_as_dataframe(est_sheet, evaluate_formulas=True)
+            spreadsheet = abrir_sessao_planilhas().planilha(NOME_PLANILHA_ONLINE)
+            # As duas abas em paralelo, com valores crus já convertidos em colunas tipadas
+            abas = ler_abas(spreadsheet, {'Movimentacoes': None, 'Estoque': None})
+            df_mov, df_est = abas['Movimentacoes'], abas['Estoque']
         except Exception as e:
             st.error("Falha ao carregar dados online.")
             st.exception(e)
@@ -80,27 +92,78 @@ def carregar_dados():
             st.error(f"Erro ao carregar o arquivo Excel local: {e}")
     if not df_mov.empty:
         df_mov.columns = df_mov.columns.str.strip()
-        if 'Data Emissão' in df_mov.columns:
-            df_mov['Data Emissão'] = pd.to_datetime(df_mov['Data Emissão'], format='%d/%m/%Y', errors='coerce')
-        if 'Data de Vencimento' in df_mov.columns:
-            df_mov['Data de Vencimento'] = pd.to_datetime(df_mov['Data de Vencimento'], format='%d/%m/%Y', errors='coerce')
+        df_mov = aplicar_esquema_movimentacoes(df_mov)
+    return df_mov, preparar_estoque(df_est)
+
+def preparar_estoque(df_est):
     if not df_est.empty:
         df_est.columns = df_est.columns.str.strip()
-        def clean_and_convert_decimal(series):
-            temp_series = series.astype(str).str.replace(',', '.', regex=False)
-            def remove_thousands_separator(value):
-                if pd.isna(value) or value is None: return None
-                parts = str(value).split('.')
-                return "".join(parts[:-1]) + "." + parts[-1] if len(parts) > 1 else value
-            cleaned_series = temp_series.apply(remove_thousands_separator)
-            return pd.to_numeric(cleaned_series, errors='coerce').fillna(0)
+        falhas_conversao = {}
         for col in ['Saldo', 'Custo Unit.', 'Custo Total']:
              if col in df_est.columns:
-                df_est[col] = clean_and_convert_decimal(df_est[col])
-    return df_mov, df_est
+                df_est[col] = converter_numero_brasileiro(df_est[col], falhas=falhas_conversao)
+        for col, quantidade in falhas_conversao.items():
+            if quantidade:
+                print(f"  [AVISO] Estoque: {quantidade} valor(es) inválido(s) em '{col}' foram convertidos para 0.")
+    return df_est
+
+# No SQLite e no Parquet os filtros da barra lateral são aplicados na leitura: só as linhas filtradas são carregadas
+USAR_ARMAZENAMENTO = not MODO_ONLINE and ARMAZENAMENTO_LOCAL in ('sqlite', 'parquet')
+
+@st.cache_resource
+def abrir_armazenamento():
+    return abrir_armazenamento_local()
+
+@st.cache_data(ttl=600)
+def carregar_opcoes_armazenamento():
+    return abrir_armazenamento().opcoes_filtros()
 
-df_movimentacoes, df_estoque = carregar_dados()
-df = df_movimentacoes
+@st.cache_data(ttl=600)
+def carregar_movimentacoes_armazenamento(filtros):
+    return abrir_armazenamento().ler_movimentacoes(filtros)
+
+@st.cache_data(ttl=600)
+def carregar_estoque_armazenamento():
+    return preparar_estoque(abrir_armazenamento().ler_estoque())
+
+@st.cache_data(ttl=600)
+def carregar_manifesto():
+    if not (MODO_ONLINE and PLANILHA_ABAS_MENSAIS):
+        return pd.DataFrame()
+    try:
+        return ler_manifesto(abrir_sessao_planilhas().planilha(NOME_PLANILHA_ONLINE))
+    except Exception as e:
+        st.error("Falha ao carregar o manifesto da planilha.")
+        st.exception(e)
+        return pd.DataFrame()
+
+@st.cache_data(ttl=600)
+def carregar_movimentacoes_periodo(data_inicial, data_final):
+    df_mov = ler_movimentacoes_periodo(abrir_sessao_planilhas().planilha(NOME_PLANILHA_ONLINE), data_inicial, data_final,
+                                       manifesto=carregar_manifesto())
+    return aplicar_esquema_movimentacoes(df_mov) if not df_mov.empty else df_mov
+
+@st.cache_data(ttl=600)
+def carregar_estoque_planilha():
+    spreadsheet = abrir_sessao_planilhas().planilha(NOME_PLANILHA_ONLINE)
+    return preparar_estoque(ler_abas(spreadsheet, {'Estoque': None})['Estoque'])
+
+# Com as abas mensais, só os meses do período escolhido são baixados (sem manifesto, a planilha ainda está na aba única)
+USAR_ABAS_MENSAIS = not carregar_manifesto().empty
+
+if USAR_ARMAZENAMENTO:
+    df_movimentacoes = None
+    df_estoque = carregar_estoque_armazenamento()
+    opcoes = carregar_opcoes_armazenamento()
+elif USAR_ABAS_MENSAIS:
+    # Até o período ser escolhido, as opções vêm só do manifesto
+    df_movimentacoes = None
+    df_estoque = carregar_estoque_planilha()
+    data_min, data_max = periodo_do_manifesto(carregar_manifesto())
+    opcoes = {'vazio': carregar_manifesto()['Linhas'].sum() == 0, 'data_min': data_min, 'data_max': data_max}
+else:
+    df_movimentacoes, df_estoque = carregar_dados()
+    opcoes = opcoes_filtros(df_movimentacoes)
 
 # =================================================================================
 # --- BARRA LATERAL (SIDEBAR) ---
@@ -108,21 +171,29 @@ df = df_movimentacoes
 st.sidebar.image(CAMINHO_LOGO)
 st.sidebar.title("Painel de Controle")
 
-df_filtrado = df.copy() if not df.empty else pd.DataFrame()
+df_filtrado = pd.DataFrame()
 
-if not df.empty:
+if not opcoes['vazio']:
+    filtros = {}
     ativar_filtro_data = st.sidebar.checkbox("Filtrar por Período", value=False)
-    datas_validas = df['Data Emissão'].dropna()
-    if ativar_filtro_data and not datas_validas.empty:
-        data_min_default = datas_validas.min().date()
-        data_max_default = datas_validas.max().date()
+    if ativar_filtro_data and opcoes['data_min'] is not None:
+        data_min_default = opcoes['data_min'].date()
+        data_max_default = opcoes['data_max'].date()
         data_inicial = st.sidebar.date_input("Data Inicial", data_min_default, min_value=data_min_default, max_value=data_max_default)
         data_final = st.sidebar.date_input("Data Final", data_max_default, min_value=data_inicial, max_value=data_max_default)
-        df_filtrado = df_filtrado[df_filtrado['Data Emissão'].dt.date.between(data_inicial, data_final)]
-    elif ativar_filtro_data and datas_validas.empty:
+        filtros['data_inicial'], filtros['data_final'] = data_inicial, data_final
+    elif ativar_filtro_data:
         st.sidebar.warning("Nenhuma data válida encontrada para filtrar.")
 
-    clientes_unicos = sorted(df['Cliente'].astype(str).unique())
+    if USAR_ABAS_MENSAIS:
+        df_movimentacoes = carregar_movimentacoes_periodo(filtros.get('data_inicial'), filtros.get('data_final'))
+        opcoes = {**opcoes_filtros(df_movimentacoes), 'data_min': opcoes['data_min'], 'data_max': opcoes['data_max']}
+
+    clientes_unicos = opcoes['clientes']
+    if USAR_ABAS_MENSAIS and st.session_state.get('clientes_do_periodo') != clientes_unicos:
+        # Outro período baixado: a seleção recomeça com todos os clientes dele
+        st.session_state.clientes_do_periodo = clientes_unicos
+        st.session_state.clientes_selecionados = clientes_unicos
     if 'clientes_selecionados' not in st.session_state:
         st.session_state.clientes_selecionados = clientes_unicos
 
@@ -136,17 +207,17 @@ if not df.empty:
     
     clientes_selecionados = st.sidebar.multiselect("Clientes", clientes_unicos, default=st.session_state.clientes_selecionados)
     
-    movimentacoes_unicas = ['Todas'] + sorted(df['Movimentação'].astype(str).unique())
+    movimentacoes_unicas = ['Todas'] + opcoes['movimentacoes']
     movimentacao_selecionada = st.sidebar.selectbox("Filtrar por Movimentação", movimentacoes_unicas)
     
-    if 'Classificação DRE' in df.columns:
-        dre_unicas = ['Todas'] + sorted(df['Classificação DRE'].astype(str).unique())
+    if opcoes['classificacoes_dre'] is not None:
+        dre_unicas = ['Todas'] + opcoes['classificacoes_dre']
         dre_selecionado = st.sidebar.selectbox("Filtrar por Classificação DRE", dre_unicas)
     else:
         dre_selecionado = 'Todas'
 
-    if 'Tipo de Operação' in df.columns:
-        tipo_operacao_unicas = ['Todas'] + sorted(df['Tipo de Operação'].astype(str).unique())
+    if opcoes['tipos_operacao'] is not None:
+        tipo_operacao_unicas = ['Todas'] + opcoes['tipos_operacao']
         tipo_operacao_selecionada = st.sidebar.selectbox("Filtrar por Tipo de Operação", tipo_operacao_unicas)
     else:
         tipo_operacao_selecionada = 'Todas'
@@ -156,24 +227,20 @@ if not df.empty:
     pagamento_pesquisado = st.sidebar.text_input("Pesquisar por Forma de Pagto")
     vendedor_pesquisado = st.sidebar.text_input("Pesquisar por Vendedor")
 
-    if clientes_selecionados:
-        df_filtrado = df_filtrado[df_filtrado['Cliente'].isin(clientes_selecionados)]
-    if movimentacao_selecionada != 'Todas':
-        df_filtrado = df_filtrado[df_filtrado['Movimentação'] == movimentacao_selecionada]
-    if dre_selecionado != 'Todas' and 'Classificação DRE' in df_filtrado.columns:
-        df_filtrado = df_filtrado[df_filtrado['Classificação DRE'] == dre_selecionado]
-    
-    if tipo_operacao_selecionada != 'Todas' and 'Tipo de Operação' in df_filtrado.columns:
-        df_filtrado = df_filtrado[df_filtrado['Tipo de Operação'] == tipo_operacao_selecionada]
-        
-    if item_pesquisado:
-        df_filtrado = df_filtrado[df_filtrado['Item Descrição'].str.contains(item_pesquisado, case=False, na=False)]
-    if nf_pesquisada:
-        df_filtrado = df_filtrado[df_filtrado['Nota'].astype(str).str.contains(nf_pesquisada, case=False, na=False)]
-    if pagamento_pesquisado:
-        df_filtrado = df_filtrado[df_filtrado['Forma de Pagto'].str.contains(pagamento_pesquisado, case=False, na=False)]
-    if vendedor_pesquisado:
-        df_filtrado = df_filtrado[df_filtrado['Representante'].str.contains(vendedor_pesquisado, case=False, na=False)]
+    filtros.update({
+        'clientes': clientes_selecionados,
+        'movimentacao': movimentacao_selecionada if movimentacao_selecionada != 'Todas' else None,
+        'classificacao_dre': dre_selecionado if dre_selecionado != 'Todas' else None,
+        'tipo_operacao': tipo_operacao_selecionada if tipo_operacao_selecionada != 'Todas' else None,
+        'item': item_pesquisado,
+        'nota': nf_pesquisada,
+        'forma_pagto': pagamento_pesquisado,
+        'representante': vendedor_pesquisado,
+    })
+    if USAR_ARMAZENAMENTO:
+        df_filtrado = carregar_movimentacoes_armazenamento(filtros)
+    else:
+        df_filtrado = filtrar_movimentacoes(df_movimentacoes, filtros)
         
     st.sidebar.divider()
     st.sidebar.header("Download de Dados")
@@ -196,9 +263,8 @@ else:
 # =================================================================================
 st.title("Dashboard de Análise e Estoque")
 
-if not df.empty:
-    df_transferencias = df_filtrado[df_filtrado['Tipo de Operação'].str.contains("TRANSFERENCIA", case=False, na=False)]
-    df_operacional = df_filtrado[~df_filtrado['Tipo de Operação'].str.contains("TRANSFERENCIA", case=False, na=False)]
+if not opcoes['vazio']:
+    df_transferencias, df_operacional = separar_transferencias(df_filtrado)
     
     st.info(f"Exibindo **{len(df_operacional):,}** registros operacionais e **{len(df_transferencias):,}** em transferências.")
     st.divider()
@@ -214,7 +280,7 @@ if not df.empty:
         "📦 Estoque Atual"
     ]
     
-    if 'Classificação DRE' not in df.columns:
+    if 'Classificação DRE' not in opcoes['colunas']:
         st.error("A coluna 'Classificação DRE' não foi encontrada. A aba de DRE não pode ser gerada.")
         tab_list.pop(1)
     
@@ -224,13 +290,11 @@ if not df.empty:
         st.header("Dashboard Mensal de Vendas")
 
         # Filtra apenas os dados de vendas (Saída) do período selecionado
-        df_vendas = df_operacional[df_operacional['Movimentação'] == 'Saída']
+        df_vendas = filtrar_vendas(df_operacional)
 
         if not df_vendas.empty:
             # --- 1. CÁLCULO DOS KPIs ---
-            valor_total_vendido = df_vendas['Total do Item'].sum()
-            quantidade_pedidos = df_vendas['Nota'].nunique()
-            ticket_medio = valor_total_vendido / quantidade_pedidos if quantidade_pedidos > 0 else 0
+            valor_total_vendido, quantidade_pedidos, ticket_medio = calcular_kpis_vendas(df_vendas)
 
             # --- 2. EXIBIÇÃO DOS KPIs ---
             col1, col2, col3 = st.columns(3)
@@ -245,12 +309,12 @@ if not df.empty:
 
             with col_graf1:
                 st.subheader("Valor total de pedidos por dia")
-                vendas_por_dia = df_vendas.groupby(df_vendas['Data Emissão'].dt.date)['Total do Item'].sum()
+                vendas_por_dia = calcular_vendas_por_dia(df_vendas)
                 st.line_chart(vendas_por_dia)
 
             with col_graf2:
                 st.subheader("Top 10 Clientes")
-                ranking_clientes = df_vendas.groupby('Cliente')['Total do Item'].sum().nlargest(10).reset_index()
+                ranking_clientes = calcular_ranking_clientes(df_vendas)
                 st.dataframe(ranking_clientes,
                              column_config={
                                  "Cliente": "Cliente",
@@ -265,15 +329,15 @@ if not df.empty:
         with tabs[1]: # DRE Simplificado
             st.header("Demonstração do Resultado (DRE Simplificado)")
             st.write("Análise financeira baseada na classificação DRE para o período filtrado.")
-            dre_summary = df_operacional.groupby('Classificação DRE')['Total do Item'].sum()
-            receita = dre_summary.get('Receita', 0)
-            deducoes = dre_summary.get('Dedução de Receita', 0)
-            custos = dre_summary.get('Custo', 0)
-            reducao_custos = dre_summary.get('Redução de Custo', 0)
-            despesas = dre_summary.get('Despesa', 0)
-            receita_liquida = receita - deducoes
-            resultado_bruto = receita_liquida - (custos - reducao_custos)
-            resultado_final = resultado_bruto - despesas
+            resumo_dre = calcular_resumo_dre(df_operacional)
+            receita = resumo_dre['receita']
+            deducoes = resumo_dre['deducoes']
+            custos = resumo_dre['custos']
+            reducao_custos = resumo_dre['reducao_custos']
+            despesas = resumo_dre['despesas']
+            receita_liquida = resumo_dre['receita_liquida']
+            resultado_bruto = resumo_dre['resultado_bruto']
+            resultado_final = resumo_dre['resultado_final']
             st.subheader("Indicadores Principais do Período")
             col1, col2, col3, col4 = st.columns(4)
             col1.metric("Receita Líquida", formatar_numero_br(receita_liquida))
@@ -284,14 +348,14 @@ if not df.empty:
             col_graf1, col_graf2 = st.columns(2)
             with col_graf1:
                 st.subheader("Maiores Fontes de Receita")
-                df_receitas = df_operacional[df_operacional['Classificação DRE'] == 'Receita']
-                if not df_receitas.empty:
-                    st.bar_chart(df_receitas.groupby('Tipo de Operação')['Total do Item'].sum().nlargest(10))
+                maiores_receitas = calcular_maiores_por_operacao(df_operacional, 'Receita')
+                if not maiores_receitas.empty:
+                    st.bar_chart(maiores_receitas)
             with col_graf2:
                 st.subheader("Maiores Despesas")
-                df_despesas = df_operacional[df_operacional['Classificação DRE'] == 'Despesa']
-                if not df_despesas.empty:
-                    st.bar_chart(df_despesas.groupby('Tipo de Operação')['Total do Item'].sum().nlargest(10))
+                maiores_despesas = calcular_maiores_por_operacao(df_operacional, 'Despesa')
+                if not maiores_despesas.empty:
+                    st.bar_chart(maiores_despesas)
             with st.expander("Ver DRE Detalhado (Formato de Lista)"):
                 st.subheader("Estrutura do Resultado")
                 dcol1, dcol2 = st.columns([3, 1])
@@ -308,11 +372,7 @@ if not df.empty:
         st.header("Consulta de Transferências")
         st.write("Esta aba exibe apenas as movimentações de transferência de estoque, que não impactam o DRE.")
         if not df_transferencias.empty:
-            num_operacoes = len(df_transferencias)
-            df_transf_entradas = df_transferencias[df_transferencias['Movimentação'] == 'Entrada']
-            df_transf_saidas = df_transferencias[df_transferencias['Movimentação'] == 'Saída']
-            total_entradas = df_transf_entradas['Total do Item'].sum()
-            total_saidas = df_transf_saidas['Total do Item'].sum()
+            num_operacoes, total_entradas, total_saidas = calcular_totais_transferencias(df_transferencias)
             col1, col2, col3 = st.columns(3)
             col1.metric("Operações de Transferência", f"{num_operacoes}")
             col2.metric("Valor Total de Entradas", formatar_numero_br(total_entradas))
@@ -329,7 +389,7 @@ if not df.empty:
     
     with tabs[3]: # Entradas vs. Saídas
         st.header("Comparativo de Entradas vs. Saídas (Operacional)")
-        movimentacao_diaria = df_operacional.groupby([df_operacional['Data Emissão'].dt.date, 'Movimentação'])['Total do Item'].sum().unstack(fill_value=0)
+        movimentacao_diaria = calcular_movimentacao_diaria(df_operacional)
         st.bar_chart(movimentacao_diaria)
         st.dataframe(movimentacao_diaria,
             column_config={
@@ -341,22 +401,15 @@ if not df.empty:
 
     with tabs[4]: # Ranking de Produtos
         st.header("Ranking de Produtos Mais Vendidos")
-        ranking_produtos = df_operacional[df_operacional['Movimentação'] == 'Saída'].groupby('Item Descrição').agg(
-            Quantidade_Vendida=('Quantidade', 'sum'),
-            Valor_Total_Vendido=('Total do Item', 'sum')
-        ).sort_values(by='Valor_Total_Vendido', ascending=False).reset_index()
+        ranking_produtos = calcular_ranking_produtos(df_operacional)
         st.dataframe(ranking_produtos, width='stretch',
             column_config={"Valor_Total_Vendido": st.column_config.NumberColumn("Valor Total Vendido", format="R$ %.2f")}
         )
 
     with tabs[5]: # Ranking Vendedores
         st.header("Ranking de Vendas por Vendedor (Representante)")
-        df_vendedores = df_operacional[(df_operacional['Movimentação'] == 'Saída') & (df_operacional['Representante'] != 'N/A')]
-        if not df_vendedores.empty:
-            ranking_vendedores = df_vendedores.groupby('Representante').agg(
-                Valor_Total_Vendido=('Total do Item', 'sum'),
-                Quantidade_de_Vendas=('Nota', 'nunique')
-            ).sort_values(by='Valor_Total_Vendido', ascending=False).reset_index()
+        ranking_vendedores = calcular_ranking_vendedores(df_operacional)
+        if not ranking_vendedores.empty:
             st.dataframe(ranking_vendedores, width='stretch',
                 column_config={"Valor_Total_Vendido": st.column_config.NumberColumn("Valor Total Vendido", format="R$ %.2f")}
             )
@@ -406,6 +459,9 @@ if not df.empty:
 else:
     if MODO_ONLINE:
         st.info("Aguardando dados da nuvem... A planilha online pode estar vazia ou indisponível.")
+    elif USAR_ARMAZENAMENTO:
+        destino = CAMINHO_SQLITE if ARMAZENAMENTO_LOCAL == 'sqlite' else PASTA_PARQUET_LOCAL
+        st.info(f"Armazenamento '{destino}' sem movimentações. Execute o 'main.py' primeiro para gerar os dados.")
     else:
         st.info(f"Arquivo '{CAMINHO_EXCEL_LOCAL}' não encontrado. Execute o 'main.py' primeiro para gerar os dados.")
 
@@ -0,0 +1,328 @@
+# armazenamento_module.py - Armazenamento local das movimentações e do estoque
+# Alternativa ao arquivo Excel único do modo local (config.ARMAZENAMENTO_LOCAL).
+# O pipeline grava só o que mudou e o dashboard consulta com os filtros da
+# barra lateral, carregando na memória apenas as linhas que passam neles.
+# Todos os armazenamentos expõem os mesmos métodos: gravar_movimentacoes,
+# gravar_estoque, opcoes_filtros, ler_movimentacoes, ler_estoque e
+# ultima_data_emissao.
+
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from config import ARMAZENAMENTO_LOCAL, CAMINHO_SQLITE, PASTA_PARQUET_LOCAL
+from dashboard_module import opcoes_filtros, filtrar_movimentacoes
+from esquema_module import aplicar_esquema_movimentacoes, COLUNAS_CHAVE_MOVIMENTACOES, COLUNAS_DATA
+from indice_linhas_module import impressoes_digitais
+
+COLUNAS_INDEXADAS = ['Data Emissão', 'Cliente', 'Tipo de Operação', 'Nota']
+COLUNAS_TEXTO_FILTRO = {  # Chave do filtro -> coluna pesquisada com "contém" (regex, sem diferenciar maiúsculas)
+    'item': 'Item Descrição',
+    'nota': 'Nota',
+    'forma_pagto': 'Forma de Pagto',
+    'representante': 'Representante',
+}
+COLUNAS_IGUALDADE_FILTRO = {
+    'movimentacao': 'Movimentação',
+    'classificacao_dre': 'Classificação DRE',
+    'tipo_operacao': 'Tipo de Operação',
+}
+
+
+def _identificador(nome):
+    return '"' + nome.replace('"', '""') + '"'
+
+
+def _contem(valor, padrao):
+    """Mesma regra do str.contains(padrao, case=False) do pandas, registrada como função do SQLite."""
+    return valor is not None and re.search(padrao, str(valor), re.IGNORECASE) is not None
+
+
+def _tipo_sqlite(serie):
+    return 'REAL' if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie) else 'TEXT'
+
+
+def _valores_sqlite(df):
+    """Datas como aaaa-mm-dd (ordenáveis), categorias como texto e vazios como NULL."""
+    df = df.copy()
+    for coluna in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[coluna]):
+            df[coluna] = df[coluna].dt.strftime('%Y-%m-%d')
+        elif isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            df[coluna] = df[coluna].astype(object)
+    return df.astype(object).where(pd.notnull(df), None)
+
+
+class ArmazenamentoSQLite:
+    """
+    Banco SQLite com a tabela 'movimentacoes' (uma linha por chave de
+    duplicidade; uma linha reenviada com outros valores substitui a antiga)
+    e a tabela 'estoque' com um retrato do inventário por execução.
+    'Data Emissão', 'Cliente', 'Tipo de Operação' e 'Nota' têm índice.
+    """
+
+    def __init__(self, caminho_arquivo):
+        pasta = os.path.dirname(caminho_arquivo)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        # Uma conexão por processo, compartilhada entre as sessões do Streamlit
+        self.conexao = sqlite3.connect(caminho_arquivo, check_same_thread=False)
+        self.conexao.execute("PRAGMA journal_mode=WAL")  # O dashboard lê enquanto o pipeline grava
+        self.conexao.create_function('CONTEM', 2, _contem, deterministic=True)
+
+    def _colunas(self, tabela):
+        return [linha[1] for linha in self.conexao.execute(f"PRAGMA table_info({_identificador(tabela)})")]
+
+    def _preparar_tabela(self, tabela, df, definicao_inicial):
+        """Cria a tabela na primeira gravação e acrescenta colunas que ainda não existem."""
+        existentes = self._colunas(tabela)
+        if not existentes:
+            colunas = [definicao_inicial] + [f"{_identificador(coluna)} {_tipo_sqlite(df[coluna])}" for coluna in df.columns]
+            self.conexao.execute(f"CREATE TABLE {_identificador(tabela)} ({', '.join(colunas)})")
+            return
+        for coluna in df.columns:
+            if coluna not in existentes:
+                self.conexao.execute(f"ALTER TABLE {_identificador(tabela)} ADD COLUMN {_identificador(coluna)} {_tipo_sqlite(df[coluna])}")
+
+    def gravar_movimentacoes(self, df_mov):
+        """Insere as linhas novas e substitui as que já existiam com a mesma chave. Retorna o total gravado."""
+        if df_mov.empty:
+            return 0
+        df_valores = _valores_sqlite(df_mov)
+        # A chave (hash de 64 bits da chave de duplicidade) é o próprio rowid da tabela
+        chaves = impressoes_digitais(df_valores, COLUNAS_CHAVE_MOVIMENTACOES).view(np.int64)
+        with self.conexao:
+            self._preparar_tabela('movimentacoes', df_mov, '"_chave" INTEGER PRIMARY KEY')
+            for coluna in COLUNAS_INDEXADAS:
+                if coluna in df_mov.columns:
+                    self.conexao.execute(f"CREATE INDEX IF NOT EXISTS {_identificador('idx_mov_' + coluna)} "
+                                         f"ON movimentacoes ({_identificador(coluna)})")
+            colunas = ['_chave'] + list(df_valores.columns)
+            comando = (f"INSERT OR REPLACE INTO movimentacoes ({', '.join(map(_identificador, colunas))}) "
+                       f"VALUES ({', '.join('?' * len(colunas))})")
+            self.conexao.executemany(comando, ([int(chave)] + linha for chave, linha in zip(chaves, df_valores.values.tolist())))
+        print(f"  > {len(df_mov)} registros gravados no SQLite (novos ou atualizados).")
+        return len(df_mov)
+
+    def gravar_estoque(self, df_estoque, instante=None):
+        """Grava um novo retrato do inventário; o dashboard mostra sempre o mais recente."""
+        if df_estoque.empty:
+            return
+        instante = instante or datetime.now().isoformat(timespec='seconds')
+        df_valores = _valores_sqlite(df_estoque)
+        with self.conexao:
+            self._preparar_tabela('estoque', df_estoque, '"_retrato" TEXT NOT NULL')
+            self.conexao.execute('CREATE INDEX IF NOT EXISTS idx_estoque_retrato ON estoque ("_retrato")')
+            colunas = ['_retrato'] + list(df_valores.columns)
+            comando = (f"INSERT INTO estoque ({', '.join(map(_identificador, colunas))}) "
+                       f"VALUES ({', '.join('?' * len(colunas))})")
+            self.conexao.executemany(comando, ([instante] + linha for linha in df_valores.values.tolist()))
+        print(f"  > Retrato do estoque com {len(df_estoque)} itens gravado no SQLite.")
+
+    def _distintos(self, coluna):
+        if coluna not in self._colunas('movimentacoes'):
+            return None
+        consulta = f"SELECT DISTINCT {_identificador(coluna)} FROM movimentacoes WHERE {_identificador(coluna)} IS NOT NULL"
+        return sorted(str(linha[0]) for linha in self.conexao.execute(consulta))
+
+    def opcoes_filtros(self):
+        """Colunas, datas mínima/máxima e valores distintos para montar a barra lateral (ver dashboard_module.opcoes_filtros)."""
+        colunas = [coluna for coluna in self._colunas('movimentacoes') if coluna != '_chave']
+        data_min = data_max = None
+        if 'Data Emissão' in colunas:
+            data_min, data_max = self.conexao.execute('SELECT MIN("Data Emissão"), MAX("Data Emissão") FROM movimentacoes').fetchone()
+        vazio = not colunas or self.conexao.execute("SELECT 1 FROM movimentacoes LIMIT 1").fetchone() is None
+        return {
+            'vazio': vazio,
+            'colunas': colunas,
+            'data_min': pd.to_datetime(data_min) if data_min else None,
+            'data_max': pd.to_datetime(data_max) if data_max else None,
+            'clientes': self._distintos('Cliente') or [],
+            'movimentacoes': self._distintos('Movimentação') or [],
+            'classificacoes_dre': self._distintos('Classificação DRE'),
+            'tipos_operacao': self._distintos('Tipo de Operação'),
+        }
+
+    def _condicoes(self, filtros, colunas):
+        condicoes, parametros = [], []
+        if filtros.get('data_inicial') and filtros.get('data_final') and 'Data Emissão' in colunas:
+            condicoes.append('"Data Emissão" BETWEEN ? AND ?')
+            parametros += [filtros['data_inicial'].strftime('%Y-%m-%d'), filtros['data_final'].strftime('%Y-%m-%d')]
+        if filtros.get('clientes') and 'Cliente' in colunas:
+            # Uma lista com milhares de clientes vai como um único parâmetro JSON
+            condicoes.append('"Cliente" IN (SELECT value FROM json_each(?))')
+            parametros.append(json.dumps(list(filtros['clientes']), ensure_ascii=False))
+        for chave, coluna in COLUNAS_IGUALDADE_FILTRO.items():
+            if filtros.get(chave) and coluna in colunas:
+                condicoes.append(f"{_identificador(coluna)} = ?")
+                parametros.append(filtros[chave])
+        for chave, coluna in COLUNAS_TEXTO_FILTRO.items():
+            if filtros.get(chave) and coluna in colunas:
+                condicoes.append(f"CONTEM({_identificador(coluna)}, ?)")
+                parametros.append(filtros[chave])
+        return condicoes, parametros
+
+    def ler_movimentacoes(self, filtros=None):
+        """Lê só as movimentações que passam nos filtros (mesmas chaves de dashboard_module.filtrar_movimentacoes)."""
+        colunas = [coluna for coluna in self._colunas('movimentacoes') if coluna != '_chave']
+        if not colunas:
+            return pd.DataFrame()
+        condicoes, parametros = self._condicoes(filtros or {}, colunas)
+        consulta = f"SELECT {', '.join(map(_identificador, colunas))} FROM movimentacoes"
+        if condicoes:
+            consulta += " WHERE " + " AND ".join(condicoes)
+        if 'Data Emissão' in colunas:
+            consulta += ' ORDER BY "Data Emissão"'
+        df_mov = pd.read_sql_query(consulta, self.conexao, params=parametros)
+        # Sem linhas o pandas não sabe o tipo das colunas; as REAL continuam numéricas
+        tipos = {linha[1]: linha[2] for linha in self.conexao.execute('PRAGMA table_info(movimentacoes)')}
+        for coluna in colunas:
+            if tipos.get(coluna) == 'REAL':
+                df_mov[coluna] = pd.to_numeric(df_mov[coluna], errors='coerce').astype('float64')
+        for coluna in COLUNAS_DATA:
+            if coluna in df_mov.columns:
+                df_mov[coluna] = pd.to_datetime(df_mov[coluna], format='%Y-%m-%d', errors='coerce')
+        return aplicar_esquema_movimentacoes(df_mov)
+
+    def ler_estoque(self):
+        """Retrato mais recente do inventário."""
+        colunas = [coluna for coluna in self._colunas('estoque') if coluna != '_retrato']
+        if not colunas:
+            return pd.DataFrame()
+        consulta = (f"SELECT {', '.join(map(_identificador, colunas))} FROM estoque "
+                    f'WHERE "_retrato" = (SELECT MAX("_retrato") FROM estoque)')
+        return pd.read_sql_query(consulta, self.conexao)
+
+    def ultima_data_emissao(self):
+        if 'Data Emissão' not in self._colunas('movimentacoes'):
+            return None
+        ultima = self.conexao.execute('SELECT MAX("Data Emissão") FROM movimentacoes').fetchone()[0]
+        return pd.to_datetime(ultima).date() if ultima else None
+
+
+class ArmazenamentoParquet:
+    """
+    Pasta com as movimentações em Parquet particionado por mês de emissão
+    (movimentacoes/ano=AAAA/mes=MM/dados.parquet; sem data vai em ano=0/mes=0)
+    e o estoque com um arquivo por retrato. Gravar só reescreve os meses que
+    receberam linhas e ler só abre os meses que cruzam o período filtrado,
+    mapeando os arquivos na memória em vez de copiá-los.
+    """
+
+    def __init__(self, pasta):
+        self.pasta = pasta
+        self.pasta_movimentacoes = os.path.join(pasta, 'movimentacoes')
+        self.pasta_estoque = os.path.join(pasta, 'estoque')
+
+    def _caminho_particao(self, ano, mes):
+        return os.path.join(self.pasta_movimentacoes, f"ano={ano}", f"mes={mes:02d}", 'dados.parquet')
+
+    def _particoes(self):
+        """{(ano, mes): caminho} das partições existentes."""
+        particoes = {}
+        if not os.path.isdir(self.pasta_movimentacoes):
+            return particoes
+        for pasta_ano in os.listdir(self.pasta_movimentacoes):
+            if not pasta_ano.startswith('ano='):
+                continue
+            for pasta_mes in os.listdir(os.path.join(self.pasta_movimentacoes, pasta_ano)):
+                caminho = os.path.join(self.pasta_movimentacoes, pasta_ano, pasta_mes, 'dados.parquet')
+                if pasta_mes.startswith('mes=') and os.path.exists(caminho):
+                    particoes[(int(pasta_ano[4:]), int(pasta_mes[4:]))] = caminho
+        return particoes
+
+    @staticmethod
+    def _gravar_arquivo(tabela, caminho):
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        caminho_temporario = caminho + ".tmp"
+        tabela.to_parquet(caminho_temporario, index=False)
+        os.replace(caminho_temporario, caminho)
+
+    @staticmethod
+    def _ler_arquivo(caminho, colunas=None):
+        return pq.read_table(caminho, columns=colunas, memory_map=True).to_pandas()
+
+    def gravar_movimentacoes(self, df_mov):
+        """Junta as linhas a cada mês afetado; a mesma chave de duplicidade substitui a linha antiga. Retorna o total gravado."""
+        if df_mov.empty:
+            return 0
+        df_mov = df_mov.assign(_chave=impressoes_digitais(df_mov, COLUNAS_CHAVE_MOVIMENTACOES))
+        datas = df_mov['Data Emissão']
+        anos = datas.dt.year.fillna(0).astype(int)
+        meses = datas.dt.month.fillna(0).astype(int)
+        particoes_gravadas = 0
+        for (ano, mes), df_mes in df_mov.groupby([anos, meses], sort=True):
+            particoes_gravadas += 1
+            caminho = self._caminho_particao(ano, mes)
+            if os.path.exists(caminho):
+                df_mes = pd.concat([self._ler_arquivo(caminho), df_mes], ignore_index=True)
+            # Também numa partição nova: o próprio lote pode repetir uma chave
+            df_mes = aplicar_esquema_movimentacoes(df_mes.drop_duplicates('_chave', keep='last'))
+            self._gravar_arquivo(df_mes.reset_index(drop=True), caminho)
+        print(f"  > {len(df_mov)} registros gravados em {particoes_gravadas} partição(ões) mensal(is) do Parquet.")
+        return len(df_mov)
+
+    def gravar_estoque(self, df_estoque, instante=None):
+        """Grava um novo retrato do inventário; o dashboard mostra sempre o mais recente."""
+        if df_estoque.empty:
+            return
+        instante = instante or datetime.now().strftime('%Y%m%dT%H%M%S')
+        self._gravar_arquivo(df_estoque, os.path.join(self.pasta_estoque, f"retrato-{instante}.parquet"))
+        print(f"  > Retrato do estoque com {len(df_estoque)} itens gravado no Parquet.")
+
+    def opcoes_filtros(self):
+        """Colunas, datas mínima/máxima e valores distintos para montar a barra lateral (ver dashboard_module.opcoes_filtros)."""
+        particoes = self._particoes()
+        if not particoes:
+            return opcoes_filtros(pd.DataFrame())
+        esquemas = {caminho: pq.read_schema(caminho, memory_map=True).names for caminho in particoes.values()}
+        colunas = list(dict.fromkeys(coluna for nomes in esquemas.values() for coluna in nomes if coluna != '_chave'))
+        # Só as colunas usadas pela barra lateral são lidas
+        lidas = ['Data Emissão', 'Cliente', 'Movimentação', 'Classificação DRE', 'Tipo de Operação']
+        df_opcoes = pd.concat([self._ler_arquivo(caminho, [coluna for coluna in lidas if coluna in nomes])
+                               for caminho, nomes in esquemas.items()], ignore_index=True)
+        opcoes = opcoes_filtros(df_opcoes)
+        opcoes['colunas'] = colunas
+        return opcoes
+
+    def ler_movimentacoes(self, filtros=None):
+        """Lê só os meses que cruzam o período filtrado e aplica os demais filtros (mesmas chaves de dashboard_module.filtrar_movimentacoes)."""
+        filtros = filtros or {}
+        particoes = self._particoes()
+        if filtros.get('data_inicial') and filtros.get('data_final'):
+            inicio = (filtros['data_inicial'].year, filtros['data_inicial'].month)
+            fim = (filtros['data_final'].year, filtros['data_final'].month)
+            particoes = {mes: caminho for mes, caminho in particoes.items() if inicio <= mes <= fim}
+        if not particoes:
+            return pd.DataFrame()
+        df_mov = pd.concat([self._ler_arquivo(caminho) for _, caminho in sorted(particoes.items())], ignore_index=True)
+        df_mov = filtrar_movimentacoes(aplicar_esquema_movimentacoes(df_mov.drop(columns='_chave')), filtros)
+        return df_mov.sort_values('Data Emissão', kind='stable').reset_index(drop=True)
+
+    def ler_estoque(self):
+        """Retrato mais recente do inventário."""
+        retratos = sorted(nome for nome in os.listdir(self.pasta_estoque) if nome.endswith('.parquet')) if os.path.isdir(self.pasta_estoque) else []
+        return self._ler_arquivo(os.path.join(self.pasta_estoque, retratos[-1])) if retratos else pd.DataFrame()
+
+    def ultima_data_emissao(self):
+        particoes = self._particoes()
+        validas = [mes for mes in particoes if mes != (0, 0)]
+        if not validas:
+            return None
+        ultima = self._ler_arquivo(particoes[max(validas)], ['Data Emissão'])['Data Emissão'].max()
+        return ultima.date() if pd.notnull(ultima) else None
+
+
+def abrir_armazenamento_local():
+    """Armazenamento configurado em config.ARMAZENAMENTO_LOCAL, ou None quando é o arquivo Excel."""
+    if ARMAZENAMENTO_LOCAL == 'sqlite':
+        return ArmazenamentoSQLite(CAMINHO_SQLITE)
+    if ARMAZENAMENTO_LOCAL == 'parquet':
+        return ArmazenamentoParquet(PASTA_PARQUET_LOCAL)
+    return None
@@ -15,8 +15,9 @@ import glob
 import pyautogui
 import time
 import gspread
-from gspread_dataframe import set_with_dataframe
 from datetime import date
+from envio_planilha_module import EscritorPlanilha
+from sessao_planilha_module import sessao_planilhas
 
 # =================================================================================
 # FUNÇÕES DE LÓGICA
@@ -27,16 +28,14 @@ def salvar_no_google_sheets(df_final, nome_planilha, credenciais_json):
     try:
         print("\n--- ETAPA FINAL: Salvando no Google Sheets ---")
         print("Autenticando com a API do Google...")
-        gc = gspread.service_account(filename=credenciais_json)
-        
-        spreadsheet = gc.open(nome_planilha)
+        spreadsheet = sessao_planilhas(credenciais_json).planilha(nome_planilha)
         worksheet = spreadsheet.sheet1
         
-        print("Limpando dados antigos da planilha online...")
-        worksheet.clear()
-        
+        # Os blocos são gravados por cima dos dados antigos; as linhas que sobrarem são removidas no fim
         print("Enviando novos dados para a nuvem...")
-        set_with_dataframe(worksheet, df_final)
+        escritor = EscritorPlanilha(worksheet)
+        escritor.escrever(df_final)
+        escritor.imprimir_estatisticas()
         print("SUCESSO! Dados salvos no Google Sheets.")
         return True
     except gspread.exceptions.SpreadsheetNotFound:
@@ -0,0 +1,829 @@
+# benchmark_pipeline.py - Benchmarks do pipeline de extração
+# Usa o corpus sintético (corpus_sintetico.py), então pode ser executado sem
+# os relatórios reais. Exemplo:
+#   python benchmark_pipeline.py extracao --arquivos 8 --notas 400 --processos 1 2 4
+#   python benchmark_pipeline.py parser --notas 20000
+#   python benchmark_pipeline.py cache --arquivos 8 --notas 400
+#   python benchmark_pipeline.py memoria --paginas 1000 2000 4000
+#   python benchmark_pipeline.py inventario --itens 6000 --processos 1 2 4
+#   python benchmark_pipeline.py colunas --notas 50000
+#   python benchmark_pipeline.py suite --notas 20000 --comparar
+#   python benchmark_pipeline.py monitor --arquivos 5 --notas 400
+#   python benchmark_pipeline.py numeros --valores 2000000
+#   python benchmark_pipeline.py juncao --linhas 2000000
+#   python benchmark_pipeline.py aproximada --produtos 20000 --consultas 500
+#   python benchmark_pipeline.py armazenamento --linhas 100000 --meses 12
+#   python benchmark_pipeline.py planilha --linhas 50000 --novas 500 --falhas 0.02
+
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from corpus_sintetico import (gerar_corpus_movimentacoes, gerar_pdf_movimentacao, gerar_texto_relatorio_movimentacao,
+                              iterar_textos_paginas_movimentacao, gerar_pdf_inventario, gerar_texto_relatorio_inventario,
+                              notas_para_paginas, gerar_catalogo_produtos, LINHAS_POR_PAGINA)
+from pdf_parser_module import (orquestrar_extracao_movimentacoes, assinatura_parser, iterar_lotes_movimentacao,
+                               iterar_paginas_pdf_movimentacao, orquestrar_extracao_inventario, ConstrutorMovimentacoes,
+                               _localizar_blocos, _varrer_bloco, _limpar_forma_pagto, concatenar_tabelas_movimentacoes,
+                               processar_texto_inventario_para_tabela, contar_paginas_pdf, RE_BLOCO, RE_OPERACAO,
+                               RE_NOTA_CLIENTE, RE_CPF_CNPJ, RE_CIDADE_DATA, RE_TOTAL_NOTA, RE_REPRESENTANTE,
+                               RE_PAGAMENTO_COM_DATA, RE_PAGAMENTO_SEM_VALOR, RE_PAGAMENTO_A_VISTA, RE_PAGAMENTO_CARTAO,
+                               RE_ITENS)
+from config import movimentacao_map, ENVIO_CELULAS_POR_BLOCO, ENVIO_REQUISICOES_POR_MINUTO, LEITURA_REQUISICOES_POR_MINUTO
+from cache_module import CacheAnalise
+from data_processor_module import unir_dataframes, converter_numero_brasileiro, IndiceInventario
+from dashboard_module import calcular_agregacoes_dashboard, filtrar_movimentacoes
+from esquema_module import aplicar_esquema_movimentacoes, COLUNAS_CHAVE_MOVIMENTACOES
+from armazenamento_module import ArmazenamentoParquet, ArmazenamentoSQLite
+from monitor_module import MonitorRelatorios
+from correspondencia_module import IndiceAproximado, ngramas_descricao
+import envio_planilha_module
+import google_sheets_module
+import sessao_planilha_module
+from envio_planilha_module import EscritorPlanilha, BaldeFichas
+from google_sheets_module import _preparar_para_envio, atualizar_dados_no_google_sheets, buscar_dados_existentes
+from indice_linhas_module import impressoes_digitais
+from planilha_simulada import ServicoSimulado, ClienteSimulado
+from sessao_planilha_module import SessaoPlanilhas
+
+
+def _executar_silenciosamente(funcao, *args, **kwargs):
+    """Executa a função descartando os prints de progresso do pipeline."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return funcao(*args, **kwargs)
+
+
+# --- Analisadores de referência ---
+# Os analisadores originais geram uma lista com um dicionário por item. O
+# pipeline monta a tabela em colunas (ConstrutorMovimentacoes); estes ficam
+# aqui só como linha de base dos benchmarks.
+
+def _adicionar_registros(dados_finais, itens_encontrados, nome_arquivo_origem, cabecalho):
+    (nota, tipo_operacao, cliente, cpf_cnpj, representante, cidade, uf, data_emissao,
+     total_nota, data_vencimento, forma_pagto) = cabecalho
+    for item in itens_encontrados:
+        dados_item = {
+            'Arquivo Origem': nome_arquivo_origem, 'Nota': nota, 'Tipo de Operação': tipo_operacao, 'Cliente': cliente,
+            'CPF/CNPJ': cpf_cnpj, 'Representante': representante, 'Cidade': cidade, 'UF': uf, 
+            'Data Emissão': data_emissao,
+            'Item Descrição': item[0].strip(), 'Unidade': item[1], 'Valor Unitário': item[2], 
+            'Total do Item': item[3], 'Preço de Venda': item[4], 'CFOP': item[5], 
+            'Quantidade': item[6], 'Total da Nota': total_nota, 
+            'Data de Vencimento': data_vencimento, 'Forma de Pagto': forma_pagto
+        }
+        dados_finais.append(dados_item)
+
+
+def analisar_relatorio_movimentacao_regex(texto, nome_arquivo_origem):
+    """
+    Analisador original: um findall para separar os blocos de nota e uma busca
+    por regex para cada campo do cabeçalho.
+    """
+    dados_finais = []
+    blocos = RE_BLOCO.findall(texto)
+    for bloco in blocos:
+        # A regra de extração antiga e menos confiável
+        padrao_operacao = RE_OPERACAO.search(bloco)
+        
+        padrao_nota_cliente = RE_NOTA_CLIENTE.search(bloco)
+        padrao_cpf_cnpj = RE_CPF_CNPJ.search(bloco)
+        padrao_cidade_data = RE_CIDADE_DATA.search(bloco)
+        padrao_total_nota = RE_TOTAL_NOTA.search(bloco)
+        padrao_representante = RE_REPRESENTANTE.search(bloco)
+        padrao_pagamento_com_data = RE_PAGAMENTO_COM_DATA.search(bloco)
+        padrao_pagamento_sem_valor = RE_PAGAMENTO_SEM_VALOR.search(bloco)
+        padrao_pagamento_a_vista = RE_PAGAMENTO_A_VISTA.search(bloco)
+        padrao_pagamento_cartao = RE_PAGAMENTO_CARTAO.search(bloco)
+        
+        nota = padrao_nota_cliente.group(1).strip() if padrao_nota_cliente else 'N/A'
+        cliente = padrao_nota_cliente.group(2).strip() if padrao_nota_cliente else 'N/A'
+        tipo_operacao = padrao_operacao.group(1).strip() if padrao_operacao else 'N/A'
+        cpf_cnpj = padrao_cpf_cnpj.group(2).strip() if padrao_cpf_cnpj else 'N/A'
+        representante = padrao_representante.group(1).strip() if padrao_representante and padrao_representante.group(1).strip() else 'N/A'
+        cidade, uf, data_emissao = ('N/A', 'N/A', 'N/A')
+        if padrao_cidade_data: cidade, uf, data_emissao = [s.strip() for s in padrao_cidade_data.groups()]
+        total_nota = padrao_total_nota.group(1).strip() if padrao_total_nota else 'N/A'
+        forma_pagto, data_vencimento = ('N/A', 'N/A')
+        if padrao_pagamento_com_data:
+            data_vencimento = padrao_pagamento_com_data.group(1).strip()
+            forma_pagto = padrao_pagamento_com_data.group(2).strip()
+        elif padrao_pagamento_sem_valor: forma_pagto = padrao_pagamento_sem_valor.group(1).strip()
+        elif padrao_pagamento_a_vista: forma_pagto = padrao_pagamento_a_vista.group(1).strip()
+        elif padrao_pagamento_cartao: forma_pagto = padrao_pagamento_cartao.group(1).strip()
+        forma_pagto = _limpar_forma_pagto(forma_pagto)
+        
+        itens_encontrados = RE_ITENS.findall(bloco)
+        if not itens_encontrados: continue
+        _adicionar_registros(dados_finais, itens_encontrados, nome_arquivo_origem, (
+            nota, tipo_operacao, cliente, cpf_cnpj, representante, cidade, uf, data_emissao,
+            total_nota, data_vencimento, forma_pagto))
+    return dados_finais
+
+
+def analisar_relatorio_movimentacao(texto, nome_arquivo_origem):
+    """
+    Varredor de linhas (o do pipeline) montando a lista de dicionários, para
+    comparar com o analisador por regex e com o ConstrutorMovimentacoes.
+    """
+    dados_finais = []
+    for inicio, fim in _localizar_blocos(texto):
+        cabecalho, itens_encontrados = _varrer_bloco(texto[inicio:fim])
+        if not itens_encontrados: continue
+        _adicionar_registros(dados_finais, itens_encontrados, nome_arquivo_origem, cabecalho)
+    return dados_finais
+
+
+def benchmark_extracao_paralela(num_arquivos, num_notas, itens_por_nota, lista_processos, paginas_por_lote):
+    """
+    Compara o tempo de orquestrar_extracao_movimentacoes com diferentes
+    quantidades de processos e confere que todos os modos devolvem o mesmo
+    DataFrame do modo sequencial.
+    """
+    with tempfile.TemporaryDirectory() as pasta:
+        caminhos = gerar_corpus_movimentacoes(pasta, num_arquivos, num_notas, itens_por_nota)
+        # Um arquivo grande para exercitar a divisão por intervalos de páginas
+        caminhos.append(gerar_pdf_movimentacao(os.path.join(pasta, "Movimentacao_sintetica_grande.pdf"), num_notas * 4, itens_por_nota, semente=999))
+        print(f"Corpus: {len(caminhos)} PDFs sintéticos em '{pasta}'")
+
+        df_referencia = None
+        tempo_referencia = None
+        for num_processos in lista_processos:
+            inicio = time.perf_counter()
+            df = _executar_silenciosamente(orquestrar_extracao_movimentacoes, caminhos, num_processos=num_processos, paginas_por_lote=paginas_por_lote)
+            tempo = time.perf_counter() - inicio
+            if df_referencia is None:
+                df_referencia, tempo_referencia = df, tempo
+            identico = df.equals(df_referencia)
+            print(f"  {num_processos:>3} processo(s): {tempo:8.2f}s | {len(df)} linhas | speedup {tempo_referencia / tempo:5.2f}x | idêntico: {identico}")
+
+
+def benchmark_parser_movimentacao(num_notas, itens_por_nota, repeticoes):
+    """
+    Mede blocos/s do analisador por regex (antigo) e do varredor de linhas
+    sobre o mesmo texto sintético e confere que os registros são idênticos.
+    """
+    texto = gerar_texto_relatorio_movimentacao(num_notas, itens_por_nota)
+    print(f"Texto sintético: {num_notas} notas, {len(texto) / 1e6:.1f} MB")
+    resultados = {}
+    for nome, analisador in (("regex", analisar_relatorio_movimentacao_regex), ("varredor", analisar_relatorio_movimentacao)):
+        melhor = None
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            registros = analisador(texto, "benchmark.pdf")
+            tempo = time.perf_counter() - inicio
+            melhor = tempo if melhor is None else min(melhor, tempo)
+        resultados[nome] = registros
+        print(f"  {nome:<9}: {melhor:7.3f}s | {num_notas / melhor:10.0f} blocos/s | {len(registros)} registros")
+    print(f"  Saída idêntica: {resultados['regex'] == resultados['varredor']}")
+
+
+def benchmark_cache_analise(num_arquivos, num_notas, itens_por_nota):
+    """
+    Mede uma execução sem cache (pasta vazia) e uma segunda execução com o
+    cache cheio, conferindo que as duas devolvem o mesmo DataFrame.
+    """
+    with tempfile.TemporaryDirectory() as pasta:
+        caminhos = gerar_corpus_movimentacoes(pasta, num_arquivos, num_notas, itens_por_nota)
+        pasta_cache = os.path.join(pasta, "cache")
+        resultados = []
+        for rodada in ("cache vazio", "cache cheio"):
+            cache = CacheAnalise(pasta_cache, assinatura_parser(), 1024 ** 3)
+            inicio = time.perf_counter()
+            df = _executar_silenciosamente(orquestrar_extracao_movimentacoes, caminhos, num_processos=1, cache=cache)
+            tempo = time.perf_counter() - inicio
+            resultados.append(df)
+            print(f"  {rodada}: {tempo:8.2f}s | {len(df)} linhas | {cache.resumo()}")
+        print(f"  Saída idêntica: {resultados[0].equals(resultados[1])}")
+
+
+def _medir_pico_memoria(funcao):
+    """Executa a função e devolve (resultado, segundos, pico de memória alocada em MB)."""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    try:
+        resultado = funcao()
+        tempo = time.perf_counter() - inicio
+        pico = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return resultado, tempo, pico / 1e6
+
+
+def benchmark_memoria_streaming(lista_paginas, itens_por_nota, usar_pdf):
+    """
+    Compara o pico de memória da análise com o texto inteiro (''.join das
+    páginas + lista de registros) com o da leitura página a página em lotes.
+    Sem --pdf as páginas vêm direto do gerador sintético (o mesmo texto que o
+    PyPDF2 extrairia), o que isola o custo do analisador; com --pdf elas são
+    extraídas de um PDF gerado, bem mais lento sob o tracemalloc.
+    """
+    with tempfile.TemporaryDirectory() as pasta:
+        for num_paginas in lista_paginas:
+            num_notas = notas_para_paginas(num_paginas, itens_por_nota)
+            if usar_pdf:
+                caminho_pdf = gerar_pdf_movimentacao(os.path.join(pasta, f"memoria_{num_paginas}.pdf"), num_notas, itens_por_nota)
+                paginas = lambda: iterar_paginas_pdf_movimentacao(caminho_pdf)
+            else:
+                paginas = lambda: iterar_textos_paginas_movimentacao(num_notas, itens_por_nota)
+
+            registros, tempo_inteiro, pico_inteiro = _medir_pico_memoria(
+                lambda: len(analisar_relatorio_movimentacao("".join(paginas()), "benchmark.pdf")))
+            registros_lotes, tempo_lotes, pico_lotes = _medir_pico_memoria(
+                lambda: sum(len(lote) for lote in iterar_lotes_movimentacao(paginas(), "benchmark.pdf")))
+            print(f"  {num_paginas:>6} páginas | texto inteiro: {pico_inteiro:8.1f} MB {tempo_inteiro:6.2f}s | "
+                  f"página a página: {pico_lotes:6.1f} MB {tempo_lotes:6.2f}s | mesma contagem: {registros == registros_lotes}")
+
+
+def benchmark_extracao_inventario(num_itens, lista_processos, paginas_por_lote):
+    """
+    Compara a extração do inventário (pdfplumber, layout=True) com diferentes
+    quantidades de processos e confere que o DataFrame é o mesmo do modo sequencial.
+    """
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho_pdf = gerar_pdf_inventario(os.path.join(pasta, "ppReport1inventario_sintetico.pdf"), num_itens)
+        print(f"Inventário sintético: {num_itens} itens")
+        df_referencia = None
+        tempo_referencia = None
+        for num_processos in lista_processos:
+            inicio = time.perf_counter()
+            df = _executar_silenciosamente(orquestrar_extracao_inventario, caminho_pdf, num_processos=num_processos, paginas_por_lote=paginas_por_lote)
+            tempo = time.perf_counter() - inicio
+            if df_referencia is None:
+                df_referencia, tempo_referencia = df, tempo
+            print(f"  {num_processos:>3} processo(s): {tempo:8.2f}s | {len(df)} linhas | speedup {tempo_referencia / tempo:5.2f}x | idêntico: {df.equals(df_referencia)}")
+
+
+def benchmark_construcao_tabela(num_notas, itens_por_nota):
+    """
+    Compara a montagem do DataFrame a partir de uma lista de dicionários (com
+    o movimentacao_map aplicado linha a linha) com o ConstrutorMovimentacoes.
+    Os blocos são analisados antes, então só a montagem é medida.
+    """
+    texto = gerar_texto_relatorio_movimentacao(num_notas, itens_por_nota)
+    notas = []
+    for inicio, fim in _localizar_blocos(texto):
+        cabecalho, itens_encontrados = _varrer_bloco(texto[inicio:fim])
+        if itens_encontrados:
+            notas.append((cabecalho, itens_encontrados))
+    del texto
+
+    def por_dicionarios():
+        dados = []
+        for cabecalho, itens_encontrados in notas:
+            _adicionar_registros(dados, itens_encontrados, "benchmark.pdf", cabecalho)
+        for registro in dados:
+            registro['Movimentação'] = movimentacao_map.get(registro['Tipo de Operação'], 'Outros')
+        return pd.DataFrame(dados)
+
+    def por_colunas():
+        construtor = ConstrutorMovimentacoes("benchmark.pdf")
+        for cabecalho, itens_encontrados in notas:
+            construtor.adicionar_nota(cabecalho, itens_encontrados)
+        return construtor.montar_tabela()
+
+    tabelas = {}
+    for nome, montar in (("dicionários", por_dicionarios), ("colunas", por_colunas)):
+        tabela, tempo, pico = _medir_pico_memoria(montar)
+        tabelas[nome] = tabela
+        memoria_tabela = tabela.memory_usage(deep=True).sum() / 1e6
+        print(f"  {nome:<11}: {tempo:6.2f}s | pico {pico:8.1f} MB | DataFrame {memoria_tabela:7.1f} MB | {len(tabela)} linhas")
+    print(f"  Mesmos valores: {tabelas['dicionários'].equals(tabelas['colunas'].astype(str))}")
+
+
+def benchmark_monitoramento(num_arquivos, num_notas, itens_por_nota, intervalo_segundos, segundos_estavel):
+    """
+    Copia o inventário e depois um PDF de movimentação por vez para uma pasta
+    acompanhada pelo MonitorRelatorios e mede a latência entre a cópia e a
+    entrega das linhas unidas ao destino.
+    """
+    with tempfile.TemporaryDirectory() as pasta:
+        pasta_origem = os.path.join(pasta, "origem")
+        pasta_monitorada = os.path.join(pasta, "monitorada")
+        os.makedirs(pasta_monitorada)
+        caminhos = gerar_corpus_movimentacoes(pasta_origem, num_arquivos, num_notas, itens_por_nota)
+        caminho_inventario = gerar_pdf_inventario(os.path.join(pasta_origem, "Relatorio_ppReport1inventario.pdf"))
+        entregas = []
+
+        def entregar(df_novos, df_inventario):
+            entregas.append(len(df_novos))
+            return True
+
+        monitor = MonitorRelatorios(pasta_monitorada, "ppReport1inventario", entregar, segundos_estavel=segundos_estavel)
+        for caminho in [caminho_inventario] + caminhos:
+            entregas_antes = len(entregas)
+            inicio = time.perf_counter()
+            shutil.copy(caminho, pasta_monitorada)
+            processados = []
+            while not processados:
+                processados = _executar_silenciosamente(monitor.verificar)
+                if not processados:
+                    time.sleep(intervalo_segundos)
+            latencia = time.perf_counter() - inicio
+            linhas = entregas[-1] if len(entregas) > entregas_antes else 0
+            print(f"  {os.path.basename(caminho):<40}: disponível em {latencia:6.2f}s | {linhas} linhas entregues")
+
+
+def benchmark_conversao_numeros(num_valores, proporcao_invalidos, semente=42):
+    """
+    Compara a conversão de números no formato brasileiro feita antes no
+    unir_dataframes (cadeia de str.replace) e no app.py (apply por valor)
+    com o converter_numero_brasileiro, em texto e em coluna categórica.
+    """
+    gerador = np.random.default_rng(semente)
+    valores = gerador.uniform(-50000, 50000, num_valores).round(2)
+    textos = pd.Series([f"{valor:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.') for valor in valores], name='Valor', dtype=object)
+    invalidos = gerador.random(num_valores) < proporcao_invalidos
+    textos[invalidos] = 'ERRO'
+    textos[(gerador.random(num_valores) < 0.01) & ~invalidos] = None
+
+    def caminho_unir():
+        serie = textos.astype(str).str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+        return pd.to_numeric(serie, errors='coerce').fillna(0)
+
+    def caminho_app():
+        temp_series = textos.astype(str).str.replace(',', '.', regex=False)
+        def remove_thousands_separator(value):
+            if pd.isna(value) or value is None: return None
+            parts = str(value).split('.')
+            return "".join(parts[:-1]) + "." + parts[-1] if len(parts) > 1 else value
+        return pd.to_numeric(temp_series.apply(remove_thousands_separator), errors='coerce').fillna(0)
+
+    falhas = {}
+    textos_categoricos = textos.astype('category')
+    caminhos = (("unir_dataframes antigo", caminho_unir), ("app.py antigo (apply)", caminho_app),
+                ("converter (texto)", lambda: converter_numero_brasileiro(textos, falhas=falhas)),
+                ("converter (categórica)", lambda: converter_numero_brasileiro(textos_categoricos)))
+    referencia = None
+    for nome, converter in caminhos:
+        inicio = time.perf_counter()
+        resultado = converter()
+        tempo = time.perf_counter() - inicio
+        if referencia is None:
+            referencia, tempo_referencia = resultado, tempo
+        print(f"  {nome:<24}: {tempo:7.2f}s | {num_valores / tempo / 1e6:6.2f} M valores/s | "
+              f"speedup {tempo_referencia / tempo:5.2f}x | igual ao antigo: {np.allclose(resultado, referencia)}")
+    print(f"  Falhas contadas: {falhas.get('Valor', 0)} (inválidos gerados: {int(invalidos.sum())})")
+
+
+def benchmark_juncao_inventario(num_linhas, itens_por_nota):
+    """
+    Compara a busca do preço de custo pelo merge de descrições limpas por
+    regex (antigo unir_dataframes) com o IndiceInventario (código do item),
+    num histórico de 'num_linhas' movimentações com colunas categóricas.
+    """
+    construtor = ConstrutorMovimentacoes("benchmark.pdf")
+    texto = gerar_texto_relatorio_movimentacao(max(num_linhas // itens_por_nota, 1), itens_por_nota)
+    for inicio, fim in _localizar_blocos(texto):
+        cabecalho, itens_encontrados = _varrer_bloco(texto[inicio:fim])
+        if itens_encontrados:
+            construtor.adicionar_nota(cabecalho, itens_encontrados)
+    del texto
+    df_movs = construtor.montar_tabela()
+    df_inventario = pd.DataFrame(processar_texto_inventario_para_tabela("\n".join(gerar_texto_relatorio_inventario())),
+                                 columns=['Item', 'Descrição', 'UN', 'Saldo', 'Custo Unit', 'Custo Total'])
+
+    def por_descricao():
+        descricao_limpa = df_movs['Item Descrição'].astype(str).str.replace(r'^\d+-\s*', '', regex=True).str.strip().str.replace(r'\s+', ' ', regex=True)
+        inventario = df_inventario[['Descrição', 'Custo Unit']].copy()
+        inventario['Descrição'] = inventario['Descrição'].astype(str).str.strip().str.replace(r'\s+', ' ', regex=True)
+        df_final = pd.merge(df_movs.assign(DESCRICAO_LIMPA=descricao_limpa), inventario, left_on='DESCRICAO_LIMPA', right_on='Descrição', how='left')
+        return converter_numero_brasileiro(df_final['Custo Unit'], valor_padrao=None).to_numpy()
+
+    def por_codigo():
+        indice = IndiceInventario(df_inventario)
+        linhas, _, _ = indice.localizar(df_movs['Item Descrição'])
+        return indice.custo_das_linhas(linhas)
+
+    custos = {}
+    for nome, buscar in (("merge por descrição", por_descricao), ("índice por código", por_codigo)):
+        custos[nome], tempo, pico = _medir_pico_memoria(buscar)
+        print(f"  {nome:<20}: {tempo:6.2f}s | pico {pico:8.1f} MB | {len(df_movs)} linhas")
+    print(f"  Mesmos custos: {np.array_equal(custos['merge por descrição'], custos['índice por código'], equal_nan=True)}")
+
+
+def benchmark_busca_aproximada(num_produtos, num_consultas, semente=42):
+    """
+    Compara a busca da descrição mais parecida pelo IndiceAproximado com a
+    varredura de todas as descrições do inventário (mesma similaridade de Dice),
+    usando consultas com a descrição levemente alterada.
+    """
+    descricoes = [descricao for _, descricao, _, _ in gerar_catalogo_produtos(num_produtos)]
+    gerador = random.Random(semente)
+    esperadas = [gerador.randrange(num_produtos) for _ in range(num_consultas)]
+    consultas = [descricoes[linha].replace("REF", "REF.").replace(" ", "  ", 1) for linha in esperadas]
+
+    inicio = time.perf_counter()
+    indice = IndiceAproximado(descricoes)
+    tempo_indice = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    pelo_indice = [indice.buscar(consulta)[0] for consulta in consultas]
+    tempo_busca = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    por_varredura = []
+    for consulta in consultas:
+        ngramas_consulta = ngramas_descricao(consulta)
+        similaridades = [2 * len(ngramas_consulta & ngramas) / (len(ngramas_consulta) + len(ngramas)) for ngramas in indice.ngramas]
+        por_varredura.append(int(np.argmax(similaridades)))
+    tempo_varredura = time.perf_counter() - inicio
+
+    print(f"  Índice ({num_produtos} descrições): montado em {tempo_indice:.2f}s")
+    print(f"  Busca pelo índice : {tempo_busca:7.2f}s | {num_consultas / tempo_busca:10.0f} consultas/s | acertos {np.mean(np.array(pelo_indice) == esperadas):.1%}")
+    print(f"  Varredura completa: {tempo_varredura:7.2f}s | {num_consultas / tempo_varredura:10.0f} consultas/s | acertos {np.mean(np.array(por_varredura) == esperadas):.1%}")
+
+
+def _gerar_movimentacoes_por_mes(num_linhas, itens_por_nota, num_meses, semente):
+    """Movimentações do corpus sintético com as emissões espalhadas por 'num_meses' meses."""
+    construtor = ConstrutorMovimentacoes("benchmark.pdf")
+    texto = gerar_texto_relatorio_movimentacao(max(num_linhas // itens_por_nota, 1), itens_por_nota)
+    for inicio, fim in _localizar_blocos(texto):
+        cabecalho, itens_encontrados = _varrer_bloco(texto[inicio:fim])
+        if itens_encontrados:
+            construtor.adicionar_nota(cabecalho, itens_encontrados)
+    del texto
+    df_movs = aplicar_esquema_movimentacoes(construtor.montar_tabela())
+    # Espalha as emissões por 'num_meses' meses para o particionamento ter efeito
+    dias = np.random.default_rng(semente).integers(0, num_meses * 30, len(df_movs))
+    df_movs['Data Emissão'] = pd.Timestamp("2024-01-01") + pd.to_timedelta(dias, unit="D")
+    return df_movs
+
+
+def benchmark_armazenamento_local(num_linhas, itens_por_nota, num_meses, semente=42):
+    """
+    Compara o carregamento do dashboard no modo local: o Excel único (lido
+    inteiro com read_excel e filtrado na memória) com o Parquet particionado
+    por mês e o SQLite, que leem só as linhas do filtro. Mede a tabela inteira
+    e um único mês, conferindo que os três devolvem as mesmas linhas.
+    """
+    df_movs = _gerar_movimentacoes_por_mes(num_linhas, itens_por_nota, num_meses, semente)
+    df_estoque = pd.DataFrame(processar_texto_inventario_para_tabela("\n".join(gerar_texto_relatorio_inventario())),
+                              columns=['Item', 'Descrição', 'UN', 'Saldo', 'Custo Unit', 'Custo Total'])
+    mes = df_movs['Data Emissão'].min().date().replace(day=1)
+    filtros_mes = {'data_inicial': mes, 'data_final': (pd.Timestamp(mes) + pd.offsets.MonthEnd(0)).date()}
+    print(f"Movimentações: {len(df_movs)} linhas em {num_meses} meses")
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho_excel = os.path.join(pasta, "dados.xlsx")
+
+        def gravar_excel():
+            with pd.ExcelWriter(caminho_excel, engine='openpyxl') as writer:
+                df_movs.to_excel(writer, sheet_name='Movimentacoes', index=False)
+                df_estoque.to_excel(writer, sheet_name='Estoque', index=False)
+
+        def ler_excel(filtros):
+            dados_excel = pd.read_excel(caminho_excel, sheet_name=None)
+            return filtrar_movimentacoes(aplicar_esquema_movimentacoes(dados_excel['Movimentacoes']), filtros)
+
+        armazenamentos = {"excel": None, "parquet": ArmazenamentoParquet(os.path.join(pasta, "parquet")),
+                          "sqlite": ArmazenamentoSQLite(os.path.join(pasta, "dados.sqlite"))}
+        contagens = {}
+        for nome, armazenamento in armazenamentos.items():
+            inicio = time.perf_counter()
+            if armazenamento is None:
+                gravar_excel()
+            else:
+                _executar_silenciosamente(armazenamento.gravar_movimentacoes, df_movs)
+                _executar_silenciosamente(armazenamento.gravar_estoque, df_estoque)
+            tempo_gravacao = time.perf_counter() - inicio
+            tempos = []
+            for filtros in ({}, filtros_mes):
+                inicio = time.perf_counter()
+                df = _executar_silenciosamente(ler_excel if armazenamento is None else armazenamento.ler_movimentacoes, filtros)
+                tempos.append(time.perf_counter() - inicio)
+                contagens.setdefault(nome, []).append(len(df))
+            print(f"  {nome:<8}: gravação {tempo_gravacao:7.2f}s | tabela inteira {tempos[0]:7.3f}s | um mês {tempos[1]:7.3f}s "
+                  f"| linhas {contagens[nome][0]} / {contagens[nome][1]}")
+        print(f"  Mesmas contagens: {len({tuple(contagem) for contagem in contagens.values()}) == 1}")
+
+
+@contextlib.contextmanager
+def _google_sheets_simulado(servico, credenciais_json, celulas_por_bloco):
+    """
+    Faz o google_sheets_module falar com o 'servico' simulado: a sessão de
+    'credenciais_json' abre as planilhas dele, os baldes de cota seguem o
+    relógio simulado e os escritores gravam blocos de 'celulas_por_bloco' células.
+    """
+    relogio = servico.relogio
+    originais = (envio_planilha_module.BALDE_ESCRITA, envio_planilha_module.BALDE_LEITURA, google_sheets_module.EscritorPlanilha)
+    envio_planilha_module.BALDE_ESCRITA = BaldeFichas(ENVIO_REQUISICOES_POR_MINUTO, relogio=relogio.agora, dormir=relogio.dormir)
+    envio_planilha_module.BALDE_LEITURA = BaldeFichas(LEITURA_REQUISICOES_POR_MINUTO, relogio=relogio.agora, dormir=relogio.dormir)
+    google_sheets_module.EscritorPlanilha = functools.partial(EscritorPlanilha, celulas_por_bloco=celulas_por_bloco,
+                                                              caminho_progresso=None)
+    sessao_planilha_module._SESSOES[credenciais_json] = SessaoPlanilhas(lambda: ClienteSimulado(servico), caminho_chaves=None)
+    try:
+        yield
+    finally:
+        envio_planilha_module.BALDE_ESCRITA, envio_planilha_module.BALDE_LEITURA, google_sheets_module.EscritorPlanilha = originais
+        sessao_planilha_module._SESSOES.pop(credenciais_json, None)
+
+
+def benchmark_sincronizacao_planilha(num_linhas, num_novas, itens_por_nota, latencia_s, escritas_por_minuto,
+                                     probabilidade_falha, celulas_por_requisicao_max, semente=42):
+    """
+    Compara as estratégias de sincronização da aba 'Movimentacoes' contra o
+    Google Sheets simulado (planilha_simulada.py), sem rede: reescrever a aba
+    numa única requisição, reescrevê-la em blocos e só acrescentar as linhas
+    novas. Tudo passa por buscar_dados_existentes e
+    atualizar_dados_no_google_sheets, como no main.py. A planilha já tem o
+    histórico (enviado pelo mesmo caminho, fora da medição) e chegam
+    'num_novas' linhas. O tempo é o do relógio simulado (latência, espera de
+    cota e repetições dos erros injetados): a mesma semente dá sempre o mesmo
+    resultado. No fim a aba é relida para conferir que ficou com todas as
+    linhas. Retorna o resultado de cada estratégia.
+    """
+    df_movs = _gerar_movimentacoes_por_mes(num_linhas, itens_por_nota, 12, semente)
+    num_novas = min(num_novas, len(df_movs))
+    historico = df_movs.iloc[:len(df_movs) - num_novas]
+    novas = df_movs.iloc[len(df_movs) - num_novas:]
+    df_est = pd.DataFrame({'Item': ['1'], 'Descrição': ['PRODUTO 1'], 'Saldo': ['1,0']})
+    chaves_esperadas = sorted(impressoes_digitais(_preparar_para_envio(df_movs), COLUNAS_CHAVE_MOVIMENTACOES))
+    total_celulas = (len(df_movs) + 1) * len(df_movs.columns)
+    print(f"Aba com {len(historico)} linhas; {len(novas)} novas | latência {latencia_s}s, {escritas_por_minuto} escritas/min, "
+          f"falhas {probabilidade_falha:.1%}, até {celulas_por_requisicao_max or 'sem limite de'} células por requisição")
+
+    estrategias = {
+        "reescrita única": (total_celulas, True),
+        "reescrita em blocos": (ENVIO_CELULAS_POR_BLOCO, True),
+        "acréscimo": (ENVIO_CELULAS_POR_BLOCO, False),
+    }
+    nome_planilha, credenciais_json = "COMPROP_Dashboard_Data", "credenciais_simuladas.json"
+    celulas_historico = min(ENVIO_CELULAS_POR_BLOCO, celulas_por_requisicao_max or ENVIO_CELULAS_POR_BLOCO)
+    resultados = []
+    pasta = tempfile.mkdtemp(prefix="benchmark_planilha_")
+    try:
+        for nome, (celulas_por_bloco, reescrever_tudo) in estrategias.items():
+            servico = ServicoSimulado(latencia_s=latencia_s, escritas_por_minuto=escritas_por_minuto, semente=semente,
+                                      celulas_por_requisicao_max=celulas_por_requisicao_max)
+            servico.criar_planilha(nome_planilha)
+            relogio = servico.relogio
+            caminho_indice = os.path.join(pasta, f"indice_{len(resultados)}.npz")
+            with _google_sheets_simulado(servico, credenciais_json, celulas_historico):
+                if not _executar_silenciosamente(atualizar_dados_no_google_sheets, historico, pd.DataFrame(), df_est,
+                                                 nome_planilha, credenciais_json, caminho_indice=caminho_indice):
+                    raise RuntimeError("Falha ao enviar o histórico à planilha simulada.")
+            relogio.dormir(60)  # A cota gasta no histórico não entra na medição
+            antes = {**servico.estatisticas, 'erros_por_codigo': dict(servico.estatisticas['erros_por_codigo'])}
+            inicio = relogio.agora()
+
+            servico.probabilidade_falha = probabilidade_falha
+            random.seed(semente)  # A espera exponencial do EscritorPlanilha tem um acaso
+            erro = None
+            with _google_sheets_simulado(servico, credenciais_json, celulas_por_bloco):
+                try:
+                    df_existentes, _ = _executar_silenciosamente(buscar_dados_existentes, nome_planilha, credenciais_json)
+                    if not _executar_silenciosamente(atualizar_dados_no_google_sheets, novas, df_existentes, df_est, nome_planilha,
+                                                     credenciais_json, reescrever_tudo=reescrever_tudo, caminho_indice=caminho_indice):
+                        erro = "atualizar_dados_no_google_sheets falhou"
+                except Exception as e:
+                    erro = e
+                segundos = relogio.agora() - inicio
+                e = servico.estatisticas
+                chamadas = e['chamadas'] - antes['chamadas']
+                celulas = e['celulas_gravadas'] - antes['celulas_gravadas']
+                erros_por_codigo = {codigo: quantidade - antes['erros_por_codigo'].get(codigo, 0)
+                                    for codigo, quantidade in e['erros_por_codigo'].items()
+                                    if quantidade > antes['erros_por_codigo'].get(codigo, 0)}
+
+                servico.probabilidade_falha = 0.0  # A conferência não entra na medição
+                lido, _ = _executar_silenciosamente(buscar_dados_existentes, nome_planilha, credenciais_json)
+            correto = erro is None and sorted(impressoes_digitais(_preparar_para_envio(lido), COLUNAS_CHAVE_MOVIMENTACOES)) == chaves_esperadas
+            erros = ", ".join(f"{codigo}: {quantidade}" for codigo, quantidade in sorted(erros_por_codigo.items()))
+            print(f"  {nome:<20}: {segundos:8.1f}s simulados | {chamadas:4d} chamadas | {sum(erros_por_codigo.values()):3d} erros "
+                  f"({erros or 'nenhum'}) | {celulas:9d} células | {'OK' if correto else f'FALHOU ({erro})'}")
+            resultados.append({'estrategia': nome, 'segundos': segundos, 'chamadas': chamadas, 'erros_por_codigo': erros_por_codigo,
+                               'celulas': celulas, 'correto': correto})
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+    return resultados
+
+
+def _commit_atual():
+    """Hash curto do commit do repositório (com '+alterado' se houver mudanças não commitadas), ou 'desconhecido'."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        alterado = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+    return commit + ("+alterado" if alterado else "")
+
+
+def _medir_etapa(nome, preparar, executar, unidades, unidade, repeticoes):
+    """
+    Mede uma etapa da suíte: o melhor tempo em 'repeticoes' execuções (sem o
+    tracemalloc, que deixa o código bem mais lento) e, numa execução extra, o
+    pico de memória. 'preparar' gera uma entrada nova para cada execução, fora da medição.
+    """
+    melhor = None
+    for _ in range(repeticoes):
+        entrada = preparar()
+        inicio = time.perf_counter()
+        _executar_silenciosamente(executar, entrada)
+        tempo = time.perf_counter() - inicio
+        melhor = tempo if melhor is None else min(melhor, tempo)
+    entrada = preparar()
+    _, _, pico = _medir_pico_memoria(lambda: _executar_silenciosamente(executar, entrada))
+    return {'etapa': nome, 'segundos': round(melhor, 4), 'unidades': unidades, 'unidade': unidade,
+            'taxa': round(unidades / melhor, 1), 'pico_mb': round(pico, 2)}
+
+
+def benchmark_suite(num_notas, itens_por_nota, num_itens_inventario, paginas_pdf, repeticoes, caminho_resultados, comparar):
+    """
+    Suíte repetível (sementes fixas) com vazão e pico de memória de cada etapa:
+    extração de texto dos PDFs, análise das movimentações e do inventário,
+    unir_dataframes e as agregações do dashboard. O resultado é acrescentado
+    a 'caminho_resultados' (NDJSON) com o commit atual, para comparar commits.
+    """
+    parametros = {'notas': num_notas, 'itens_por_nota': itens_por_nota, 'itens_inventario': num_itens_inventario,
+                  'paginas_pdf': paginas_pdf, 'repeticoes': repeticoes}
+    print(f"Suíte de benchmarks: {parametros}")
+    paginas_movimentacao = list(iterar_textos_paginas_movimentacao(num_notas, itens_por_nota))
+    paginas_inventario = gerar_texto_relatorio_inventario(num_itens_inventario)
+
+    def analisar_movimentacoes(paginas):
+        return concatenar_tabelas_movimentacoes([lote.montar_tabela() for lote in iterar_lotes_movimentacao(paginas, "benchmark.pdf")])
+
+    def analisar_inventario(paginas):
+        dados = [linha for pagina in paginas for linha in processar_texto_inventario_para_tabela(pagina)]
+        return pd.DataFrame(dados, columns=['Item', 'Descrição', 'UN', 'Saldo', 'Custo Unit.', 'Custo Total'])
+
+    df_movimentacoes = analisar_movimentacoes(paginas_movimentacao)
+    df_inventario = analisar_inventario(paginas_inventario)
+    df_final = _executar_silenciosamente(unir_dataframes, df_movimentacoes.copy(), df_inventario.copy())
+    df_dashboard = df_final.copy()
+    df_dashboard['Data Emissão'] = pd.to_datetime(df_dashboard['Data Emissão'], format='%d/%m/%Y', errors='coerce')
+
+    etapas = []
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho_pdf = gerar_pdf_movimentacao(os.path.join(pasta, "suite_movimentacao.pdf"), notas_para_paginas(paginas_pdf, itens_por_nota), itens_por_nota)
+        caminho_inventario = gerar_pdf_inventario(os.path.join(pasta, "suite_inventario.pdf"), paginas_pdf * LINHAS_POR_PAGINA)
+        etapas.append(_medir_etapa("extracao_pdf_movimentacao", lambda: caminho_pdf,
+                                   lambda caminho: sum(1 for _ in iterar_paginas_pdf_movimentacao(caminho)),
+                                   contar_paginas_pdf(caminho_pdf), "páginas", repeticoes))
+        etapas.append(_medir_etapa("extracao_pdf_inventario", lambda: caminho_inventario,
+                                   lambda caminho: orquestrar_extracao_inventario(caminho, num_processos=1),
+                                   contar_paginas_pdf(caminho_inventario), "páginas", repeticoes))
+    etapas.append(_medir_etapa("analise_movimentacao", lambda: paginas_movimentacao, analisar_movimentacoes,
+                               len(df_movimentacoes), "registros", repeticoes))
+    etapas.append(_medir_etapa("analise_inventario", lambda: paginas_inventario, analisar_inventario,
+                               len(df_inventario), "linhas", repeticoes))
+    etapas.append(_medir_etapa("unir_dataframes", lambda: (df_movimentacoes.copy(), df_inventario.copy()),
+                               lambda entradas: unir_dataframes(*entradas), len(df_final), "registros", repeticoes))
+    etapas.append(_medir_etapa("agregacoes_dashboard", lambda: df_dashboard, calcular_agregacoes_dashboard,
+                               len(df_dashboard), "registros", repeticoes))
+
+    resultado = {'data': datetime.now().isoformat(timespec='seconds'), 'commit': _commit_atual(),
+                 'python': platform.python_version(), 'pandas': pd.__version__, 'parametros': parametros, 'etapas': etapas}
+    pasta_resultados = os.path.dirname(caminho_resultados)
+    if pasta_resultados:
+        os.makedirs(pasta_resultados, exist_ok=True)
+    with open(caminho_resultados, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+
+    print(pd.DataFrame(etapas).to_string(index=False))
+    print(f"Resultado do commit {resultado['commit']} gravado em '{caminho_resultados}'.")
+    if comparar:
+        comparar_resultados_suite(caminho_resultados, parametros)
+
+
+def comparar_resultados_suite(caminho_resultados, parametros):
+    """Mostra a vazão (taxa) de cada etapa na última execução de cada commit com os mesmos parâmetros."""
+    ultimos_por_commit = {}
+    with open(caminho_resultados, encoding='utf-8') as f:
+        for linha in f:
+            resultado = json.loads(linha)
+            if resultado['parametros'] == parametros:
+                ultimos_por_commit.pop(resultado['commit'], None)
+                ultimos_por_commit[resultado['commit']] = resultado
+    comparacao = pd.DataFrame({commit: {etapa['etapa']: etapa['taxa'] for etapa in resultado['etapas']}
+                               for commit, resultado in ultimos_por_commit.items()})
+    print("\nTaxa (unidades/s) por commit, mesmos parâmetros:")
+    print(comparacao.to_string())
+    if comparacao.shape[1] >= 2:
+        variacao = (comparacao.iloc[:, -1] / comparacao.iloc[:, -2] - 1) * 100
+        print("\nVariação do último commit sobre o anterior (%):")
+        print(variacao.round(1).to_string())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks do pipeline de relatórios da COMPROP.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    p_extracao = subparsers.add_parser("extracao", help="Extração de movimentações com 1/2/4/N processos.")
+    p_extracao.add_argument("--arquivos", type=int, default=8)
+    p_extracao.add_argument("--notas", type=int, default=400)
+    p_extracao.add_argument("--itens", type=int, default=3)
+    p_extracao.add_argument("--processos", type=int, nargs="+", default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    p_extracao.add_argument("--paginas-por-lote", type=int, default=50)
+
+    p_parser = subparsers.add_parser("parser", help="Blocos/s do analisador por regex vs varredor de linhas.")
+    p_parser.add_argument("--notas", type=int, default=20000)
+    p_parser.add_argument("--itens", type=int, default=3)
+    p_parser.add_argument("--repeticoes", type=int, default=3)
+
+    p_cache = subparsers.add_parser("cache", help="Execução com cache de análise vazio vs cheio.")
+    p_cache.add_argument("--arquivos", type=int, default=8)
+    p_cache.add_argument("--notas", type=int, default=400)
+    p_cache.add_argument("--itens", type=int, default=3)
+
+    p_memoria = subparsers.add_parser("memoria", help="Pico de memória: texto inteiro vs leitura página a página.")
+    p_memoria.add_argument("--paginas", type=int, nargs="+", default=[1000, 2000, 4000])
+    p_memoria.add_argument("--itens", type=int, default=3)
+    p_memoria.add_argument("--pdf", action="store_true", help="Extrai as páginas de um PDF gerado em vez de usar o texto sintético.")
+
+    p_inventario = subparsers.add_parser("inventario", help="Extração do inventário com 1/2/4/N processos.")
+    p_inventario.add_argument("--itens", type=int, default=6000)
+    p_inventario.add_argument("--processos", type=int, nargs="+", default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    p_inventario.add_argument("--paginas-por-lote", type=int, default=10)
+
+    p_colunas = subparsers.add_parser("colunas", help="Montagem do DataFrame: lista de dicionários vs colunas categóricas.")
+    p_colunas.add_argument("--notas", type=int, default=50000)
+    p_colunas.add_argument("--itens", type=int, default=3)
+
+    p_suite = subparsers.add_parser("suite", help="Vazão e pico de memória de todas as etapas; grava o resultado para comparar commits.")
+    p_suite.add_argument("--notas", type=int, default=20000)
+    p_suite.add_argument("--paginas", type=int, default=None, help="Tamanho do relatório em páginas (substitui --notas).")
+    p_suite.add_argument("--itens", type=int, default=3)
+    p_suite.add_argument("--itens-inventario", type=int, default=3000)
+    p_suite.add_argument("--paginas-pdf", type=int, default=50, help="Páginas dos PDFs usados nas etapas de extração.")
+    p_suite.add_argument("--repeticoes", type=int, default=3)
+    p_suite.add_argument("--saida", default=os.path.join("benchmarks", "resultados_suite.ndjson"))
+    p_suite.add_argument("--comparar", action="store_true", help="Compara com as execuções anteriores de outros commits.")
+
+    p_monitor = subparsers.add_parser("monitor", help="Latência entre a chegada de um PDF na pasta e a entrega dos dados.")
+    p_monitor.add_argument("--arquivos", type=int, default=5)
+    p_monitor.add_argument("--notas", type=int, default=400)
+    p_monitor.add_argument("--itens", type=int, default=3)
+    p_monitor.add_argument("--intervalo", type=float, default=1.0)
+    p_monitor.add_argument("--segundos-estavel", type=float, default=2.0)
+
+    p_numeros = subparsers.add_parser("numeros", help="Conversão de números brasileiros: caminhos antigos vs converter_numero_brasileiro.")
+    p_numeros.add_argument("--valores", type=int, default=2000000)
+    p_numeros.add_argument("--invalidos", type=float, default=0.001, help="Proporção de valores malformados.")
+
+    p_juncao = subparsers.add_parser("juncao", help="Preço de custo: merge por descrição vs índice por código do item.")
+    p_juncao.add_argument("--linhas", type=int, default=2000000)
+    p_juncao.add_argument("--itens", type=int, default=3)
+
+    p_aproximada = subparsers.add_parser("aproximada", help="Descrição aproximada: índice de n-gramas vs varredura do inventário.")
+    p_aproximada.add_argument("--produtos", type=int, default=20000)
+    p_aproximada.add_argument("--consultas", type=int, default=500)
+
+    p_armazenamento = subparsers.add_parser("armazenamento", help="Carregamento do modo local: Excel único vs Parquet por mês vs SQLite.")
+    p_armazenamento.add_argument("--linhas", type=int, default=100000)
+    p_armazenamento.add_argument("--itens", type=int, default=3)
+    p_armazenamento.add_argument("--meses", type=int, default=12)
+
+    p_planilha = subparsers.add_parser("planilha", help="Envio ao Google Sheets simulado: reescrita única vs em blocos vs acréscimo.")
+    p_planilha.add_argument("--linhas", type=int, default=50000)
+    p_planilha.add_argument("--novas", type=int, default=500)
+    p_planilha.add_argument("--itens", type=int, default=3)
+    p_planilha.add_argument("--latencia", type=float, default=0.3, help="Segundos por chamada à API.")
+    p_planilha.add_argument("--escritas-por-minuto", type=int, default=60, help="Cota de escrita (0 = sem cota).")
+    p_planilha.add_argument("--falhas", type=float, default=0.0, help="Proporção de chamadas que falham com 429/500/503.")
+    p_planilha.add_argument("--celulas-por-requisicao", type=int, default=500000,
+                            help="Maior escrita aceita, aproximando o limite de ~10 MB por requisição (0 = sem limite).")
+    p_planilha.add_argument("--semente", type=int, default=42)
+
+    args = parser.parse_args()
+    if args.benchmark == "extracao":
+        benchmark_extracao_paralela(args.arquivos, args.notas, args.itens, args.processos, args.paginas_por_lote)
+    elif args.benchmark == "parser":
+        benchmark_parser_movimentacao(args.notas, args.itens, args.repeticoes)
+    elif args.benchmark == "cache":
+        benchmark_cache_analise(args.arquivos, args.notas, args.itens)
+    elif args.benchmark == "memoria":
+        benchmark_memoria_streaming(args.paginas, args.itens, args.pdf)
+    elif args.benchmark == "inventario":
+        benchmark_extracao_inventario(args.itens, args.processos, args.paginas_por_lote)
+    elif args.benchmark == "colunas":
+        benchmark_construcao_tabela(args.notas, args.itens)
+    elif args.benchmark == "suite":
+        num_notas = notas_para_paginas(args.paginas, args.itens) if args.paginas else args.notas
+        benchmark_suite(num_notas, args.itens, args.itens_inventario, args.paginas_pdf, args.repeticoes, args.saida, args.comparar)
+    elif args.benchmark == "monitor":
+        benchmark_monitoramento(args.arquivos, args.notas, args.itens, args.intervalo, args.segundos_estavel)
+    elif args.benchmark == "numeros":
+        benchmark_conversao_numeros(args.valores, args.invalidos)
+    elif args.benchmark == "juncao":
+        benchmark_juncao_inventario(args.linhas, args.itens)
+    elif args.benchmark == "aproximada":
+        benchmark_busca_aproximada(args.produtos, args.consultas)
+    elif args.benchmark == "armazenamento":
+        benchmark_armazenamento_local(args.linhas, args.itens, args.meses)
+    elif args.benchmark == "planilha":
+        benchmark_sincronizacao_planilha(args.linhas, args.novas, args.itens, args.latencia, args.escritas_por_minuto,
+                                         args.falhas, args.celulas_por_requisicao, args.semente)
@@ -0,0 +1,90 @@
+# cache_module.py - Cache de análise dos PDFs de movimentação
+# Cada PDF já analisado é guardado em Parquet sob uma chave derivada do
+# conteúdo do arquivo e da assinatura do analisador; um PDF sem alterações
+# nunca é extraído de novo.
+
+import hashlib
+import os
+
+import pandas as pd
+
+
+class CacheAnalise:
+    """
+    Cache endereçado por conteúdo: chave = sha256(bytes do PDF + assinatura do
+    analisador). Mudar o analisador ou o movimentacao_map muda a assinatura e,
+    com isso, todas as chaves. Entradas antigas são descartadas pela ordem do
+    último uso quando a pasta passa de 'tamanho_maximo_bytes'.
+    """
+
+    def __init__(self, pasta, assinatura, tamanho_maximo_bytes):
+        self.pasta = pasta
+        self.assinatura = assinatura
+        self.tamanho_maximo_bytes = tamanho_maximo_bytes
+        self.acertos = 0
+        self.falhas = 0
+        self.removidos = 0
+        self._chaves = {}
+        os.makedirs(pasta, exist_ok=True)
+        self._aplicar_limite()
+
+    def _chave(self, caminho_pdf):
+        info = os.stat(caminho_pdf)
+        identificacao = (caminho_pdf, info.st_size, info.st_mtime_ns)  # Um PDF regravado no mesmo caminho gera outra chave
+        if identificacao not in self._chaves:
+            hash_arquivo = hashlib.sha256()
+            with open(caminho_pdf, 'rb') as f:
+                for pedaco in iter(lambda: f.read(1 << 20), b''):
+                    hash_arquivo.update(pedaco)
+            hash_arquivo.update(self.assinatura.encode())
+            self._chaves[identificacao] = hash_arquivo.hexdigest()
+        return self._chaves[identificacao]
+
+    def _caminho_entrada(self, chave):
+        return os.path.join(self.pasta, f"{chave}.parquet")
+
+    def buscar(self, caminho_pdf):
+        """Retorna o DataFrame guardado para o PDF, ou None se não houver entrada válida."""
+        try:
+            caminho_entrada = self._caminho_entrada(self._chave(caminho_pdf))
+            if not os.path.exists(caminho_entrada):
+                self.falhas += 1
+                return None
+            tabela = pd.read_parquet(caminho_entrada)
+            os.utime(caminho_entrada)  # Marca o uso para a remoção por ordem de acesso
+        except Exception as e:
+            print(f"  [AVISO] Cache ignorado para '{os.path.basename(caminho_pdf)}'. Erro: {e}")
+            self.falhas += 1
+            return None
+        self.acertos += 1
+        return tabela
+
+    def guardar(self, caminho_pdf, tabela):
+        """Grava o DataFrame analisado do PDF e aplica o limite de tamanho da pasta."""
+        try:
+            caminho_entrada = self._caminho_entrada(self._chave(caminho_pdf))
+            caminho_temporario = caminho_entrada + ".tmp"
+            tabela.to_parquet(caminho_temporario, index=False)
+            os.replace(caminho_temporario, caminho_entrada)
+        except Exception as e:
+            print(f"  [AVISO] Não foi possível gravar o cache de '{os.path.basename(caminho_pdf)}'. Erro: {e}")
+            return
+        self._aplicar_limite()
+
+    def _aplicar_limite(self):
+        entradas = []
+        for nome in os.listdir(self.pasta):
+            if nome.endswith(".parquet"):
+                caminho = os.path.join(self.pasta, nome)
+                info = os.stat(caminho)
+                entradas.append((info.st_mtime, info.st_size, caminho))
+        tamanho_total = sum(tamanho for _, tamanho, _ in entradas)
+        for _, tamanho, caminho in sorted(entradas):
+            if tamanho_total <= self.tamanho_maximo_bytes:
+                break
+            os.remove(caminho)
+            tamanho_total -= tamanho
+            self.removidos += 1
+
+    def resumo(self):
+        return f"Cache de análise: {self.acertos} acerto(s), {self.falhas} falha(s), {self.removidos} entrada(s) removida(s)."
@@ -117,7 +117,54 @@ dre_map = {
     "421-AJUSTE LOTE (SAIDA MATRIZ)": "Neutro",
     "422-AJUSTE LOTE (ENTRADA MATRIZ)": "Neutro",
     "324-ENT. MERC. REC. EM CONSIG": "Neutro",
-    "52-ENTRADA DE MERCADORIA EM BONIFICACAO": "Receita",
     "57-ENTRADA MERCADORIA CONTA ORDEM TERCEIROS": "Neutro",
     "327-DEVOLUCAO SIMB. RECEB. EM CONSIG.": "Neutro",
 }
+
+# --- Extração Paralela dos PDFs ---
+NUM_PROCESSOS_EXTRACAO = None  # None = usa todos os núcleos da máquina; 1 = modo sequencial
+PAGINAS_POR_LOTE_EXTRACAO = 200  # PDFs maiores que isso são divididos em intervalos de páginas
+PAGINAS_POR_LOTE_INVENTARIO = 25  # Intervalo de páginas de cada processo na extração do inventário
+TAMANHO_LOTE_REGISTROS = 5000  # Registros por lote na leitura página a página (a memória não cresce com o PDF)
+
+# --- Cache de Análise dos PDFs de Movimentação ---
+USAR_CACHE_ANALISE = True
+PASTA_CACHE_ANALISE = "cache_analise"  # Um arquivo Parquet por PDF já analisado
+TAMANHO_MAXIMO_CACHE_MB = 500  # Entradas menos usadas são removidas acima desse limite
+
+# --- Métricas da Extração ---
+CAMINHO_METRICAS_EXTRACAO = "metricas/metricas_extracao.ndjson"  # Uma linha JSON por arquivo processado em cada execução
+
+# --- Monitoramento da Pasta de Relatórios (python main.py --monitorar) ---
+INTERVALO_MONITORAMENTO_S = 1.0  # Intervalo entre as verificações da pasta
+SEGUNDOS_ARQUIVO_ESTAVEL = 2.0  # Tempo sem mudar de tamanho para um PDF ser considerado completo
+
+# --- Preço de Custo por Descrição Aproximada ---
+USAR_CORRESPONDENCIA_APROXIMADA = True  # Itens sem código/descrição no inventário buscam a descrição mais parecida
+SIMILARIDADE_MINIMA_CUSTO = 0.85  # Similaridade (0 a 1, n-gramas de caracteres) mínima para aceitar a correspondência
+CAMINHO_CACHE_CORRESPONDENCIAS = "cache_analise/correspondencias_custo.json"
+
+# --- Classificação dos Tipos de Operação ---
+CAMINHO_OPERACOES_NAO_MAPEADAS = "metricas/operacoes_nao_mapeadas.csv"  # Reescrito a cada execução
+
+# --- Etapas do Pipeline ---
+PASTA_ARTEFATOS_ETAPAS = "artefatos_etapas"  # Resultado de cada etapa em Parquet; etapas sem alterações não rodam de novo
+CAMINHO_TEMPOS_ETAPAS = "metricas/tempos_etapas.ndjson"
+
+# --- Envio para o Google Sheets ---
+CAMINHO_INDICE_LINHAS_PLANILHA = "cache_analise/indice_linhas_planilha.npz"  # Impressões digitais das linhas já enviadas (reconstruído se não bater com a aba)
+ENVIO_CELULAS_POR_BLOCO = 40000  # Células por requisição de escrita (cada bloco vai para um intervalo fixo da aba)
+ENVIO_REQUISICOES_POR_MINUTO = 50  # Abaixo da cota de escrita do Google (60 por minuto por usuário)
+ENVIO_MAX_TENTATIVAS = 6  # Tentativas por requisição em erros temporários (429, 5xx), com espera exponencial
+LEITURA_REQUISICOES_POR_MINUTO = 50  # Leituras por minuto (a cota de leitura do Google também é 60 por minuto por usuário)
+LEITURA_ABAS_EM_PARALELO = 4  # Abas lidas ao mesmo tempo por ler_abas
+CAMINHO_PROGRESSO_ENVIO = "cache_analise/progresso_envio.json"  # Blocos já confirmados de um envio interrompido
+PASTA_ESPELHO_PLANILHA = "cache_analise/espelho_planilha"  # Cópia local das abas, relida da planilha só quando ela mudou fora do pipeline (None desliga)
+SHEETS_CONEXOES_HTTP = 8  # Conexões HTTP mantidas abertas pelo cliente compartilhado do Google Sheets
+CAMINHO_CHAVES_PLANILHAS = "cache_analise/chaves_planilhas.json"  # Nome -> chave das planilhas já abertas (evita a busca no Drive)
+PLANILHA_ABAS_MENSAIS = False  # True: movimentações em uma aba por mês ('Mov_AAAA_MM') + aba 'Manifesto'; a aba única é migrada no primeiro envio
+
+# --- Armazenamento do Modo Local ---
+ARMAZENAMENTO_LOCAL = "excel"  # "excel": CAMINHO_EXCEL_LOCAL reescrito a cada execução; "sqlite" ou "parquet": gravados de forma incremental
+CAMINHO_SQLITE = r'C:\Users\consultor.ale\Desktop\Mamede\Relatórios\COMPROP_Dashboard_Data.sqlite'
+PASTA_PARQUET_LOCAL = r'C:\Users\consultor.ale\Desktop\Mamede\Relatórios\COMPROP_Dashboard_Data'  # Um arquivo Parquet por mês de emissão
@@ -0,0 +1,249 @@
+# corpus_sintetico.py - Gerador de relatórios sintéticos para benchmarks
+# Gera texto e PDFs no mesmo layout que o pdf_parser_module espera, sem
+# depender de relatórios reais de clientes. Movimentações e inventário usam o
+# mesmo catálogo de produtos, então unir_dataframes encontra o custo dos itens.
+
+import os
+import random
+from datetime import date, timedelta
+
+OPERACOES_SINTETICAS = [
+    "1-VENDA DE MERCADORIAS - COOPERADO",
+    "319-VENDA DE MERCADORIAS - NAO COOPERADO",
+    "321-COMPRA PARA COMERCIALIZACAO",
+    "2-DEVOLUCAO DE VENDA NF PROPRIA",
+    "20-TRANSFERENCIA DE MERCADORIA SAIDA",
+    "28-COMPRA DE MATERIAL USO E CONSUMO",
+]
+CLIENTES_SINTETICOS = ["JOAO DA SILVA", "MARIA APARECIDA SOUZA", "AGROPECUARIA BOA VISTA LTDA", "JOSE CARLOS PEREIRA", "FAZENDA SANTA RITA"]
+CIDADES_SINTETICAS = [("UBERLANDIA", "MG"), ("PATOS DE MINAS", "MG"), ("RIO VERDE", "GO"), ("FRANCA", "SP")]
+REPRESENTANTES_SINTETICOS = ["CARLOS EDUARDO", "ANA PAULA", "ROBERTO LIMA", ""]
+PRODUTOS_SINTETICOS = [
+    ("RACAO BOVINA 22% PROTEINA 30KG", "SC"),
+    ("SAL MINERAL PHOSBOVI 30KG", "SC"),
+    ("ARAME FARPADO 500M", "RL"),
+    ("VACINA AFTOSA 50 DOSES", "FR"),
+    ("OLEO DIESEL S10", "LT"),
+    ("SEMENTE MILHO HIBRIDO", "KG"),
+]
+LINHAS_POR_PAGINA = 60
+NUM_PRODUTOS_CATALOGO = 300
+SEMENTE_CATALOGO = 7
+
+
+def formatar_valor_br(valor, casas=2):
+    """Formata um float no padrão brasileiro usado nos relatórios (ex: 1.234,56)."""
+    numero_us = f"{valor:,.{casas}f}"
+    return numero_us.replace(',', '#').replace('.', ',').replace('#', '.')
+
+
+def gerar_catalogo_produtos(num_produtos=NUM_PRODUTOS_CATALOGO, semente=SEMENTE_CATALOGO):
+    """
+    Retorna o catálogo sintético: lista de (código, descrição, unidade, custo
+    unitário). Para a mesma semente, um catálogo maior começa com os mesmos
+    produtos de um menor.
+    """
+    gerador = random.Random(semente)
+    catalogo = []
+    for indice in range(num_produtos):
+        descricao, unidade = PRODUTOS_SINTETICOS[indice % len(PRODUTOS_SINTETICOS)]
+        catalogo.append((1000000 + indice, f"{descricao} REF{indice:04d}", unidade, round(gerador.uniform(1, 2000), 4)))
+    return catalogo
+
+
+CATALOGO_SINTETICO = gerar_catalogo_produtos()
+
+
+def linhas_por_nota(itens_por_nota):
+    """Número de linhas de um bloco de nota gerado por gerar_linhas_nota."""
+    return 5 + itens_por_nota + 3
+
+
+def notas_para_paginas(num_paginas, itens_por_nota=3, linhas_por_pagina=LINHAS_POR_PAGINA):
+    """Quantidade aproximada de notas para o relatório ocupar 'num_paginas' páginas."""
+    return max(1, num_paginas * linhas_por_pagina // linhas_por_nota(itens_por_nota))
+
+
+def gerar_linhas_nota(gerador, numero_nota, data_emissao, itens_por_nota):
+    """Gera as linhas de um bloco de nota no layout do relatório de movimentações."""
+    cliente = gerador.choice(CLIENTES_SINTETICOS)
+    cidade, uf = gerador.choice(CIDADES_SINTETICAS)
+    prefixo_nota = f"{numero_nota}-NFSE" if gerador.random() < 0.05 else str(numero_nota)
+    linhas = [
+        f"{prefixo_nota} Nota {cliente} Cli-{gerador.randint(100, 99999)}",
+        f"CPF: {gerador.randint(100, 999)}.{gerador.randint(100, 999)}.{gerador.randint(100, 999)}-{gerador.randint(10, 99)}",
+        f"Cidade: {cidade} UF: {uf}Data Emissão: {data_emissao.strftime('%d/%m/%Y')}",
+        f"Carga: {gerador.choice(OPERACOES_SINTETICAS)}",
+        f"Repre - {gerador.choice(REPRESENTANTES_SINTETICOS)}",
+    ]
+    total_nota = 0.0
+    for numero_item in range(1, itens_por_nota + 1):
+        codigo, descricao, unidade, custo_unitario = gerador.choice(CATALOGO_SINTETICO)
+        quantidade = gerador.randint(1, 500)
+        valor_unitario = round(custo_unitario * gerador.uniform(1.1, 1.6), 2)
+        total_item = round(quantidade * valor_unitario, 2)
+        total_nota += total_item
+        linhas.append(
+            f"{codigo}-{descricao} {unidade} {formatar_valor_br(valor_unitario)} "
+            f"{formatar_valor_br(total_item)} {formatar_valor_br(valor_unitario)} 5102 Item: {numero_item} {formatar_valor_br(quantidade, 3)}"
+        )
+    linhas.append(f"Total da Nota {formatar_valor_br(total_nota)} 0,00 {formatar_valor_br(total_nota)}")
+    linhas.append("Forma Pagto Vencimento Parcela Valor")
+    sorteio = gerador.random()
+    if sorteio < 0.6:
+        vencimento = data_emissao + timedelta(days=30)
+        linhas.append(f"{formatar_valor_br(total_nota)} {vencimento.strftime('%d/%m/%Y')} 1-1 3 PAGAMENTO A PRAZO")
+    elif sorteio < 0.8:
+        linhas.append(f"{formatar_valor_br(total_nota)} 1 À vista")
+    elif sorteio < 0.9:
+        linhas.append(f"{formatar_valor_br(total_nota)} 4 Cartão de Crédito")
+    else:
+        linhas.append("0,00 6 Sem valor comercial")
+    return linhas
+
+
+def iterar_linhas_relatorio_movimentacao(num_notas=200, itens_por_nota=3, semente=42, data_inicial=date(2026, 10, 1)):
+    """
+    Gera, uma a uma, as linhas de um relatório sintético de movimentações, com
+    totais por dia e um rodapé geral, no formato esperado pelo analisador de movimentações.
+    """
+    gerador = random.Random(semente)
+    data_atual = data_inicial
+    for indice_nota in range(num_notas):
+        if indice_nota and gerador.random() < 0.1:
+            yield f"Total do Dia {formatar_valor_br(gerador.uniform(1000, 90000))}"
+            data_atual += timedelta(days=1)
+        yield from gerar_linhas_nota(gerador, 10000 + indice_nota, data_atual, itens_por_nota)
+    yield f"Total do Dia {formatar_valor_br(gerador.uniform(1000, 90000))}"
+    yield f"Total do Estabelecimento {formatar_valor_br(gerador.uniform(1e5, 1e6))}"
+    yield f"T o t a l  G e r a l {formatar_valor_br(gerador.uniform(1e5, 1e6))}"
+
+
+def gerar_linhas_relatorio_movimentacao(num_notas=200, itens_por_nota=3, semente=42, data_inicial=date(2026, 10, 1)):
+    """Retorna a lista completa de linhas do relatório sintético de movimentações."""
+    return list(iterar_linhas_relatorio_movimentacao(num_notas, itens_por_nota, semente, data_inicial))
+
+
+def paginar_linhas(linhas, titulo, linhas_por_pagina=LINHAS_POR_PAGINA):
+    """Quebra as linhas em páginas, repetindo o cabeçalho do relatório em cada uma."""
+    return list(iterar_paginas(linhas, titulo, linhas_por_pagina))
+
+
+def iterar_paginas(linhas, titulo, linhas_por_pagina=LINHAS_POR_PAGINA):
+    """Versão preguiçosa de paginar_linhas: aceita qualquer iterável de linhas e gera uma página por vez."""
+    pagina = []
+    numero_pagina = 0
+    for linha in linhas:
+        if not pagina:
+            numero_pagina += 1
+            pagina.append(f"COMPROP {titulo} Página: {numero_pagina}")
+        pagina.append(linha)
+        if len(pagina) > linhas_por_pagina:
+            yield pagina
+            pagina = []
+    if pagina:
+        yield pagina
+
+
+def iterar_textos_paginas_movimentacao(num_notas=200, itens_por_nota=3, semente=42, linhas_por_pagina=LINHAS_POR_PAGINA):
+    """
+    Gera o texto de cada página do relatório sintético, igual ao que o PyPDF2
+    extrai do PDF correspondente, sem montar o relatório inteiro em memória.
+    """
+    linhas = iterar_linhas_relatorio_movimentacao(num_notas, itens_por_nota, semente)
+    for pagina in iterar_paginas(linhas, "Relatorio de Movimentacoes", linhas_por_pagina):
+        yield "\n".join(pagina) + "\n"
+
+
+def gerar_texto_relatorio_movimentacao(num_notas=200, itens_por_nota=3, semente=42, linhas_por_pagina=LINHAS_POR_PAGINA):
+    """Retorna o relatório sintético completo como texto, já paginado."""
+    return "".join(iterar_textos_paginas_movimentacao(num_notas, itens_por_nota, semente, linhas_por_pagina))
+
+
+def _escapar_texto_pdf(texto):
+    return texto.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def escrever_pdf_texto(caminho_pdf, paginas):
+    """
+    Escreve um PDF mínimo (fonte Helvetica, uma linha de texto por linha da
+    página) que o PyPDF2 e o pdfplumber conseguem ler. Não depende de
+    bibliotecas externas de geração de PDF.
+    """
+    objetos = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Preenchido com a árvore de páginas no final
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    ids_paginas = []
+    for linhas in paginas:
+        comandos = ["BT", "/F1 8 Tf", "10 TL", "20 820 Td"]
+        for linha in linhas:
+            comandos.append(f"({_escapar_texto_pdf(linha)}) Tj T*")
+        comandos.append("ET")
+        conteudo = "\n".join(comandos).encode('cp1252', errors='replace')
+        objetos.append(b"<< /Length %d >>\nstream\n" % len(conteudo) + conteudo + b"\nendstream")
+        id_conteudo = len(objetos)
+        objetos.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % id_conteudo
+        )
+        ids_paginas.append(len(objetos))
+    kids = b" ".join(b"%d 0 R" % i for i in ids_paginas)
+    objetos[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(ids_paginas)
+
+    with open(caminho_pdf, 'wb') as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for numero, corpo in enumerate(objetos, start=1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n" % numero + corpo + b"\nendobj\n")
+        inicio_xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objetos) + 1, inicio_xref))
+    return caminho_pdf
+
+
+def gerar_pdf_movimentacao(caminho_pdf, num_notas=200, itens_por_nota=3, semente=42, linhas_por_pagina=LINHAS_POR_PAGINA):
+    """Gera um PDF sintético de movimentações no caminho informado."""
+    linhas = gerar_linhas_relatorio_movimentacao(num_notas, itens_por_nota, semente)
+    return escrever_pdf_texto(caminho_pdf, paginar_linhas(linhas, "Relatorio de Movimentacoes", linhas_por_pagina))
+
+
+def gerar_linhas_inventario(num_itens=NUM_PRODUTOS_CATALOGO, semente=42):
+    """
+    Gera as linhas de um relatório sintético de inventário (Item, Descrição,
+    UN, Saldo, Custo Unit., Custo Total) com os produtos do catálogo; com
+    num_itens >= NUM_PRODUTOS_CATALOGO todos os itens das movimentações aparecem.
+    """
+    gerador = random.Random(semente)
+    linhas = []
+    for codigo, descricao, unidade, custo_unitario in gerar_catalogo_produtos(num_itens):
+        saldo = gerador.randint(0, 5000)
+        linhas.append(
+            f"{codigo} {descricao} {unidade} {formatar_valor_br(saldo, 3)} "
+            f"{formatar_valor_br(custo_unitario, 4)} {formatar_valor_br(saldo * custo_unitario)}"
+        )
+    return linhas
+
+
+def gerar_texto_relatorio_inventario(num_itens=NUM_PRODUTOS_CATALOGO, semente=42, linhas_por_pagina=LINHAS_POR_PAGINA):
+    """Retorna as páginas do inventário sintético como textos, no formato de processar_texto_inventario_para_tabela."""
+    return ["\n".join(pagina) + "\n" for pagina in paginar_linhas(gerar_linhas_inventario(num_itens, semente), "Inventario", linhas_por_pagina)]
+
+
+def gerar_pdf_inventario(caminho_pdf, num_itens=NUM_PRODUTOS_CATALOGO, semente=42, linhas_por_pagina=LINHAS_POR_PAGINA):
+    """Gera um PDF sintético de inventário no caminho informado."""
+    return escrever_pdf_texto(caminho_pdf, paginar_linhas(gerar_linhas_inventario(num_itens, semente), "Inventario", linhas_por_pagina))
+
+
+def gerar_corpus_movimentacoes(pasta_destino, num_arquivos=4, num_notas=200, itens_por_nota=3):
+    """Gera vários PDFs de movimentação em uma pasta e retorna a lista de caminhos."""
+    os.makedirs(pasta_destino, exist_ok=True)
+    caminhos = []
+    for indice in range(num_arquivos):
+        caminho = os.path.join(pasta_destino, f"Movimentacao_sintetica_{indice + 1:03d}.pdf")
+        caminhos.append(gerar_pdf_movimentacao(caminho, num_notas, itens_por_nota, semente=indice))
+    return caminhos
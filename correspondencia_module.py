@@ -0,0 +1,126 @@
+# correspondencia_module.py - Busca aproximada de itens no inventário
+# Para as movimentações que não acharam o item no inventário nem pelo código
+# nem pela descrição exata, procura a descrição mais parecida por n-gramas de
+# caracteres. O índice invertido é montado uma vez por inventário e os
+# resultados ficam num cache em JSON entre as execuções.
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+def ngramas_descricao(descricao, tamanho=3):
+    """Conjunto de n-gramas de caracteres da descrição (maiúsculas, com espaço nas pontas)."""
+    texto = f" {' '.join(str(descricao).upper().split())} "
+    return frozenset(texto[i:i + tamanho] for i in range(max(len(texto) - tamanho + 1, 1)))
+
+
+class IndiceAproximado:
+    """
+    Índice invertido n-grama -> linhas das descrições. Uma busca só olha as
+    descrições que compartilham n-gramas com a consulta (n-gramas presentes
+    em mais de 'frequencia_maxima' das descrições não geram candidatos) e
+    calcula a similaridade de Dice só para os 'max_candidatos' que mais
+    compartilham n-gramas.
+    """
+
+    def __init__(self, descricoes, tamanho_ngrama=3, max_candidatos=20, frequencia_maxima=0.2):
+        self.descricoes = list(descricoes)
+        self.tamanho_ngrama = tamanho_ngrama
+        self.max_candidatos = max_candidatos
+        self.ngramas = [ngramas_descricao(descricao, tamanho_ngrama) for descricao in self.descricoes]
+        linhas_por_ngrama = {}
+        for linha, ngramas in enumerate(self.ngramas):
+            for ngrama in ngramas:
+                linhas_por_ngrama.setdefault(ngrama, []).append(linha)
+        limite = max(1, int(frequencia_maxima * len(self.descricoes)))
+        self.postagens = {ngrama: np.array(linhas, dtype=np.int32)
+                          for ngrama, linhas in linhas_por_ngrama.items() if len(linhas) <= limite}
+
+    def buscar(self, descricao):
+        """Retorna (linha da descrição mais parecida, similaridade de 0 a 1); (-1, 0.0) sem candidatos."""
+        ngramas_consulta = ngramas_descricao(descricao, self.tamanho_ngrama)
+        listas = [self.postagens[ngrama] for ngrama in ngramas_consulta if ngrama in self.postagens]
+        if not listas:
+            return -1, 0.0
+        linhas, compartilhados = np.unique(np.concatenate(listas), return_counts=True)
+        candidatos = linhas[np.argsort(-compartilhados, kind='stable')[:self.max_candidatos]]
+        melhor_linha, melhor_similaridade = -1, 0.0
+        for linha in candidatos:
+            ngramas_candidato = self.ngramas[linha]
+            similaridade = 2 * len(ngramas_consulta & ngramas_candidato) / (len(ngramas_consulta) + len(ngramas_candidato))
+            if similaridade > melhor_similaridade:
+                melhor_linha, melhor_similaridade = int(linha), similaridade
+        return melhor_linha, melhor_similaridade
+
+
+class CacheCorrespondencias:
+    """
+    Guarda, por descrição procurada, a descrição mais parecida do inventário e
+    a similaridade (mesmo abaixo do limite, que é aplicado na hora do uso).
+    O cache vale para um conjunto de descrições do inventário: se ele mudar,
+    as entradas antigas são descartadas.
+    """
+
+    def __init__(self, caminho_arquivo, descricoes_inventario):
+        self.caminho_arquivo = caminho_arquivo
+        self.assinatura = hashlib.sha256("\n".join(sorted(descricoes_inventario)).encode()).hexdigest()
+        self.entradas = {}
+        self.alterado = False
+        if caminho_arquivo and os.path.exists(caminho_arquivo):
+            try:
+                with open(caminho_arquivo, 'r', encoding='utf-8') as f:
+                    conteudo = json.load(f)
+                if conteudo.get('inventario') == self.assinatura:
+                    self.entradas = conteudo['correspondencias']
+            except Exception as e:
+                print(f"  [AVISO] Cache de correspondências ignorado. Erro: {e}")
+
+    def buscar(self, descricao):
+        return self.entradas.get(descricao)
+
+    def guardar(self, descricao, descricao_inventario, similaridade):
+        self.entradas[descricao] = [descricao_inventario, similaridade]
+        self.alterado = True
+
+    def salvar(self):
+        if not self.caminho_arquivo or not self.alterado:
+            return
+        try:
+            pasta = os.path.dirname(self.caminho_arquivo)
+            if pasta:
+                os.makedirs(pasta, exist_ok=True)
+            caminho_temporario = self.caminho_arquivo + ".tmp"
+            with open(caminho_temporario, 'w', encoding='utf-8') as f:
+                json.dump({'inventario': self.assinatura, 'correspondencias': self.entradas}, f, ensure_ascii=False)
+            os.replace(caminho_temporario, self.caminho_arquivo)
+            self.alterado = False
+        except Exception as e:
+            print(f"  [AVISO] Não foi possível gravar o cache de correspondências. Erro: {e}")
+
+
+def corresponder_descricoes(descricoes, descricoes_inventario, similaridade_minima, caminho_cache=None):
+    """
+    Para cada descrição distinta, retorna {descrição: (posição em
+    'descricoes_inventario', similaridade)} das que passaram do limite.
+    O índice só é montado se alguma descrição não estiver no cache.
+    """
+    cache = CacheCorrespondencias(caminho_cache, descricoes_inventario)
+    posicao_por_descricao = {descricao: posicao for posicao, descricao in enumerate(descricoes_inventario)}
+    indice = None
+    correspondencias = {}
+    for descricao in descricoes:
+        entrada = cache.buscar(descricao)
+        if entrada is None:
+            if indice is None:
+                indice = IndiceAproximado(descricoes_inventario)
+            linha, similaridade = indice.buscar(descricao)
+            entrada = [descricoes_inventario[linha] if linha >= 0 else None, similaridade]
+            cache.guardar(descricao, *entrada)
+        descricao_inventario, similaridade = entrada
+        if descricao_inventario is not None and similaridade >= similaridade_minima:
+            correspondencias[descricao] = (posicao_por_descricao[descricao_inventario], similaridade)
+    cache.salvar()
+    return correspondencias
@@ -0,0 +1,150 @@
+# dashboard_module.py - Cálculos do dashboard
+# Filtros da barra lateral e agregações usadas pelas abas do app.py, separados da interface do Streamlit
+# para poderem ser reutilizadas e medidas pelo benchmark_pipeline.py.
+# As colunas de texto chegam como categorias (esquema_module), por isso os
+# agrupamentos usam observed=True: só aparecem os valores presentes no filtro.
+
+import pandas as pd
+
+
+def opcoes_filtros(df):
+    """Valores que a barra lateral oferece: colunas, datas mínima/máxima e valores distintos das colunas filtráveis."""
+    datas_validas = df['Data Emissão'].dropna() if 'Data Emissão' in df.columns else pd.Series(dtype='datetime64[ns]')
+    def distintos(coluna):
+        return sorted(df[coluna].astype(str).unique()) if coluna in df.columns else None
+    return {
+        'vazio': df.empty,
+        'colunas': list(df.columns),
+        'data_min': datas_validas.min() if not datas_validas.empty else None,
+        'data_max': datas_validas.max() if not datas_validas.empty else None,
+        'clientes': distintos('Cliente') or [],
+        'movimentacoes': distintos('Movimentação') or [],
+        'classificacoes_dre': distintos('Classificação DRE'),
+        'tipos_operacao': distintos('Tipo de Operação'),
+    }
+
+
+def filtrar_movimentacoes(df, filtros):
+    """
+    Aplica os filtros da barra lateral. Chaves de 'filtros' (ausentes ou
+    vazias não filtram): data_inicial/data_final, clientes, movimentacao,
+    classificacao_dre, tipo_operacao e os textos item, nota, forma_pagto e
+    representante. O armazenamento SQLite aplica as mesmas regras em SQL.
+    """
+    if filtros.get('data_inicial') and filtros.get('data_final'):
+        df = df[df['Data Emissão'].dt.date.between(filtros['data_inicial'], filtros['data_final'])]
+    if filtros.get('clientes'):
+        df = df[df['Cliente'].isin(filtros['clientes'])]
+    if filtros.get('movimentacao'):
+        df = df[df['Movimentação'] == filtros['movimentacao']]
+    if filtros.get('classificacao_dre') and 'Classificação DRE' in df.columns:
+        df = df[df['Classificação DRE'] == filtros['classificacao_dre']]
+    if filtros.get('tipo_operacao') and 'Tipo de Operação' in df.columns:
+        df = df[df['Tipo de Operação'] == filtros['tipo_operacao']]
+    if filtros.get('item'):
+        df = df[df['Item Descrição'].str.contains(filtros['item'], case=False, na=False)]
+    if filtros.get('nota'):
+        df = df[df['Nota'].astype(str).str.contains(filtros['nota'], case=False, na=False)]
+    if filtros.get('forma_pagto'):
+        df = df[df['Forma de Pagto'].str.contains(filtros['forma_pagto'], case=False, na=False)]
+    if filtros.get('representante'):
+        df = df[df['Representante'].str.contains(filtros['representante'], case=False, na=False)]
+    return df
+
+
+def separar_transferencias(df_filtrado):
+    """Separa as movimentações de transferência das operacionais. Retorna (transferências, operacional)."""
+    eh_transferencia = df_filtrado['Tipo de Operação'].str.contains("TRANSFERENCIA", case=False, na=False)
+    return df_filtrado[eh_transferencia], df_filtrado[~eh_transferencia]
+
+
+def filtrar_vendas(df_operacional):
+    return df_operacional[df_operacional['Movimentação'] == 'Saída']
+
+
+def calcular_kpis_vendas(df_vendas):
+    """Retorna (valor total vendido, quantidade de pedidos, ticket médio)."""
+    valor_total_vendido = df_vendas['Total do Item'].sum()
+    quantidade_pedidos = df_vendas['Nota'].nunique()
+    ticket_medio = valor_total_vendido / quantidade_pedidos if quantidade_pedidos > 0 else 0
+    return valor_total_vendido, quantidade_pedidos, ticket_medio
+
+
+def calcular_vendas_por_dia(df_vendas):
+    return df_vendas.groupby(df_vendas['Data Emissão'].dt.date, observed=True)['Total do Item'].sum()
+
+
+def calcular_ranking_clientes(df_vendas, quantidade=10):
+    return df_vendas.groupby('Cliente', observed=True)['Total do Item'].sum().nlargest(quantidade).reset_index()
+
+
+def calcular_resumo_dre(df_operacional):
+    """Soma o 'Total do Item' por Classificação DRE e calcula os resultados do DRE simplificado."""
+    dre_summary = df_operacional.groupby('Classificação DRE', observed=True)['Total do Item'].sum()
+    receita = dre_summary.get('Receita', 0)
+    deducoes = dre_summary.get('Dedução de Receita', 0)
+    custos = dre_summary.get('Custo', 0)
+    reducao_custos = dre_summary.get('Redução de Custo', 0)
+    despesas = dre_summary.get('Despesa', 0)
+    receita_liquida = receita - deducoes
+    resultado_bruto = receita_liquida - (custos - reducao_custos)
+    resultado_final = resultado_bruto - despesas
+    return {
+        'receita': receita, 'deducoes': deducoes, 'custos': custos, 'reducao_custos': reducao_custos,
+        'despesas': despesas, 'receita_liquida': receita_liquida, 'resultado_bruto': resultado_bruto,
+        'resultado_final': resultado_final,
+    }
+
+
+def calcular_maiores_por_operacao(df_operacional, classificacao_dre, quantidade=10):
+    """Maiores totais por Tipo de Operação dentro de uma Classificação DRE (ex: 'Receita', 'Despesa')."""
+    df_classificacao = df_operacional[df_operacional['Classificação DRE'] == classificacao_dre]
+    if df_classificacao.empty:
+        return pd.Series(dtype=float)
+    return df_classificacao.groupby('Tipo de Operação', observed=True)['Total do Item'].sum().nlargest(quantidade)
+
+
+def calcular_totais_transferencias(df_transferencias):
+    """Retorna (número de operações, total de entradas, total de saídas)."""
+    total_entradas = df_transferencias[df_transferencias['Movimentação'] == 'Entrada']['Total do Item'].sum()
+    total_saidas = df_transferencias[df_transferencias['Movimentação'] == 'Saída']['Total do Item'].sum()
+    return len(df_transferencias), total_entradas, total_saidas
+
+
+def calcular_movimentacao_diaria(df_operacional):
+    return df_operacional.groupby([df_operacional['Data Emissão'].dt.date, 'Movimentação'], observed=True)['Total do Item'].sum().unstack(fill_value=0)
+
+
+def calcular_ranking_produtos(df_operacional):
+    return df_operacional[df_operacional['Movimentação'] == 'Saída'].groupby('Item Descrição', observed=True).agg(
+        Quantidade_Vendida=('Quantidade', 'sum'),
+        Valor_Total_Vendido=('Total do Item', 'sum')
+    ).sort_values(by='Valor_Total_Vendido', ascending=False).reset_index()
+
+
+def calcular_ranking_vendedores(df_operacional):
+    df_vendedores = df_operacional[(df_operacional['Movimentação'] == 'Saída') & (df_operacional['Representante'] != 'N/A')]
+    if df_vendedores.empty:
+        return pd.DataFrame()
+    return df_vendedores.groupby('Representante', observed=True).agg(
+        Valor_Total_Vendido=('Total do Item', 'sum'),
+        Quantidade_de_Vendas=('Nota', 'nunique')
+    ).sort_values(by='Valor_Total_Vendido', ascending=False).reset_index()
+
+
+def calcular_agregacoes_dashboard(df_filtrado):
+    """Executa todas as agregações das abas do dashboard (usado pelo benchmark)."""
+    df_transferencias, df_operacional = separar_transferencias(df_filtrado)
+    df_vendas = filtrar_vendas(df_operacional)
+    return {
+        'kpis_vendas': calcular_kpis_vendas(df_vendas),
+        'vendas_por_dia': calcular_vendas_por_dia(df_vendas),
+        'ranking_clientes': calcular_ranking_clientes(df_vendas),
+        'resumo_dre': calcular_resumo_dre(df_operacional),
+        'maiores_receitas': calcular_maiores_por_operacao(df_operacional, 'Receita'),
+        'maiores_despesas': calcular_maiores_por_operacao(df_operacional, 'Despesa'),
+        'totais_transferencias': calcular_totais_transferencias(df_transferencias),
+        'movimentacao_diaria': calcular_movimentacao_diaria(df_operacional),
+        'ranking_produtos': calcular_ranking_produtos(df_operacional),
+        'ranking_vendedores': calcular_ranking_vendedores(df_operacional),
+    }
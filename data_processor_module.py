@@ -1,7 +1,165 @@
 # data_processor_module.py (Com a limpeza definitiva)
 
+import os
+import numpy as np
 import pandas as pd
-from config import dre_map
+import pyarrow as pa
+import pyarrow.compute as pc
+from config import USAR_CORRESPONDENCIA_APROXIMADA, SIMILARIDADE_MINIMA_CUSTO, CAMINHO_CACHE_CORRESPONDENCIAS, CAMINHO_OPERACOES_NAO_MAPEADAS
+from correspondencia_module import corresponder_descricoes
+from esquema_module import aplicar_esquema_movimentacoes
+from operacoes_module import TABELA_OPERACOES
+
+VALORES_AUSENTES = ['', 'nan', 'None', 'N/A']  # Tratados como vazio, não como falha de conversão
+PADRAO_NUMERO_CONVERTIDO = r'^-?(\d+\.?\d*|\.\d+)$'  # Depois de trocar o formato brasileiro pelo de ponto decimal
+RE_CODIGO_ITEM = r'^\s*(\d{7,})-'  # Código do produto no início de 'Item Descrição'
+ORIGENS_CUSTO = ['Código', 'Descrição', 'Aproximada', 'Não encontrado']  # Valores da coluna 'Origem do Custo'
+
+
+def converter_numero_brasileiro(serie, valor_padrao=0.0, falhas=None):
+    """
+    Converte uma coluna no formato brasileiro ("1.234,56", "-10,5", "10,5-")
+    para float de forma vetorizada (pyarrow.compute): '.' é sempre separador
+    de milhar e ',' o separador decimal. Vazios e valores inválidos recebem
+    'valor_padrao' (None mantém NaN). Se 'falhas' for um dicionário, recebe em
+    falhas[nome da coluna] quantos valores não vazios não puderam ser convertidos.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # Converte só as categorias (uma vez por valor distinto) e reaproveita os códigos
+        categorias = converter_numero_brasileiro(pd.Series(serie.cat.categories, name=serie.name), None, falhas)
+        codigos = serie.cat.codes.to_numpy()
+        numeros = pd.Series(categorias.to_numpy()[codigos], index=serie.index, name=serie.name)
+        numeros[codigos == -1] = float('nan')
+        return numeros.fillna(valor_padrao) if valor_padrao is not None else numeros
+    if pd.api.types.is_numeric_dtype(serie):
+        numeros = serie.astype('float64')
+        return numeros.fillna(valor_padrao) if valor_padrao is not None else numeros
+
+    ja_numerico = None
+    if pd.api.types.infer_dtype(serie, skipna=True) not in ('string', 'empty'):
+        # Coluna mista (ex: Excel com células numéricas e de texto): números passam direto
+        ja_numerico = serie.map(lambda valor: isinstance(valor, (int, float)) and not isinstance(valor, bool)).to_numpy(dtype=bool)
+    texto = pc.utf8_trim_whitespace(pa.array(serie.astype(str), type=pa.string(), from_pandas=True))
+    ausente = pc.or_(pc.is_null(texto), pc.is_in(texto, value_set=pa.array(VALORES_AUSENTES)))
+    texto = pc.replace_substring(pc.replace_substring(texto, '.', ''), ',', '.')
+    negativo_no_fim = pc.ends_with(texto, '-')
+    if pc.any(negativo_no_fim).as_py():
+        texto = pc.if_else(negativo_no_fim, pc.binary_join_element_wise('-', pc.utf8_slice_codeunits(texto, 0, -1), ''), texto)
+    valido = pc.fill_null(pc.match_substring_regex(texto, PADRAO_NUMERO_CONVERTIDO), False)
+    numeros = pc.cast(pc.if_else(valido, texto, pa.scalar(None, pa.string())), pa.float64())
+    numeros = pd.Series(numeros.to_numpy(zero_copy_only=False), index=serie.index, name=serie.name)
+    if ja_numerico is not None and ja_numerico.any():
+        numeros[ja_numerico] = serie[ja_numerico].astype('float64')
+    if falhas is not None:
+        nao_convertidos = ~(valido.to_numpy(zero_copy_only=False) | pc.fill_null(ausente, True).to_numpy(zero_copy_only=False))
+        if ja_numerico is not None:
+            nao_convertidos &= ~ja_numerico
+        falhas[serie.name] = falhas.get(serie.name, 0) + int(nao_convertidos.sum())
+    return numeros.fillna(valor_padrao) if valor_padrao is not None else numeros
+
+
+def _por_categoria(serie, funcao):
+    """Aplica 'funcao' (vetorizada) só aos valores distintos de uma coluna categórica; outras colunas vão direto."""
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        return funcao(serie)
+    resultado_categorias = funcao(pd.Series(serie.cat.categories))
+    codigos = serie.cat.codes.to_numpy()
+    valores = resultado_categorias.to_numpy()[codigos]
+    return pd.Series(valores, index=serie.index).where(codigos != -1)
+
+
+def limpar_descricao(descricoes):
+    """Tira o prefixo de código ('1234567-') e normaliza os espaços da descrição do item."""
+    return descricoes.astype(str).str.replace(r'^\d+-\s*', '', regex=True).str.strip().str.replace(r'\s+', ' ', regex=True)
+
+
+def extrair_codigo_item(descricoes):
+    """Código numérico do prefixo '1234567-' de 'Item Descrição' (-1 quando não houver código)."""
+    codigos = pd.to_numeric(descricoes.astype(str).str.extract(RE_CODIGO_ITEM, expand=False), errors='coerce')
+    return codigos.fillna(-1).astype('int64')
+
+
+class IndiceInventario:
+    """
+    Índices de hash (pd.Index) do inventário: por código do item ('Item') e,
+    para as movimentações sem código, por descrição limpa. Itens repetidos
+    ficam com a primeira ocorrência. Espera as colunas já normalizadas por
+    unir_dataframes ('Custo Unit' sem o ponto).
+    """
+
+    def __init__(self, df_inventario):
+        self.custo_unitario = converter_numero_brasileiro(df_inventario['Custo Unit'], valor_padrao=None).to_numpy()
+        codigos = pd.to_numeric(df_inventario['Item'], errors='coerce')
+        com_codigo = (codigos.notna() & ~codigos.duplicated()).to_numpy()
+        self.por_codigo = pd.Index(codigos[com_codigo].astype('int64'))
+        self.linhas_por_codigo = np.flatnonzero(com_codigo)
+        descricoes = limpar_descricao(df_inventario['Descrição'])
+        descricao_unica = (~descricoes.duplicated()).to_numpy()
+        self.por_descricao = pd.Index(descricoes[descricao_unica])
+        self.linhas_por_descricao = np.flatnonzero(descricao_unica)
+
+    def localizar(self, descricoes_itens):
+        """
+        Retorna (linha do inventário de cada movimentação, -1 sem correspondência;
+        índice em ORIGENS_CUSTO de cada linha; contagens por tipo de correspondência).
+        Itens com código são buscados só pelo código; a descrição é usada apenas
+        para os itens sem código.
+        """
+        codigos = _por_categoria(descricoes_itens, extrair_codigo_item).fillna(-1).to_numpy(dtype='int64')
+        posicoes = self.por_codigo.get_indexer(codigos)
+        linhas = np.where(posicoes >= 0, self.linhas_por_codigo[posicoes], -1)
+        sem_codigo = codigos == -1
+        if sem_codigo.any():
+            descricoes = _por_categoria(descricoes_itens[sem_codigo], limpar_descricao)
+            posicoes = self.por_descricao.get_indexer(descricoes)
+            linhas[sem_codigo] = np.where(posicoes >= 0, self.linhas_por_descricao[posicoes], -1)
+        encontrado = linhas >= 0
+        origens = np.where(encontrado, np.where(sem_codigo, 1, 0), 3).astype(np.int8)
+        contagens = {
+            'por_codigo': int((encontrado & ~sem_codigo).sum()),
+            'por_descricao': int((encontrado & sem_codigo).sum()),
+            'codigo_fora_do_inventario': int((~encontrado & ~sem_codigo).sum()),
+            'sem_codigo_nem_descricao': int((~encontrado & sem_codigo).sum()),
+        }
+        return linhas, origens, contagens
+
+    def corresponder_aproximado(self, descricoes_itens, linhas, origens, similaridade_minima, caminho_cache=None):
+        """
+        Procura por similaridade de n-gramas (correspondencia_module) a descrição
+        das movimentações ainda sem linha do inventário. Atualiza 'linhas' e
+        'origens' no lugar e retorna quantas linhas foram encontradas.
+        """
+        pendentes = np.flatnonzero(linhas < 0)
+        if len(pendentes) == 0:
+            return 0
+        descricoes = _por_categoria(descricoes_itens.iloc[pendentes], limpar_descricao)
+        correspondencias = corresponder_descricoes(descricoes.dropna().unique(), list(self.por_descricao),
+                                                   similaridade_minima, caminho_cache)
+        posicoes = descricoes.map(lambda descricao: correspondencias.get(descricao, (-1, 0.0))[0]).to_numpy(dtype=np.intp)
+        achados = posicoes >= 0
+        linhas[pendentes[achados]] = self.linhas_por_descricao[posicoes[achados]]
+        origens[pendentes[achados]] = 2
+        return int(achados.sum())
+
+    def custo_das_linhas(self, linhas):
+        return np.where(linhas >= 0, self.custo_unitario[linhas], np.nan)
+
+
+def relatar_operacoes_nao_mapeadas(df_final, caminho_arquivo=CAMINHO_OPERACOES_NAO_MAPEADAS):
+    """Imprime e grava em CSV as operações sem classificação, com linhas e valor total de cada uma."""
+    relatorio = TABELA_OPERACOES.operacoes_nao_mapeadas(df_final)
+    if caminho_arquivo:
+        pasta = os.path.dirname(caminho_arquivo)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        relatorio.to_csv(caminho_arquivo, index=False, sep=';', decimal=',', encoding='utf-8-sig')
+    if relatorio.empty:
+        return relatorio
+    print(f"  [AVISO] {len(relatorio)} tipo(s) de operação sem classificação ({relatorio['Linhas'].sum()} linhas, "
+          f"valor total {relatorio['Valor Total'].sum():.2f}). Lista em '{caminho_arquivo}':")
+    print(relatorio.to_string(index=False))
+    return relatorio
+
 
 def unir_dataframes(df_movimentacoes, df_inventario):
     """
@@ -12,37 +170,51 @@ def unir_dataframes(df_movimentacoes, df_inventario):
     
     df_movimentacoes.columns = [col.strip().replace('.', '') for col in df_movimentacoes.columns]
     df_inventario.columns = [col.strip().replace('.', '') for col in df_inventario.columns]
-    df_movimentacoes['DESCRICAO_LIMPA'] = df_movimentacoes['Item Descrição'].astype(str).str.replace(r'^\d+-\s*', '', regex=True).str.strip().str.replace(r'\s+', ' ', regex=True)
     df_inventario['Descrição'] = df_inventario['Descrição'].astype(str).str.strip().str.replace(r'\s+', ' ', regex=True)
-    
-    df_final = pd.merge(
-        df_movimentacoes,
-        df_inventario[['Descrição', 'Custo Unit']],
-        left_on='DESCRICAO_LIMPA',
-        right_on='Descrição',
-        how='left'
-    )
-    df_final = df_final.rename(columns={'Custo Unit': 'Preço de Custo'})
+
+    # Preço de custo pelo código do item; a descrição só entra para itens sem código
+    indice_inventario = IndiceInventario(df_inventario)
+    linhas_inventario, origens, contagens = indice_inventario.localizar(df_movimentacoes['Item Descrição'])
+    print(f"  > Preço de custo: {contagens['por_codigo']} linha(s) pelo código do item, "
+          f"{contagens['por_descricao']} pela descrição (itens sem código).")
+    sem_custo = contagens['codigo_fora_do_inventario'] + contagens['sem_codigo_nem_descricao']
+    if sem_custo:
+        print(f"  > Sem correspondência exata: {contagens['codigo_fora_do_inventario']} linha(s) com código fora do inventário, "
+              f"{contagens['sem_codigo_nem_descricao']} sem código e sem descrição igual.")
+    if sem_custo and USAR_CORRESPONDENCIA_APROXIMADA:
+        aproximadas = indice_inventario.corresponder_aproximado(df_movimentacoes['Item Descrição'], linhas_inventario, origens,
+                                                                SIMILARIDADE_MINIMA_CUSTO, CAMINHO_CACHE_CORRESPONDENCIAS)
+        print(f"  > {aproximadas} linha(s) encontradas por descrição aproximada (similaridade >= {SIMILARIDADE_MINIMA_CUSTO}).")
+        sem_custo -= aproximadas
+    if sem_custo:
+        print(f"  [AVISO] {sem_custo} linha(s) ficaram sem preço de custo ('Origem do Custo' = 'Não encontrado').")
+    df_final = df_movimentacoes.assign(**{
+        'Preço de Custo': indice_inventario.custo_das_linhas(linhas_inventario),
+        'Origem do Custo': pd.Categorical.from_codes(origens, categories=ORIGENS_CUSTO),
+    })
     
     print("  > Limpando e convertendo colunas de valores...")
     colunas_de_valores = ['Preço de Custo', 'Quantidade', 'Valor Unitário', 'Total do Item', 'Preço de Venda']
     
+    falhas_conversao = {}
     for col in colunas_de_valores:
         if col in df_final.columns:
-            df_final[col] = df_final[col].astype(str).str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
-            df_final[col] = pd.to_numeric(df_final[col], errors='coerce').fillna(0)
+            df_final[col] = converter_numero_brasileiro(df_final[col], falhas=falhas_conversao)
+    for col, quantidade in falhas_conversao.items():
+        if quantidade:
+            print(f"  [AVISO] {quantidade} valor(es) inválido(s) em '{col}' foram convertidos para 0.")
 
     print("  > Calculando o Custo Total...")
     df_final['Custo Total'] = df_final['Preço de Custo'] * df_final['Quantidade']
 
     # --- CORREÇÃO DEFINITIVA AQUI ---
     # Força a limpeza de espaços em branco na coluna chave ANTES de mapear.
-    df_final['Tipo de Operação'] = df_final['Tipo de Operação'].str.strip()
+    df_final['Tipo de Operação'] = _por_categoria(df_final['Tipo de Operação'], lambda tipos: tipos.str.strip())
 
-    # Adiciona a coluna de Classificação DRE
+    # Adiciona as colunas de Movimentação e Classificação DRE pela tabela de operações
     print("  > Classificando as operações no DRE...")
-    df_final['Classificação DRE'] = df_final['Tipo de Operação'].map(dre_map)
-    df_final['Classificação DRE'] = df_final['Classificação DRE'].fillna('Não Classificado')
+    df_final['Movimentação'], df_final['Classificação DRE'] = TABELA_OPERACOES.classificar(df_final['Tipo de Operação'])
+    relatar_operacoes_nao_mapeadas(df_final)
 
     # Define a ordem final das colunas
     print("  > Reorganizando as colunas...")
@@ -53,14 +225,15 @@ def unir_dataframes(df_movimentacoes, df_inventario):
         'Quantidade', 'Valor Unitário', 'Total do Item', 'Preço de Venda', 
         'Preço de Custo', 'Custo Total', 'CFOP', 'Total da Nota', 
         'Data de Vencimento',
-        'Forma de Pagto', 'Arquivo Origem'
+        'Forma de Pagto', 'Arquivo Origem', 'Origem do Custo'
     ]
     
     for col in ordem_final_colunas:
         if col not in df_final.columns:
             df_final[col] = None
 
-    df_final = df_final[ordem_final_colunas]
+    df_final = df_final[ordem_final_colunas].copy()
+    df_final = aplicar_esquema_movimentacoes(df_final)
     
     print("--- ETAPA 3: Concluída com Sucesso! ---")
     return df_final
\ No newline at end of file
@@ -0,0 +1,259 @@
+# envio_planilha_module.py - Escrita em blocos nas abas do Google Sheets
+# Em vez de mandar a tabela inteira numa única requisição, divide os valores
+# em blocos de tamanho limitado, cada um gravado num intervalo fixo da aba
+# (reenviar um bloco não duplica linhas). As requisições passam por um balde
+# de fichas para não estourar a cota por minuto, erros temporários (429 e
+# 5xx) são repetidos com espera exponencial e o progresso fica gravado em
+# disco para que uma nova tentativa continue do último bloco confirmado.
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+
+import pandas as pd
+import requests
+
+from config import (ENVIO_CELULAS_POR_BLOCO, ENVIO_REQUISICOES_POR_MINUTO, ENVIO_MAX_TENTATIVAS, CAMINHO_PROGRESSO_ENVIO,
+                    LEITURA_REQUISICOES_POR_MINUTO)
+
+CODIGOS_TEMPORARIOS = {408, 429, 500, 502, 503, 504}
+
+
+class BaldeFichas:
+    """
+    Limita a taxa de requisições: cada requisição consome uma ficha e as
+    fichas voltam a 'por_minuto' por minuto, até 'capacidade' acumuladas.
+    """
+
+    def __init__(self, por_minuto, capacidade=None, relogio=time.monotonic, dormir=time.sleep):
+        self.taxa_por_segundo = por_minuto / 60.0
+        self.capacidade = capacidade or max(1, por_minuto // 6)
+        self.fichas = float(self.capacidade)
+        self.relogio = relogio
+        self.dormir = dormir
+        self.ultimo = relogio()
+        self._trava = threading.Lock()
+
+    def aguardar(self):
+        """Consome uma ficha, esperando se necessário. Retorna os segundos esperados."""
+        with self._trava:
+            agora = self.relogio()
+            self.fichas = min(self.capacidade, self.fichas + (agora - self.ultimo) * self.taxa_por_segundo)
+            self.ultimo = agora
+            espera = 0.0
+            if self.fichas < 1:
+                espera = (1 - self.fichas) / self.taxa_por_segundo
+                self.dormir(espera)
+                self.fichas, self.ultimo = 1.0, self.relogio()
+            self.fichas -= 1
+            return espera
+
+
+# Um balde por processo para cada cota do Google (escrita e leitura): ela é por usuário, não por aba
+BALDE_ESCRITA = BaldeFichas(ENVIO_REQUISICOES_POR_MINUTO)
+BALDE_LEITURA = BaldeFichas(LEITURA_REQUISICOES_POR_MINUTO)
+
+
+def codigo_http(erro):
+    """Código HTTP de um erro do gspread/requests, ou None."""
+    resposta = getattr(erro, 'response', None)
+    return getattr(resposta, 'status_code', None) or getattr(erro, 'code', None)
+
+
+def erro_temporario(erro):
+    """429, 5xx, timeouts e quedas de conexão valem uma nova tentativa."""
+    if codigo_http(erro) in CODIGOS_TEMPORARIOS:
+        return True
+    return isinstance(erro, (ConnectionError, TimeoutError, requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+def chamar_com_repeticao(chamada, balde, estatisticas=None, max_tentativas=ENVIO_MAX_TENTATIVAS, espera_inicial_s=1.0,
+                         espera_maxima_s=64.0, dormir=None, descricao="", conferir=None):
+    """
+    Executa 'chamada' (sem argumentos) respeitando a cota do balde e
+    repetindo erros temporários com espera exponencial. 'estatisticas'
+    acumula requisições, repetições e esperas, como as do EscritorPlanilha.
+    Só chamadas idempotentes podem ser repetidas às cegas: um erro pode
+    chegar depois de a alteração ter sido aplicada. Para as outras,
+    'conferir' (sem argumentos) roda antes de cada nova tentativa e, se
+    devolver algo diferente de None, a tentativa anterior valeu e esse
+    valor é o resultado.
+    """
+    estatisticas = {'requisicoes': 0, 'repeticoes': 0, 'erros_por_codigo': {}, 'segundos_cota': 0.0,
+                    'segundos_repeticao': 0.0} if estatisticas is None else estatisticas
+    dormir = dormir or balde.dormir
+    for tentativa in range(max_tentativas):
+        estatisticas['segundos_cota'] += balde.aguardar()
+        estatisticas['requisicoes'] += 1
+        try:
+            if tentativa and conferir is not None:
+                resultado = conferir()
+                if resultado is not None:
+                    return resultado
+            return chamada()
+        except Exception as e:
+            if not erro_temporario(e) or tentativa == max_tentativas - 1:
+                raise
+            codigo = str(codigo_http(e) or type(e).__name__)
+            estatisticas['erros_por_codigo'][codigo] = estatisticas['erros_por_codigo'].get(codigo, 0) + 1
+            estatisticas['repeticoes'] += 1
+            espera = min(espera_maxima_s, espera_inicial_s * 2 ** tentativa) + random.uniform(0, 1)
+            print(f"    -> Erro temporário ({codigo}){descricao}; nova tentativa em {espera:.1f}s.")
+            dormir(espera)
+            estatisticas['segundos_repeticao'] += espera
+
+
+def chamar_api(funcao, *args, escrita=False, conferir=None, **kwargs):
+    """
+    Chamada avulsa à API (abrir, criar ou renomear uma aba, ler o cabeçalho)
+    na cota do processo e com repetição dos erros temporários. Chamadas que
+    não são idempotentes (criar ou renomear aba) devem passar 'conferir'
+    (veja chamar_com_repeticao).
+    """
+    return chamar_com_repeticao(lambda: funcao(*args, **kwargs), BALDE_ESCRITA if escrita else BALDE_LEITURA,
+                                conferir=conferir)
+
+
+def valores_para_envio(df):
+    """Linhas do DataFrame como listas de valores aceitos pela API (vazios como '', datas e outros tipos como texto)."""
+    valores = df.astype(object).where(pd.notnull(df), "").values.tolist()
+    return [[valor if isinstance(valor, (str, int, float, bool)) else str(valor) for valor in linha] for linha in valores]
+
+
+def letra_coluna(numero):
+    """1 -> 'A', 27 -> 'AA'."""
+    letras = ''
+    while numero > 0:
+        numero, resto = divmod(numero - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+class EscritorPlanilha:
+    """
+    Grava listas de valores numa aba em blocos de até 'celulas_por_bloco'
+    células. Cada chamada à API passa pelo balde de fichas e é repetida até
+    'max_tentativas' vezes em erros temporários, com espera de
+    espera_inicial_s * 2^tentativa (mais um acaso de até 1s), limitada a
+    espera_maxima_s. As estatísticas acumulam entre as escritas. As esperas
+    usam o 'dormir' do balde, a menos que outro seja passado.
+    """
+
+    def __init__(self, aba, celulas_por_bloco=ENVIO_CELULAS_POR_BLOCO, max_tentativas=ENVIO_MAX_TENTATIVAS,
+                 espera_inicial_s=1.0, espera_maxima_s=64.0, balde=None, caminho_progresso=CAMINHO_PROGRESSO_ENVIO,
+                 dormir=None):
+        self.aba = aba
+        self.celulas_por_bloco = celulas_por_bloco
+        self.max_tentativas = max_tentativas
+        self.espera_inicial_s = espera_inicial_s
+        self.espera_maxima_s = espera_maxima_s
+        self.balde = balde or BALDE_ESCRITA
+        self.caminho_progresso = caminho_progresso
+        self.dormir = dormir or self.balde.dormir
+        self.estatisticas = {'requisicoes': 0, 'blocos': 0, 'blocos_retomados': 0, 'linhas': 0, 'celulas': 0,
+                             'repeticoes': 0, 'erros_por_codigo': {}, 'segundos_cota': 0.0, 'segundos_repeticao': 0.0,
+                             'segundos_total': 0.0}
+
+    def _chamar(self, funcao, *args, **kwargs):
+        """Chama a API respeitando a cota e repetindo erros temporários."""
+        return chamar_com_repeticao(lambda: funcao(*args, **kwargs), self.balde, self.estatisticas, self.max_tentativas,
+                                    self.espera_inicial_s, self.espera_maxima_s, self.dormir, f" na aba '{self.aba.title}'")
+
+    def _assinatura(self, valores, linha_inicial):
+        conteudo = json.dumps([self.aba.title, linha_inicial, valores], ensure_ascii=False, default=str)
+        return hashlib.sha256(conteudo.encode()).hexdigest()
+
+    def _ler_progresso(self):
+        if not self.caminho_progresso or not os.path.exists(self.caminho_progresso):
+            return {}
+        try:
+            with open(self.caminho_progresso, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _gravar_progresso(self, progresso):
+        if not self.caminho_progresso:
+            return
+        pasta = os.path.dirname(self.caminho_progresso)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        caminho_temporario = self.caminho_progresso + ".tmp"
+        with open(caminho_temporario, 'w', encoding='utf-8') as f:
+            json.dump(progresso, f)
+        os.replace(caminho_temporario, self.caminho_progresso)
+
+    def _limpar_progresso(self):
+        if self.caminho_progresso and os.path.exists(self.caminho_progresso):
+            os.remove(self.caminho_progresso)
+
+    def _enviar_blocos(self, valores, linha_inicial, total_colunas, assinatura):
+        """Grava 'valores' a partir de 'linha_inicial', pulando os blocos já confirmados de um envio interrompido."""
+        linhas_por_bloco = max(1, self.celulas_por_bloco // max(total_colunas, 1))
+        progresso = self._ler_progresso()
+        blocos_feitos = progresso.get('blocos_concluidos', 0) if progresso.get('assinatura') == assinatura else 0
+        progresso = {'assinatura': assinatura, 'linha_inicial': linha_inicial}
+        if blocos_feitos:
+            print(f"    -> Retomando envio interrompido na aba '{self.aba.title}' a partir do bloco {blocos_feitos + 1}.")
+            self.estatisticas['blocos_retomados'] += blocos_feitos
+        for numero_bloco, inicio in enumerate(range(0, len(valores), linhas_por_bloco)):
+            if numero_bloco < blocos_feitos:
+                continue
+            bloco = valores[inicio:inicio + linhas_por_bloco]
+            primeira = linha_inicial + inicio
+            intervalo = f"A{primeira}:{letra_coluna(total_colunas)}{primeira + len(bloco) - 1}"
+            self._chamar(self.aba.update, range_name=intervalo, values=bloco, value_input_option='USER_ENTERED')
+            self.estatisticas['blocos'] += 1
+            self.estatisticas['linhas'] += len(bloco)
+            self.estatisticas['celulas'] += len(bloco) * total_colunas
+            self._gravar_progresso({**progresso, 'blocos_concluidos': numero_bloco + 1})
+        self._limpar_progresso()
+
+    def escrever(self, df):
+        """
+        Substitui o conteúdo da aba pelo DataFrame (cabeçalho + linhas). Os
+        blocos são gravados por cima do conteúdo antigo e só no fim a aba é
+        redimensionada, então ela nunca fica vazia para quem está lendo.
+        """
+        inicio = time.perf_counter()
+        valores = [[str(coluna) for coluna in df.columns]] + valores_para_envio(df)
+        total_colunas = max(len(df.columns), 1)
+        if self.aba.row_count < len(valores) or self.aba.col_count < total_colunas:
+            self._chamar(self.aba.resize, rows=max(self.aba.row_count, len(valores)), cols=max(self.aba.col_count, total_colunas))
+        self._enviar_blocos(valores, 1, total_colunas, self._assinatura(valores, 1))
+        self._chamar(self.aba.resize, rows=len(valores), cols=total_colunas)  # Descarta linhas e colunas antigas que sobraram
+        self.estatisticas['segundos_total'] += time.perf_counter() - inicio
+
+    def acrescentar(self, df):
+        """
+        Acrescenta as linhas do DataFrame (sem cabeçalho, nas colunas da aba)
+        depois da última linha preenchida da coluna A.
+        """
+        inicio = time.perf_counter()
+        valores = valores_para_envio(df)
+        total_colunas = max(len(df.columns), 1)
+        progresso = self._ler_progresso()
+        linha_inicial = progresso.get('linha_inicial')
+        # Um envio interrompido das mesmas linhas continua na mesma posição, mesmo com parte delas já na aba
+        if linha_inicial is None or progresso.get('assinatura') != self._assinatura(valores, linha_inicial):
+            linha_inicial = len(self._chamar(self.aba.col_values, 1)) + 1
+        assinatura = self._assinatura(valores, linha_inicial)
+        linhas_necessarias = linha_inicial + len(valores) - 1
+        if self.aba.row_count < linhas_necessarias:
+            # Pede o tamanho final em vez de add_rows: repetir depois de uma resposta perdida não soma as linhas de novo
+            self._chamar(self.aba.resize, rows=linhas_necessarias)
+        self._enviar_blocos(valores, linha_inicial, total_colunas, assinatura)
+        self.estatisticas['segundos_total'] += time.perf_counter() - inicio
+
+    def imprimir_estatisticas(self):
+        e = self.estatisticas
+        segundos = e['segundos_total'] or 1e-9
+        erros = ", ".join(f"{codigo}: {quantidade}" for codigo, quantidade in sorted(e['erros_por_codigo'].items()))
+        print(f"    -> Aba '{self.aba.title}': {e['linhas']} linhas em {e['blocos']} blocos e {e['requisicoes']} requisições, "
+              f"{e['segundos_total']:.1f}s ({e['linhas'] / segundos:.0f} linhas/s, {e['celulas'] / segundos:.0f} células/s).")
+        if e['repeticoes'] or e['segundos_cota'] or e['blocos_retomados']:
+            print(f"    -> {e['repeticoes']} repetições ({erros or 'nenhum erro'}), {e['segundos_repeticao']:.1f}s em espera exponencial, "
+                  f"{e['segundos_cota']:.1f}s aguardando cota, {e['blocos_retomados']} blocos retomados de envio anterior.")
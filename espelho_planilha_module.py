@@ -0,0 +1,99 @@
+# espelho_planilha_module.py - Cópia local das abas da planilha online
+# O main.py lê as abas 'Movimentacoes' e 'Estoque' a cada execução só para
+# achar a última data de emissão e remover duplicatas. O espelho guarda essas
+# abas em Parquet junto com a revisão da planilha (data de modificação no
+# Drive e tamanho de cada aba). Se a revisão remota for a mesma, a leitura é
+# local; a planilha só é baixada de novo na primeira vez ou depois de uma
+# alteração feita fora do pipeline. Depois de cada envio o espelho recebe o
+# que foi gravado e a nova revisão. Sem acesso ao Drive a revisão é
+# desconhecida e as abas são sempre baixadas.
+
+import json
+import os
+
+import pandas as pd
+
+from envio_planilha_module import valores_para_envio, chamar_api
+from leitura_planilha_module import tabela_de_colunas
+
+ABAS_ESPELHADAS = ['Movimentacoes', 'Estoque']
+
+
+def tabela_como_lida(df):
+    """O DataFrame como a leitura da aba (leitura_planilha_module) o devolveria depois de gravado (mesma conversão de tipos)."""
+    if df.empty:
+        return pd.DataFrame(columns=list(df.columns))
+    return tabela_de_colunas([str(coluna) for coluna in df.columns], list(zip(*valores_para_envio(df))))
+
+
+def _para_parquet(df):
+    """Colunas de texto com números misturados (ex.: 'Nota') viram texto; o Parquet exige um tipo por coluna."""
+    df = df.copy()
+    for coluna in df.columns:
+        if df[coluna].dtype == object and pd.api.types.infer_dtype(df[coluna], skipna=True) not in ('string', 'empty'):
+            df[coluna] = df[coluna].map(lambda valor: valor if pd.isnull(valor) else str(valor))
+    return df
+
+
+class EspelhoPlanilha:
+    """
+    Guarda as abas espelhadas em 'pasta' (uma tabela Parquet por aba) e a
+    revisão da planilha em que foram lidas ou gravadas.
+    """
+
+    def __init__(self, pasta):
+        self.pasta = pasta
+        self.caminho_revisao = os.path.join(pasta, 'revisao.json')
+
+    def _caminho_aba(self, aba):
+        return os.path.join(self.pasta, f"{aba}.parquet")
+
+    @staticmethod
+    def revisao_remota(spreadsheet):
+        """
+        Revisão da planilha com duas requisições leves: a data de modificação
+        (Drive) e as dimensões das abas (metadados). Sem acesso ao Drive,
+        None: dimensões e contagens de linhas não mostram células editadas,
+        então a revisão é tratada como desconhecida.
+        """
+        try:
+            modificada_em = chamar_api(spreadsheet.get_lastUpdateTime)
+        except Exception:
+            return None
+        abas = chamar_api(spreadsheet.worksheets)
+        return {'abas': {aba.title: [aba.row_count, aba.col_count] for aba in abas}, 'modificada_em': modificada_em}
+
+    def carregar(self, revisao):
+        """(df_mov, df_est) do espelho se ele foi gravado na mesma revisão, senão None (também com revisão desconhecida)."""
+        if revisao is None:
+            return None
+        try:
+            with open(self.caminho_revisao, 'r', encoding='utf-8') as f:
+                if json.load(f) != revisao:
+                    return None
+            return tuple(pd.read_parquet(self._caminho_aba(aba)) for aba in ABAS_ESPELHADAS)
+        except Exception:
+            return None
+
+    def salvar(self, df_mov, df_est, revisao):
+        """
+        Grava as abas e por último a revisão: um espelho interrompido no meio
+        nunca é considerado válido. Com revisão desconhecida (None) só
+        invalida o espelho antigo.
+        """
+        try:
+            os.makedirs(self.pasta, exist_ok=True)
+            if os.path.exists(self.caminho_revisao):
+                os.remove(self.caminho_revisao)
+            if revisao is None:
+                return
+            for aba, df in zip(ABAS_ESPELHADAS, (df_mov, df_est)):
+                caminho_temporario = self._caminho_aba(aba) + ".tmp"
+                _para_parquet(df).to_parquet(caminho_temporario, index=False)
+                os.replace(caminho_temporario, self._caminho_aba(aba))
+            caminho_temporario = self.caminho_revisao + ".tmp"
+            with open(caminho_temporario, 'w', encoding='utf-8') as f:
+                json.dump(revisao, f)
+            os.replace(caminho_temporario, self.caminho_revisao)
+        except Exception as e:
+            print(f"  [AVISO] Não foi possível gravar o espelho local da planilha. Erro: {e}")
@@ -0,0 +1,42 @@
+# esquema_module.py - Esquema tipado da tabela final de movimentações
+# Aplicado no fim do pipeline (unir_dataframes) e na carga do dashboard
+# (app.py): colunas de texto com poucos valores distintos viram categorias e
+# as datas viram datetime, o que reduz a memória de cada sessão do Streamlit.
+
+import pandas as pd
+
+# Texto repetido em muitas linhas: guardado como categoria (códigos inteiros + valores distintos)
+COLUNAS_CATEGORICAS = [
+    'Movimentação', 'Tipo de Operação', 'Classificação DRE', 'Cliente', 'CPF/CNPJ', 'Representante',
+    'Cidade', 'UF', 'Item Descrição', 'Unidade', 'CFOP', 'Forma de Pagto', 'Arquivo Origem', 'Origem do Custo',
+]
+COLUNAS_DATA = ['Data Emissão', 'Data de Vencimento']  # Texto no formato dd/mm/aaaa
+# Valores em reais e quantidades ficam em float64: são somados no DRE e fazem parte da
+# chave de duplicatas ('Quantidade', 'Total do Item'), então float32 mudaria os totais e a chave.
+COLUNAS_NUMERICAS = ['Quantidade', 'Valor Unitário', 'Total do Item', 'Preço de Venda', 'Preço de Custo', 'Custo Total']
+# Colunas que identificam uma linha de movimentação (remoção de duplicatas no destino)
+COLUNAS_CHAVE_MOVIMENTACOES = ['Nota', 'Data Emissão', 'Item Descrição', 'Quantidade', 'Total do Item']
+
+
+def memoria_mb(df):
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def aplicar_esquema_movimentacoes(df, nome_tabela="movimentações"):
+    """Converte as colunas presentes para o esquema tipado (no lugar) e imprime a memória antes/depois."""
+    memoria_antes = memoria_mb(df)
+    for col in COLUNAS_DATA:
+        if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype):
+            # Converte só os valores distintos; o to_datetime de uma categórica longa devolve outra categórica
+            datas = pd.to_datetime(df[col].cat.categories.astype(str), format='%d/%m/%Y', errors='coerce')
+            df[col] = pd.Series(datas.take(df[col].cat.codes.to_numpy(), allow_fill=True, fill_value=pd.NaT), index=df.index)
+        elif col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], format='%d/%m/%Y', errors='coerce')
+    for col in COLUNAS_CATEGORICAS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    for col in COLUNAS_NUMERICAS:
+        if col in df.columns and pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype('float64')
+    print(f"  > Memória da tabela de {nome_tabela}: {memoria_antes:.1f} MB -> {memoria_mb(df):.1f} MB (esquema tipado).")
+    return df
@@ -0,0 +1,149 @@
+# etapas_module.py - Execução do pipeline em etapas com artefatos memorizados
+# Cada etapa declara de quais etapas depende e quais arquivos lê. O resultado
+# (um DataFrame) é gravado em Parquet com uma impressão digital das entradas e
+# da versão do código; numa nova execução, etapas com a mesma impressão digital
+# são lidas do disco em vez de executadas. Etapas independentes rodam ao mesmo
+# tempo e o tempo de cada uma é registrado.
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+
+import pandas as pd
+
+
+def assinatura_codigo(*modulos, arquivos_extras=()):
+    """Hash do código-fonte dos módulos (e de arquivos extras, ex: config.py) usado como versão de uma etapa."""
+    hash_codigo = hashlib.sha256()
+    for caminho in [modulo.__file__ for modulo in modulos] + list(arquivos_extras):
+        with open(caminho, 'rb') as f:
+            hash_codigo.update(f.read())
+    return hash_codigo.hexdigest()
+
+
+def _identificacao_arquivo(caminho):
+    """Caminho, tamanho e data de modificação: muda sempre que o arquivo é regravado."""
+    info = os.stat(caminho)
+    return [os.path.abspath(caminho), info.st_size, info.st_mtime_ns]
+
+
+class Etapa:
+    def __init__(self, nome, funcao, dependencias=(), arquivos=(), versao=''):
+        self.nome = nome
+        self.funcao = funcao  # Recebe os resultados das dependências, na ordem declarada
+        self.dependencias = tuple(dependencias)
+        self.arquivos = list(arquivos)
+        self.versao = versao
+
+
+class ExecutorEtapas:
+    """
+    Executa um grafo acíclico de etapas. A impressão digital de uma etapa
+    combina nome, versão, arquivos de entrada e as impressões digitais das
+    dependências, então qualquer mudança acima dela força a reexecução.
+    Se uma etapa falhar, as que já terminaram continuam gravadas e a próxima
+    execução recomeça a partir delas.
+    """
+
+    def __init__(self, pasta_artefatos, num_threads=2):
+        self.pasta_artefatos = pasta_artefatos
+        self.num_threads = num_threads
+        self.etapas = {}
+        self.tempos = []  # Um dicionário por etapa: nome, origem ('executada' ou 'artefato'), segundos
+        os.makedirs(pasta_artefatos, exist_ok=True)
+
+    def adicionar(self, nome, funcao, dependencias=(), arquivos=(), versao=''):
+        for dependencia in dependencias:
+            if dependencia not in self.etapas:
+                raise ValueError(f"A etapa '{nome}' depende de '{dependencia}', que ainda não foi adicionada.")
+        self.etapas[nome] = Etapa(nome, funcao, dependencias, arquivos, versao)
+
+    def _impressao_digital(self, etapa, impressoes):
+        conteudo = {
+            'etapa': etapa.nome,
+            'versao': etapa.versao,
+            'arquivos': sorted(_identificacao_arquivo(caminho) for caminho in etapa.arquivos),
+            'dependencias': [impressoes[dependencia] for dependencia in etapa.dependencias],
+        }
+        return hashlib.sha256(json.dumps(conteudo, sort_keys=True).encode()).hexdigest()[:32]
+
+    def _caminho_artefato(self, nome, impressao):
+        return os.path.join(self.pasta_artefatos, f"{nome}-{impressao}.parquet")
+
+    def _executar_etapa(self, etapa, impressao, resultados):
+        inicio = time.perf_counter()
+        caminho_artefato = self._caminho_artefato(etapa.nome, impressao)
+        if os.path.exists(caminho_artefato):
+            try:
+                resultado = pd.read_parquet(caminho_artefato)
+                return resultado, 'artefato', time.perf_counter() - inicio
+            except Exception as e:
+                print(f"  [AVISO] Artefato da etapa '{etapa.nome}' ilegível, executando de novo. Erro: {e}")
+        resultado = etapa.funcao(*[resultados[dependencia] for dependencia in etapa.dependencias])
+        tempo = time.perf_counter() - inicio
+        self._gravar_artefato(etapa.nome, caminho_artefato, resultado)
+        return resultado, 'executada', tempo
+
+    def _gravar_artefato(self, nome, caminho_artefato, resultado):
+        try:
+            caminho_temporario = caminho_artefato + ".tmp"
+            resultado.to_parquet(caminho_temporario, index=False)
+            os.replace(caminho_temporario, caminho_artefato)
+        except Exception as e:
+            print(f"  [AVISO] Não foi possível gravar o artefato da etapa '{nome}'. Erro: {e}")
+            return
+        # Versões anteriores da mesma etapa não serão mais usadas
+        for arquivo in os.listdir(self.pasta_artefatos):
+            caminho = os.path.join(self.pasta_artefatos, arquivo)
+            if arquivo.startswith(f"{nome}-") and arquivo.endswith(".parquet") and caminho != caminho_artefato:
+                os.remove(caminho)
+
+    def executar(self):
+        """Executa todas as etapas respeitando as dependências e retorna {nome: resultado}."""
+        resultados, impressoes = {}, {}
+        pendentes = dict(self.etapas)
+        em_execucao = {}
+        erro = None
+        with ThreadPoolExecutor(max_workers=self.num_threads) as executor:
+            while pendentes or em_execucao:
+                if erro is None:
+                    for nome, etapa in list(pendentes.items()):
+                        if all(dependencia in resultados for dependencia in etapa.dependencias):
+                            impressoes[nome] = self._impressao_digital(etapa, impressoes)
+                            em_execucao[executor.submit(self._executar_etapa, etapa, impressoes[nome], resultados)] = nome
+                            del pendentes[nome]
+                if not em_execucao:
+                    break
+                concluidas, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+                for futuro in concluidas:
+                    nome = em_execucao.pop(futuro)
+                    try:
+                        resultados[nome], origem, tempo = futuro.result()
+                    except Exception as e:
+                        print(f"  [ERRO] Etapa '{nome}' falhou: {e}")
+                        erro = erro or e
+                        continue
+                    self.tempos.append({'etapa': nome, 'origem': origem, 'segundos': round(tempo, 3)})
+                    if origem == 'artefato':
+                        print(f"  > Etapa '{nome}' sem alterações: resultado lido do artefato em {tempo:.2f}s.")
+        if erro is not None:
+            raise erro
+        return resultados
+
+    def imprimir_tempos(self):
+        print("\n--- TEMPO POR ETAPA ---")
+        for registro in self.tempos:
+            print(f"  {registro['etapa']:<15} {registro['origem']:<10} {registro['segundos']:8.2f}s")
+
+    def salvar_tempos_ndjson(self, caminho_arquivo):
+        """Acrescenta os tempos da execução ao arquivo NDJSON, uma linha por etapa."""
+        execucao = datetime.now().isoformat(timespec='seconds')
+        pasta = os.path.dirname(caminho_arquivo)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        with open(caminho_arquivo, 'a', encoding='utf-8') as f:
+            for registro in self.tempos:
+                f.write(json.dumps({'execucao': execucao, **registro}, ensure_ascii=False) + "\n")
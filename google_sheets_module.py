@@ -3,39 +3,52 @@
 
 import pandas as pd
 import gspread
-from gspread_dataframe import get_as_dataframe, set_with_dataframe
 from gspread.exceptions import APIError # <-- 1. IMPORTE A EXCEÇÃO APIError
+from indice_linhas_module import IndiceLinhasPlanilha, impressoes_digitais
+from envio_planilha_module import EscritorPlanilha, chamar_api
+from espelho_planilha_module import EspelhoPlanilha, tabela_como_lida
+from sessao_planilha_module import sessao_planilhas
+from leitura_planilha_module import ler_abas
+from esquema_module import COLUNAS_CHAVE_MOVIMENTACOES
+from abas_mensais_module import (ABA_UNICA, ABA_MANIFESTO, COLUNAS_MANIFESTO, abas_das_linhas, linha_manifesto,
+                                 ler_manifesto, periodo_do_manifesto)
 
-def buscar_dados_existentes(nome_planilha, credenciais_json):
+
+def buscar_dados_existentes(nome_planilha, credenciais_json, pasta_espelho=None):
     """
     Conecta e busca dados das abas 'Movimentacoes' e 'Estoque'.
+    Com 'pasta_espelho', lê a cópia local quando a planilha não mudou desde a
+    última leitura ou envio, e atualiza a cópia quando precisou baixar.
     Se ocorrer um erro de API (como erro 500), levanta uma exceção para parar o script.
     """
     try:
         print("--- LENDO PLANILHA EXISTENTE ---")
-        gc = gspread.service_account(filename=credenciais_json)
-        spreadsheet = gc.open(nome_planilha)
-        
-        df_mov = pd.DataFrame()
-        df_est = pd.DataFrame()
-
-        try:
-            mov_sheet = spreadsheet.worksheet('Movimentacoes')
-            df_mov = get_as_dataframe(mov_sheet, evaluate_formulas=True)
-            df_mov.dropna(how='all', inplace=True)
-            if 'Data Emissão' in df_mov.columns:
-                df_mov['Data Emissão'] = pd.to_datetime(df_mov['Data Emissão'], format='%d/%m/%Y', errors='coerce')
-        except gspread.exceptions.WorksheetNotFound:
-            print("  > Aba 'Movimentacoes' não encontrada. Assumindo como vazia.")
-
-        try:
-            est_sheet = spreadsheet.worksheet('Estoque')
-            df_est = get_as_dataframe(est_sheet, evaluate_formulas=True)
-            df_est.dropna(how='all', inplace=True)
-        except gspread.exceptions.WorksheetNotFound:
-            print("  > Aba 'Estoque' não encontrada. Assumindo como vazia.")
+        spreadsheet = sessao_planilhas(credenciais_json).planilha(nome_planilha)
+
+        espelho = EspelhoPlanilha(pasta_espelho) if pasta_espelho else None
+        if espelho:
+            revisao = espelho.revisao_remota(spreadsheet)
+            dados_espelho = espelho.carregar(revisao)
+            if dados_espelho is not None:
+                df_mov, df_est = dados_espelho
+                print(f"  > Planilha sem alterações desde a última execução: {len(df_mov)} registros de movimentação "
+                      f"e {len(df_est)} de estoque lidos do espelho local.")
+                return df_mov, df_est
+            if revisao is None:
+                print("  > Data de modificação da planilha indisponível (sem acesso ao Drive). Baixando as abas.")
+            else:
+                print("  > Espelho local ausente ou desatualizado. Baixando as abas.")
+
+        # As duas abas são lidas ao mesmo tempo, já com as datas e os números tipados
+        abas = ler_abas(spreadsheet, {'Movimentacoes': None, 'Estoque': None})
+        df_mov, df_est = abas['Movimentacoes'], abas['Estoque']
+        for aba, df in abas.items():
+            if df.empty:
+                print(f"  > Aba '{aba}' não encontrada ou vazia. Assumindo como vazia.")
 
         print(f"  > Leitura concluída: {len(df_mov)} registros de movimentação e {len(df_est)} de estoque encontrados.")
+        if espelho:
+            espelho.salvar(df_mov, df_est, revisao)
         return df_mov, df_est
 
     except APIError as e:
@@ -52,59 +65,287 @@ def buscar_dados_existentes(nome_planilha, credenciais_json):
         print(f"  > ERRO inesperado ao buscar dados existentes: {e}.")
         return pd.DataFrame(), pd.DataFrame()
 
-def atualizar_dados_no_google_sheets(df_mov_novos, df_mov_existentes, df_est_novo, nome_planilha, credenciais_json):
-    """Junta dados, remove duplicatas e atualiza as abas 'Movimentacoes' e 'Estoque'."""
+
+def _preparar_para_envio(df_mov):
+    """Datas como dd/mm/aaaa e vazios (None/NaN) como texto vazio, no formato enviado à planilha."""
+    df_mov_para_envio = df_mov.copy()
+    for coluna in ('Data Emissão', 'Data de Vencimento'):
+        # As datas chegam como data do pipeline e como texto da planilha: envia tudo como dd/mm/aaaa
+        if coluna in df_mov_para_envio.columns:
+            datas = df_mov_para_envio[coluna]
+            if not pd.api.types.is_datetime64_any_dtype(datas):
+                datas = pd.to_datetime(datas.astype(object), format='%d/%m/%Y', errors='coerce')
+            df_mov_para_envio[coluna] = datas.dt.strftime('%d/%m/%Y')
+    return df_mov_para_envio.astype(object).where(pd.notnull(df_mov_para_envio), "")
+
+
+def _reescrever_movimentacoes(escritor, df_mov_novos, df_mov_existentes):
+    """Reescreve a aba inteira: histórico + novas linhas, sem duplicatas e em ordem de data. Retorna o que foi gravado."""
+    df_completo = _preparar_para_envio(pd.concat([df_mov_existentes, df_mov_novos], ignore_index=True))
+    print(f"  > Total de registros antes da limpeza: {len(df_completo)}")
+
+    # A chave é comparada já normalizada, então '123' da planilha e 123 do pipeline são a mesma nota
+    chaves = impressoes_digitais(df_completo, COLUNAS_CHAVE_MOVIMENTACOES)
+    df_final = df_completo[~pd.Series(chaves).duplicated(keep='last').to_numpy()]
+    print(f"  > Total de registros após remover duplicatas: {len(df_final)}")
+
+    datas_emissao = pd.to_datetime(df_final['Data Emissão'].astype(object), format='%d/%m/%Y', errors='coerce')
+    df_final = df_final.iloc[datas_emissao.argsort(kind='stable')]
+
+    escritor.escrever(df_final)
+    print(f"  > Aba '{escritor.aba.title}' reescrita com {len(df_final)} registros.")
+    return df_final
+
+
+def _aba_existente(spreadsheet, titulo):
+    try:
+        return spreadsheet.worksheet(titulo)
+    except gspread.exceptions.WorksheetNotFound:
+        return None
+
+
+def _criar_aba(spreadsheet, titulo):
+    """
+    Cria a aba. Se a resposta de uma tentativa se perder, a aba pode já
+    existir: antes de repetir, ela é procurada pelo título em vez de pedida
+    de novo (o que daria erro 400 'already exists').
+    """
+    return chamar_api(spreadsheet.add_worksheet, title=titulo, rows="1", cols="1", escrita=True,
+                      conferir=lambda: _aba_existente(spreadsheet, titulo))
+
+
+def _aba_ou_nova(spreadsheet, titulo):
+    try:
+        return chamar_api(spreadsheet.worksheet, titulo)
+    except gspread.exceptions.WorksheetNotFound:
+        return _criar_aba(spreadsheet, titulo)
+
+
+def _atualizar_estoque(spreadsheet, df_est):
+    escritor_est = EscritorPlanilha(_aba_ou_nova(spreadsheet, 'Estoque'))
+    escritor_est.escrever(df_est)
+    print(f"  > Aba 'Estoque' atualizada com {len(df_est)} registros.")
+    escritor_est.imprimir_estatisticas()
+
+
+def atualizar_dados_no_google_sheets(df_mov_novos, df_mov_existentes, df_est_novo, nome_planilha, credenciais_json,
+                                     reescrever_tudo=False, caminho_indice=None, pasta_espelho=None):
+    """
+    Atualiza as abas 'Movimentacoes' e 'Estoque'. Por padrão só as linhas
+    que ainda não estão na planilha são acrescentadas ao fim da aba; ela é
+    reescrita inteira (sem duplicatas, em ordem de data) quando
+    'reescrever_tudo' é True, quando a aba está vazia ou tem outras colunas,
+    ou quando alguma linha já enviada veio corrigida.
+    As linhas já enviadas são reconhecidas pelo índice de impressões digitais
+    gravado em 'caminho_indice'; ele é reconstruído a partir de
+    'df_mov_existentes' se estiver ausente ou não bater com a aba.
+    Com 'pasta_espelho', o espelho local recebe as abas como ficaram e a
+    nova revisão da planilha.
+    """
     try:
         print("\n--- ETAPA FINAL: Atualizando dados no Google Sheets ---")
-        
-        # --- Processa as Movimentações ---
-        df_completo = pd.concat([df_mov_existentes, df_mov_novos], ignore_index=True)
-        print(f"  > Total de registros antes da limpeza: {len(df_completo)}")
-
-        colunas_chave = ['Nota', 'Data Emissão', 'Item Descrição', 'Quantidade', 'Total do Item']
-        df_completo['Data Emissão'] = pd.to_datetime(df_completo['Data Emissão'], format='%d/%m/%Y', errors='coerce')
-        df_completo['Data Emissão'] = df_completo['Data Emissão'].dt.date
-        df_final = df_completo.drop_duplicates(subset=colunas_chave, keep='last')
-        print(f"  > Total de registros após remover duplicatas: {len(df_final)}")
-        
-        df_final = df_final.sort_values(by="Data Emissão", ascending=True)
 
         df_est_final = df_est_novo
 
         # --- Salva na Planilha ---
-        gc = gspread.service_account(filename=credenciais_json)
-        spreadsheet = gc.open(nome_planilha)
+        spreadsheet = sessao_planilhas(credenciais_json).planilha(nome_planilha)
         
         # --- ATUALIZA ABA MOVIMENTAÇÕES ---
-        try:
-            mov_sheet = spreadsheet.worksheet('Movimentacoes')
-        except gspread.exceptions.WorksheetNotFound:
-            mov_sheet = spreadsheet.add_worksheet(title="Movimentacoes", rows="1", cols="1")
-        
-        mov_sheet.clear()
-        
-        # --- CORREÇÃO AQUI: Converte tudo para string antes de enviar ---
-        df_mov_para_envio = df_final.copy()
-        df_mov_para_envio['Data Emissão'] = pd.to_datetime(df_mov_para_envio['Data Emissão']).dt.strftime('%d/%m/%Y')
-        # Converte o resto para string, tratando valores vazios (None/NaN) como strings vazias
-        df_mov_para_envio = df_mov_para_envio.astype(object).where(pd.notnull(df_mov_para_envio), "")
+        mov_sheet = _aba_ou_nova(spreadsheet, 'Movimentacoes')
 
-        set_with_dataframe(mov_sheet, df_mov_para_envio, include_index=False, include_column_header=True, resize=True)
-        print(f"  > Aba 'Movimentacoes' atualizada com {len(df_final)} registros.")
+        escritor_mov = EscritorPlanilha(mov_sheet)
+        indice = IndiceLinhasPlanilha(COLUNAS_CHAVE_MOVIMENTACOES, caminho_indice)
+        df_mov_gravado = None  # Conteúdo final da aba, para o espelho local
+        motivo_reescrita = "solicitada" if reescrever_tudo else None
+        if motivo_reescrita is None:
+            colunas_planilha = chamar_api(mov_sheet.row_values, 1)
+            if df_mov_existentes.empty or not colunas_planilha:
+                motivo_reescrita = "aba vazia"
+            elif set(colunas_planilha) != set(df_mov_novos.columns):
+                motivo_reescrita = "colunas da aba diferentes das novas"
+        if motivo_reescrita is None:
+            if not indice.atualizado(colunas_planilha, len(df_mov_existentes)):
+                print(f"  > Reconstruindo o índice das {len(df_mov_existentes)} linhas da aba.")
+                indice.reconstruir(_preparar_para_envio(df_mov_existentes)[colunas_planilha])
+            df_novos_envio = _preparar_para_envio(df_mov_novos)[colunas_planilha]
+            novas, alteradas = indice.classificar(df_novos_envio)
+            if alteradas:
+                motivo_reescrita = f"{alteradas} registros já enviados foram corrigidos"
+            else:
+                print(f"  > {len(df_mov_novos) - int(novas.sum())} de {len(df_mov_novos)} registros já estavam na planilha.")
+                if novas.any():
+                    escritor_mov.acrescentar(df_novos_envio[novas])
+                    indice.acrescentar(df_novos_envio[novas])
+                    print(f"  > {int(novas.sum())} registros novos acrescentados à aba 'Movimentacoes'.")
+                df_mov_gravado = pd.concat([df_mov_existentes, tabela_como_lida(df_novos_envio[novas])], ignore_index=True)
+        if motivo_reescrita is not None:
+            print(f"  > Reescrevendo a aba 'Movimentacoes' inteira ({motivo_reescrita}).")
+            df_reescrito = _reescrever_movimentacoes(escritor_mov, df_mov_novos, df_mov_existentes)
+            indice.reconstruir(df_reescrito)
+            df_mov_gravado = tabela_como_lida(df_reescrito)
+        indice.salvar()
+        escritor_mov.imprimir_estatisticas()
 
         # --- ATUALIZA ABA ESTOQUE ---
-        try:
-            est_sheet = spreadsheet.worksheet('Estoque')
-        except gspread.exceptions.WorksheetNotFound:
-            est_sheet = spreadsheet.add_worksheet(title="Estoque", rows="1", cols="1")
-        
-        est_sheet.clear()
-        df_est_para_envio = df_est_final.astype(object).where(pd.notnull(df_est_final), "")
-        set_with_dataframe(est_sheet, df_est_para_envio, include_index=False, include_column_header=True, resize=True)
-        print(f"  > Aba 'Estoque' atualizada com {len(df_est_final)} registros.")
+        _atualizar_estoque(spreadsheet, df_est_final)
+
+        if pasta_espelho:
+            espelho = EspelhoPlanilha(pasta_espelho)
+            espelho.salvar(df_mov_gravado, tabela_como_lida(df_est_final), espelho.revisao_remota(spreadsheet))
+
+        print("SUCESSO! Dados atualizados no Google Sheets.")
+        return True
+    except Exception as e:
+        print(f"ERRO ao atualizar dados no Google Sheets: {e}")
+        return False
+
+
+class EnvioContinuoPlanilha:
+    """
+    'ao_atualizar' do modo de monitoramento para a aba única. Guarda as
+    movimentações que já estão na planilha ('existentes') e, depois de cada
+    envio, relê a aba (do espelho local gravado pelo envio, quando
+    'pasta_espelho' é dado). Assim a cópia fica igual à aba mesmo quando o
+    monitor reenvia linhas já gravadas ou a aba é reescrita.
+    """
+
+    def __init__(self, nome_planilha, credenciais_json, caminho_indice=None, pasta_espelho=None):
+        self.nome_planilha = nome_planilha
+        self.credenciais_json = credenciais_json
+        self.caminho_indice = caminho_indice
+        self.pasta_espelho = pasta_espelho
+        self.existentes, _ = buscar_dados_existentes(nome_planilha, credenciais_json, pasta_espelho)
+
+    def __call__(self, df_novos, df_inventario):
+        enviado = atualizar_dados_no_google_sheets(df_novos, self.existentes, df_inventario, self.nome_planilha, self.credenciais_json,
+                                                   caminho_indice=self.caminho_indice, pasta_espelho=self.pasta_espelho)
+        if enviado:
+            self.existentes, _ = buscar_dados_existentes(self.nome_planilha, self.credenciais_json, self.pasta_espelho)
+        sessao_planilhas(self.credenciais_json).imprimir_estatisticas()
+        return bool(enviado)
+
+
+def buscar_ultima_data_emissao(nome_planilha, credenciais_json):
+    """
+    Última 'Data Emissão' do layout em abas mensais, lida do manifesto sem
+    baixar as movimentações. Antes da migração, vem só da coluna de datas da
+    aba única. None se não houver nenhuma data.
+    """
+    try:
+        print("--- LENDO O MANIFESTO DA PLANILHA ---")
+        spreadsheet = sessao_planilhas(credenciais_json).planilha(nome_planilha)
+        _, ultima_data = periodo_do_manifesto(ler_manifesto(spreadsheet))
+        datas = [ultima_data] if ultima_data is not None else []
+        datas_antigas = ler_abas(spreadsheet, {ABA_UNICA: ['Data Emissão']})[ABA_UNICA]
+        if not datas_antigas.empty:
+            print(f"  > Aba '{ABA_UNICA}' ainda não migrada: {len(datas_antigas)} datas lidas dela.")
+            datas.append(datas_antigas['Data Emissão'].max())
+        datas = [data for data in datas if not pd.isnull(data)]
+        ultima_data = max(datas) if datas else None
+        print(f"  > Última data de emissão na planilha: {ultima_data.strftime('%d/%m/%Y') if ultima_data is not None else 'nenhuma'}.")
+        return ultima_data
+    except APIError as e:
+        print(f"  > ERRO CRÍTICO DE API: Ocorreu um erro ao comunicar com o Google Sheets (ex: Erro 500).")
+        print(f"  > Detalhes: {e}")
+        raise RuntimeError("Falha na leitura do manifesto. O processo será interrompido para proteger os dados.")
+    except gspread.exceptions.SpreadsheetNotFound:
+        print(f"  > AVISO: A planilha '{nome_planilha}' não foi encontrada. Assumindo dados vazios.")
+        return None
+
+
+def _atualizar_aba_mensal(spreadsheet, abas, titulo, df_mov_novos, df_mov_existentes):
+    """
+    Acrescenta as linhas novas de um mês à sua aba, ou a reescreve (aba nova
+    ou vazia, colunas diferentes, linhas já enviadas que vieram corrigidas).
+    Retorna o conteúdo final da aba no formato de envio.
+    """
+    if titulo not in abas:
+        abas[titulo] = _criar_aba(spreadsheet, titulo)
+    escritor = EscritorPlanilha(abas[titulo])
+    df_novos_envio = _preparar_para_envio(df_mov_novos)
+    motivo_reescrita = None
+    if df_mov_existentes.empty:
+        motivo_reescrita = "aba nova ou vazia"
+    elif set(df_mov_existentes.columns) != set(df_novos_envio.columns):
+        motivo_reescrita = "colunas da aba diferentes das novas"
+    else:
+        colunas_aba = list(df_mov_existentes.columns)
+        df_existentes_envio = _preparar_para_envio(df_mov_existentes)
+        # O índice da aba mensal é pequeno: é refeito em memória a cada envio
+        indice = IndiceLinhasPlanilha(COLUNAS_CHAVE_MOVIMENTACOES)
+        indice.reconstruir(df_existentes_envio)
+        novas, alteradas = indice.classificar(df_novos_envio[colunas_aba])
+        if alteradas:
+            motivo_reescrita = f"{alteradas} registros já enviados foram corrigidos"
+        else:
+            if novas.any():
+                escritor.acrescentar(df_novos_envio[colunas_aba][novas])
+            print(f"  > Aba '{titulo}': {int(novas.sum())} registros novos acrescentados, "
+                  f"{len(df_novos_envio) - int(novas.sum())} já estavam na aba.")
+            escritor.imprimir_estatisticas()
+            return pd.concat([df_existentes_envio, df_novos_envio[colunas_aba][novas]], ignore_index=True)
+    print(f"  > Reescrevendo a aba '{titulo}' ({motivo_reescrita}).")
+    df_final = _reescrever_movimentacoes(escritor, df_mov_novos, df_mov_existentes)
+    escritor.imprimir_estatisticas()
+    return df_final
+
+
+def _gravar_manifesto(spreadsheet, abas, manifesto):
+    manifesto = manifesto.sort_values('Aba').reset_index(drop=True)
+    df_envio = manifesto.astype(object).copy()
+    df_envio['Linhas'] = manifesto['Linhas'].astype(int)
+    for coluna in ('Primeira Data', 'Ultima Data'):
+        df_envio[coluna] = pd.to_datetime(manifesto[coluna]).dt.strftime('%d/%m/%Y')
+    df_envio = df_envio.where(pd.notnull(df_envio), "")
+    if ABA_MANIFESTO not in abas:
+        abas[ABA_MANIFESTO] = _criar_aba(spreadsheet, ABA_MANIFESTO)
+    EscritorPlanilha(abas[ABA_MANIFESTO]).escrever(df_envio[COLUNAS_MANIFESTO])
+    print(f"  > Manifesto atualizado: {len(manifesto)} abas mensais, {int(manifesto['Linhas'].sum())} registros.")
+
+
+def atualizar_abas_mensais_no_google_sheets(df_mov_novos, df_est_novo, nome_planilha, credenciais_json):
+    """
+    Layout em abas mensais: as linhas novas vão para a aba do seu mês de
+    emissão e só os meses que receberam linhas são lidos e gravados; depois
+    o manifesto e a aba 'Estoque' são atualizados. Na primeira execução a
+    aba única é migrada (suas linhas são distribuídas pelos meses) e
+    renomeada para '<aba>_migrada', que não é mais lida.
+    """
+    try:
+        print("\n--- ETAPA FINAL: Atualizando as abas mensais no Google Sheets ---")
+        spreadsheet = sessao_planilhas(credenciais_json).planilha(nome_planilha)
+        abas = {aba.title: aba for aba in chamar_api(spreadsheet.worksheets)}
+        manifesto = ler_manifesto(spreadsheet)
+
+        df_mov = df_mov_novos
+        if ABA_UNICA in abas:
+            df_antigas = ler_abas(spreadsheet, {ABA_UNICA: None})[ABA_UNICA]
+            print(f"  > Migrando os {len(df_antigas)} registros da aba '{ABA_UNICA}' para abas mensais.")
+            df_mov = pd.concat([df_antigas, df_mov_novos], ignore_index=True)
+
+        abas_linhas = abas_das_linhas(df_mov['Data Emissão']).to_numpy()
+        meses = sorted(set(abas_linhas))
+        print(f"  > {len(df_mov)} registros em {len(meses)} mês(es): {', '.join(meses)}.")
+        existentes = ler_abas(spreadsheet, {titulo: None for titulo in meses})
+
+        entradas = {aba: linha for aba, linha in zip(manifesto['Aba'], manifesto.to_dict('records'))}
+        for titulo in meses:
+            df_final = _atualizar_aba_mensal(spreadsheet, abas, titulo, df_mov[abas_linhas == titulo], existentes[titulo])
+            entradas[titulo] = linha_manifesto(titulo, df_final)
+        _gravar_manifesto(spreadsheet, abas, pd.DataFrame(list(entradas.values()), columns=COLUNAS_MANIFESTO))
+
+        if ABA_UNICA in abas:
+            # Só depois do manifesto gravado: até aqui uma falha deixa a aba única como estava
+            novo_titulo = f"{ABA_UNICA}_migrada"
+            if novo_titulo in abas:
+                novo_titulo += pd.Timestamp.now().strftime('_%Y%m%d%H%M%S')
+            chamar_api(abas[ABA_UNICA].update_title, novo_titulo, escrita=True,
+                       conferir=lambda: _aba_existente(spreadsheet, novo_titulo))
+            print(f"  > Aba '{ABA_UNICA}' migrada e renomeada para '{novo_titulo}'.")
 
+        _atualizar_estoque(spreadsheet, df_est_novo)
         print("SUCESSO! Dados atualizados no Google Sheets.")
         return True
     except Exception as e:
         print(f"ERRO ao atualizar dados no Google Sheets: {e}")
-        return False
\ No newline at end of file
+        return False
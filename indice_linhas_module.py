@@ -0,0 +1,147 @@
+# indice_linhas_module.py - Índice das linhas já enviadas para a planilha
+# Cada linha da aba 'Movimentacoes' é representada por duas impressões
+# digitais de 64 bits: uma da chave de duplicidade e outra da linha inteira.
+# Os valores são normalizados antes do hash ('123', 123 e 123.0 ficam iguais,
+# assim como o texto brasileiro '4.832,08' e o número 4832.08), então linhas lidas da planilha e linhas vindas do pipeline se comparam sem
+# baixar nada. O índice fica num arquivo .npz local, com as chaves ordenadas.
+
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from data_processor_module import converter_numero_brasileiro
+
+PADRAO_NUMERO = r'^-?\d+(\.\d+)?([eE][-+]?\d+)?$'
+# Texto numérico brasileiro: com vírgula decimal ('17,000', '4.832,08', '10,5-') ou só com pontos de milhar ('1.234.567')
+PADRAO_NUMERO_BRASILEIRO = r'^-?(\d{1,3}(\.\d{3})+|\d+)(,\d+)-?$|^-?\d{1,3}(\.\d{3}){2,}$'
+VERSAO_NORMALIZACAO = 2  # Muda quando texto_comparavel muda: índices gravados com outra versão são reconstruídos
+
+
+def texto_comparavel(serie):
+    """
+    Valores como texto normalizado (pyarrow): números (também os escritos no
+    formato brasileiro, como a planilha os devolve já convertidos)
+    arredondados e texto sem espaços nas pontas.
+    """
+    texto = pc.utf8_trim_whitespace(pa.array(serie.astype(str), type=pa.string()))
+    numerico = pc.match_substring_regex(texto, PADRAO_NUMERO)
+    numeros = pc.cast(pc.if_else(numerico, texto, None), pa.float64())
+    brasileiro = pc.match_substring_regex(texto, PADRAO_NUMERO_BRASILEIRO)
+    if pc.any(brasileiro).as_py():
+        convertidos = converter_numero_brasileiro(pd.Series(pc.if_else(brasileiro, texto, None).to_pandas()), valor_padrao=None)
+        numeros = pc.if_else(brasileiro, pa.array(convertidos, type=pa.float64(), from_pandas=True), numeros)
+        numerico = pc.or_(numerico, brasileiro)
+    return pc.if_else(numerico, pc.cast(pc.round(numeros, 6), pa.string()), texto)
+
+
+def impressoes_digitais(df, colunas, textos=None):
+    """
+    Hash estável (uint64, igual entre execuções) das colunas normalizadas de
+    cada linha. 'textos' guarda as colunas já normalizadas para reaproveitar
+    entre chamadas sobre a mesma tabela.
+    """
+    if df.empty:
+        return np.empty(0, dtype=np.uint64)
+    textos = {} if textos is None else textos
+    for coluna in colunas:
+        if coluna not in textos:
+            textos[coluna] = texto_comparavel(df[coluna])
+    # Como categórica, cada valor distinto é hasheado uma vez; o hash é o mesmo do texto
+    categoricas = pd.DataFrame({posicao: textos[coluna].dictionary_encode().to_pandas()
+                                for posicao, coluna in enumerate(colunas)})
+    return pd.util.hash_pandas_object(categoricas, index=False).to_numpy()
+
+
+class IndiceLinhasPlanilha:
+    """
+    Chaves (ordenadas) e hashes das linhas inteiras das linhas da aba. O
+    índice vale para um cabeçalho e um total de linhas: se a aba tiver outro
+    cabeçalho ou outro número de linhas (editada à mão, reescrita em outra
+    máquina) ele é considerado desatualizado e deve ser reconstruído.
+    """
+
+    def __init__(self, colunas_chave, caminho_arquivo=None):
+        self.colunas_chave = list(colunas_chave)
+        self.caminho_arquivo = caminho_arquivo
+        self.colunas = []
+        self.total_linhas = 0
+        self.chaves = np.empty(0, dtype=np.uint64)
+        self.hashes_linhas = np.empty(0, dtype=np.uint64)
+        self.carregado = False
+        if caminho_arquivo and os.path.exists(caminho_arquivo):
+            try:
+                with np.load(caminho_arquivo, allow_pickle=False) as dados:
+                    if 'versao' not in dados or int(dados['versao']) != VERSAO_NORMALIZACAO:
+                        raise ValueError("gravado com outra normalização dos valores")
+                    self.colunas = dados['colunas'].tolist()
+                    self.total_linhas = int(dados['total_linhas'])
+                    self.chaves = dados['chaves']
+                    self.hashes_linhas = dados['hashes_linhas']
+                self.carregado = True
+            except Exception as e:
+                print(f"  [AVISO] Índice de linhas da planilha ignorado. Erro: {e}")
+
+    def atualizado(self, colunas, total_linhas):
+        return self.carregado and self.colunas == list(colunas) and self.total_linhas == total_linhas
+
+    def reconstruir(self, df_envio):
+        """Monta o índice a partir das linhas da aba (no formato de envio); a última de cada chave vale."""
+        self.colunas = list(df_envio.columns)
+        self.total_linhas = len(df_envio)
+        textos = {}
+        chaves = impressoes_digitais(df_envio, self.colunas_chave, textos)
+        hashes_linhas = impressoes_digitais(df_envio, self.colunas, textos)
+        # np.unique fica com a primeira ocorrência: invertendo, fica a última
+        self.chaves, posicoes = np.unique(chaves[::-1], return_index=True)
+        self.hashes_linhas = hashes_linhas[::-1][posicoes]
+        self.carregado = True
+
+    def classificar(self, df_envio):
+        """
+        Compara linhas novas (já nas colunas do índice) com o índice.
+        Retorna (máscara das linhas a acrescentar, quantidade de linhas já
+        enviadas que voltaram com outro valor). Entre linhas novas com a
+        mesma chave só a última é considerada.
+        """
+        chaves = impressoes_digitais(df_envio, self.colunas_chave)
+        ultimas = ~pd.Series(chaves).duplicated(keep='last').to_numpy()
+        if len(self.chaves):
+            posicoes = np.minimum(np.searchsorted(self.chaves, chaves), len(self.chaves) - 1)
+            ja_enviadas = self.chaves[posicoes] == chaves
+        else:
+            posicoes, ja_enviadas = np.zeros(len(chaves), dtype=np.intp), np.zeros(len(chaves), dtype=bool)
+        repetidas = ja_enviadas & ultimas
+        alteradas = 0
+        if repetidas.any():
+            hashes_linhas = impressoes_digitais(df_envio[repetidas], self.colunas)
+            alteradas = int((hashes_linhas != self.hashes_linhas[posicoes[repetidas]]).sum())
+        return ultimas & ~ja_enviadas, alteradas
+
+    def acrescentar(self, df_envio):
+        """Registra linhas acrescentadas ao fim da aba (chaves ainda não presentes no índice)."""
+        textos = {}
+        chaves = impressoes_digitais(df_envio, self.colunas_chave, textos)
+        hashes_linhas = impressoes_digitais(df_envio, self.colunas, textos)
+        todas_chaves = np.concatenate([self.chaves, chaves])
+        ordem = np.argsort(todas_chaves, kind='stable')
+        self.chaves = todas_chaves[ordem]
+        self.hashes_linhas = np.concatenate([self.hashes_linhas, hashes_linhas])[ordem]
+        self.total_linhas += len(df_envio)
+
+    def salvar(self):
+        if not self.caminho_arquivo:
+            return
+        try:
+            pasta = os.path.dirname(self.caminho_arquivo)
+            if pasta:
+                os.makedirs(pasta, exist_ok=True)
+            caminho_temporario = self.caminho_arquivo + ".tmp"
+            with open(caminho_temporario, 'wb') as f:
+                np.savez(f, versao=np.int64(VERSAO_NORMALIZACAO), colunas=np.array(self.colunas, dtype=str), total_linhas=np.int64(self.total_linhas),
+                         chaves=self.chaves, hashes_linhas=self.hashes_linhas)
+            os.replace(caminho_temporario, self.caminho_arquivo)
+        except Exception as e:
+            print(f"  [AVISO] Não foi possível gravar o índice de linhas da planilha. Erro: {e}")
@@ -0,0 +1,141 @@
+# leitura_planilha_module.py - Leitura das abas da planilha em colunas tipadas
+# Em vez do get_as_dataframe (uma aba por vez, todas as colunas, valores
+# formatados como texto e depois reconvertidos), as abas pedidas são lidas em
+# paralelo, cada uma com uma única chamada values.batchGet só com as colunas
+# necessárias. Os valores vêm crus (números como números, datas como número
+# de série) e viram colunas tipadas direto, sem passar por "1.234,56". No
+# máximo LEITURA_ABAS_EM_PARALELO abas são lidas ao mesmo tempo e cada
+# requisição passa pelo balde de leitura, com as mesmas repetições do envio.
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from config import LEITURA_ABAS_EM_PARALELO
+from data_processor_module import converter_numero_brasileiro
+import envio_planilha_module
+from envio_planilha_module import letra_coluna, chamar_com_repeticao
+from esquema_module import COLUNAS_DATA, COLUNAS_NUMERICAS
+
+ORIGEM_DATAS_PLANILHA = pd.Timestamp('1899-12-30')  # Dia 0 das datas em número de série do Google Sheets
+PARAMETROS_VALORES_CRUS = {'majorDimension': 'COLUMNS', 'valueRenderOption': 'UNFORMATTED_VALUE',
+                           'dateTimeRenderOption': 'SERIAL_NUMBER'}
+
+
+def _eh_numero(valor):
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool)
+
+
+def tipo_da_coluna(coluna):
+    """'data' e 'numero' para as colunas do esquema_module; as demais são inferidas ('auto')."""
+    if coluna in COLUNAS_DATA:
+        return 'data'
+    if coluna in COLUNAS_NUMERICAS:
+        return 'numero'
+    return 'auto'
+
+
+def coluna_tipada(valores, tipo, nome=None):
+    """
+    Valores crus de uma coluna ('' ou None = vazio) como Series do tipo pedido:
+    'data' (número de série ou texto dd/mm/aaaa), 'numero' (números ou texto
+    no formato brasileiro) ou 'auto' (números se todos forem números, senão texto).
+    """
+    valores = np.array([None if valor == '' else valor for valor in valores], dtype=object)
+    vazios = np.fromiter((valor is None for valor in valores), dtype=bool, count=len(valores))
+    numericos = np.fromiter((_eh_numero(valor) for valor in valores), dtype=bool, count=len(valores))
+    if tipo == 'data':
+        datas = pd.Series(pd.NaT, index=range(len(valores)), dtype='datetime64[ns]', name=nome)
+        if numericos.any():
+            datas[numericos] = ORIGEM_DATAS_PLANILHA + pd.to_timedelta(valores[numericos].astype(float), unit='D')
+        texto = ~numericos & ~vazios
+        if texto.any():
+            datas[texto] = pd.to_datetime(pd.Series(valores[texto]).astype(str).str.strip(), format='%d/%m/%Y', errors='coerce').to_numpy()
+        return datas
+    if tipo == 'numero':
+        return converter_numero_brasileiro(pd.Series(valores, name=nome), valor_padrao=None)
+    if numericos.sum() == (~vazios).sum() and numericos.any():
+        inteiros = not vazios.any() and all(isinstance(valor, int) for valor in valores)
+        return pd.Series(valores, name=nome).astype('int64' if inteiros else 'float64')
+    # Texto (ou misto, como uma 'Nota' com números e letras): tudo como texto
+    return pd.Series([valor if valor is None else str(valor) for valor in valores], dtype=object, name=nome)
+
+
+def tabela_de_colunas(nomes, colunas_valores, tipos=None):
+    """
+    DataFrame tipado a partir de listas de valores por coluna (de tamanhos
+    diferentes, como a API devolve). 'tipos' substitui o tipo_da_coluna de
+    colunas específicas.
+    """
+    total_linhas = max((len(valores) for valores in colunas_valores), default=0)
+    tipos = tipos or {}
+    dados = {}
+    for nome, valores in zip(nomes, colunas_valores):
+        valores = list(valores) + [None] * (total_linhas - len(valores))
+        dados[nome] = coluna_tipada(valores, tipos.get(nome) or tipo_da_coluna(nome), nome)
+    return pd.DataFrame(dados, columns=list(nomes)).dropna(how='all')
+
+
+def _referencia_aba(aba):
+    return "'" + aba.replace("'", "''") + "'"
+
+
+def _intervalo(aba, primeira, ultima, linha_inicial):
+    return f"{_referencia_aba(aba)}!{letra_coluna(primeira)}{linha_inicial}:{letra_coluna(ultima)}"
+
+
+def _chamar(funcao, balde, *args, **kwargs):
+    return chamar_com_repeticao(lambda: funcao(*args, **kwargs), balde or envio_planilha_module.BALDE_LEITURA,
+                                descricao=" na leitura da planilha")
+
+
+def _ler_aba(spreadsheet, aba, cabecalho, colunas, tipos, balde):
+    """Uma chamada batchGet com um intervalo por trecho contíguo de colunas pedidas."""
+    posicoes = [(posicao, nome) for posicao, nome in enumerate(cabecalho, start=1)
+                if nome and (colunas is None or nome in colunas)]
+    if colunas is not None:
+        # Mantém a ordem pedida pelo chamador (uma posição por nome)
+        por_nome = {nome: posicao for posicao, nome in reversed(posicoes)}
+        posicoes = [(por_nome[nome], nome) for nome in colunas if nome in por_nome]
+    if not posicoes:
+        return pd.DataFrame()
+    trechos = []
+    for posicao in sorted({posicao for posicao, _ in posicoes}):
+        if trechos and trechos[-1][1] == posicao - 1:
+            trechos[-1][1] = posicao
+        else:
+            trechos.append([posicao, posicao])
+    resposta = _chamar(spreadsheet.values_batch_get, balde, [_intervalo(aba, primeira, ultima, 2) for primeira, ultima in trechos],
+                       params=PARAMETROS_VALORES_CRUS)
+    valores_por_posicao = {}
+    for (primeira, ultima), intervalo in zip(trechos, resposta.get('valueRanges', [])):
+        colunas_trecho = intervalo.get('values', [])
+        for deslocamento in range(ultima - primeira + 1):
+            # Colunas vazias no fim do trecho não vêm na resposta
+            valores_por_posicao[primeira + deslocamento] = colunas_trecho[deslocamento] if deslocamento < len(colunas_trecho) else []
+    return tabela_de_colunas([nome for _, nome in posicoes], [valores_por_posicao[posicao] for posicao, _ in posicoes], tipos)
+
+
+def ler_abas(spreadsheet, colunas_por_aba, tipos=None, balde=None, max_paralelo=LEITURA_ABAS_EM_PARALELO):
+    """
+    Lê as abas em paralelo. 'colunas_por_aba' = {aba: lista de colunas ou
+    None para todas}; 'tipos' = {coluna: tipo} para colunas fora do
+    esquema_module. Retorna {aba: DataFrame}; aba inexistente ou sem
+    cabeçalho vira DataFrame vazio. São 2 requisições (metadados e
+    cabeçalhos) mais uma por aba, até 'max_paralelo' ao mesmo tempo, todas
+    pelo 'balde' (padrão: BALDE_LEITURA).
+    """
+    existentes = {aba.title for aba in _chamar(spreadsheet.worksheets, balde)}
+    abas = [aba for aba in colunas_por_aba if aba in existentes]
+    resultado = {aba: pd.DataFrame() for aba in colunas_por_aba}
+    if not abas:
+        return resultado
+    cabecalhos = _chamar(spreadsheet.values_batch_get, balde, [f"{_referencia_aba(aba)}!1:1" for aba in abas])
+    cabecalhos = [[str(nome).strip() for nome in (intervalo.get('values') or [[]])[0]] for intervalo in cabecalhos.get('valueRanges', [])]
+    with ThreadPoolExecutor(max_workers=max(1, min(len(abas), max_paralelo))) as executor:
+        tabelas = executor.map(lambda aba, cabecalho: _ler_aba(spreadsheet, aba, cabecalho, colunas_por_aba[aba], tipos, balde),
+                               abas, cabecalhos)
+        for aba, tabela in zip(abas, tabelas):
+            resultado[aba] = tabela
+    return resultado
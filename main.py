@@ -9,9 +9,18 @@ import sys
 # Importa as configurações e as funções de cada módulo especializado
 from config import *
 from rpa_module import executar_rpa_extracao
-from pdf_parser_module import orquestrar_extracao_movimentacoes, orquestrar_extracao_inventario
+from pdf_parser_module import orquestrar_extracao_movimentacoes, orquestrar_extracao_inventario, assinatura_parser
+from cache_module import CacheAnalise
+from metricas_module import salvar_metricas_ndjson, imprimir_resumo_metricas
 from data_processor_module import unir_dataframes
-from google_sheets_module import buscar_dados_existentes, atualizar_dados_no_google_sheets
+from monitor_module import MonitorRelatorios
+from etapas_module import ExecutorEtapas, assinatura_codigo
+from armazenamento_module import abrir_armazenamento_local
+import config
+import data_processor_module, operacoes_module, correspondencia_module, esquema_module
+from google_sheets_module import (buscar_dados_existentes, atualizar_dados_no_google_sheets, buscar_ultima_data_emissao,
+                                  atualizar_abas_mensais_no_google_sheets, EnvioContinuoPlanilha)
+from sessao_planilha_module import sessao_planilhas
 
 # =================================================================================
 # --- CHAVE SELETORA DE MODO DE OPERAÇÃO ---
@@ -45,29 +54,131 @@ def executar_processo_de_dados(pasta_raiz_relatorios, palavra_chave_inventario):
 
     print(f"  > {len(lista_pdfs_movimentacao)} arquivo(s) de movimentação encontrados.")
 
-    df_movs = orquestrar_extracao_movimentacoes(lista_pdfs_movimentacao)
-    df_inv_bruto = orquestrar_extracao_inventario(caminho_pdf_inventario)
-    
-    if df_movs is None or df_inv_bruto is None:
-        raise ValueError("Falha no processamento dos PDFs. Um dos DataFrames está vazio.")
-        
-    df_final_movimentacoes = unir_dataframes(df_movs, df_inv_bruto)
+    cache = None
+    if USAR_CACHE_ANALISE:
+        cache = CacheAnalise(PASTA_CACHE_ANALISE, assinatura_parser(), TAMANHO_MAXIMO_CACHE_MB * 1024 * 1024)
+
+    metricas = []
+    # As duas extrações rodam ao mesmo tempo: cada uma fica com metade dos
+    # processos, em vez de cada pool ocupar todos os núcleos
+    processos_por_etapa = max(1, (NUM_PROCESSOS_EXTRACAO or os.cpu_count() or 1) // 2)
+
+    def extrair_movimentacoes():
+        df_movs = orquestrar_extracao_movimentacoes(lista_pdfs_movimentacao, num_processos=processos_por_etapa,
+                                                    cache=cache, metricas=metricas)
+        if cache is not None:
+            print(f"  > {cache.resumo()}")
+        if df_movs is None:
+            raise ValueError("Falha no processamento dos PDFs de movimentação. O DataFrame está vazio.")
+        return df_movs
+
+    def extrair_inventario():
+        df_inv_bruto = orquestrar_extracao_inventario(caminho_pdf_inventario, num_processos=processos_por_etapa, metricas=metricas)
+        if df_inv_bruto is None:
+            raise ValueError("Falha no processamento do PDF de inventário. O DataFrame está vazio.")
+        return df_inv_bruto
+
+    # Extração das movimentações e do inventário rodam ao mesmo tempo; etapas
+    # com as mesmas entradas e o mesmo código da última execução são lidas do disco.
+    versao_extracao = assinatura_parser()
+    versao_uniao = assinatura_codigo(data_processor_module, operacoes_module, correspondencia_module, esquema_module,
+                                     arquivos_extras=[config.__file__])
+    executor = ExecutorEtapas(PASTA_ARTEFATOS_ETAPAS)
+    executor.adicionar('movimentacoes', extrair_movimentacoes, arquivos=lista_pdfs_movimentacao, versao=versao_extracao)
+    executor.adicionar('inventario', extrair_inventario, arquivos=[caminho_pdf_inventario], versao=versao_extracao)
+    executor.adicionar('uniao', lambda df_movs, df_inv: unir_dataframes(df_movs, df_inv.copy()),
+                       dependencias=('movimentacoes', 'inventario'), versao=versao_uniao)
+    try:
+        resultados = executor.executar()
+    finally:
+        if metricas:
+            imprimir_resumo_metricas(metricas)
+            salvar_metricas_ndjson(metricas, CAMINHO_METRICAS_EXTRACAO)
+        executor.imprimir_tempos()
+        executor.salvar_tempos_ndjson(CAMINHO_TEMPOS_ETAPAS)
+
+    df_final_movimentacoes = resultados['uniao']
+    df_inv_bruto = resultados['inventario']
+    # Mesmos nomes de coluna que o unir_dataframes deixa no inventário (ex: 'Custo Unit')
+    df_inv_bruto.columns = [col.strip().replace('.', '') for col in df_inv_bruto.columns]
     
     # Retorna os dois dataframes
     return df_final_movimentacoes, df_inv_bruto
 
 
+def executar_monitoramento(pasta_raiz_relatorios, palavra_chave_inventario):
+    """
+    Modo contínuo: acompanha a pasta de relatórios e grava cada PDF novo ou
+    alterado no destino (Google Sheets, armazenamento local ou Excel) assim que ele termina
+    de ser gravado, sem esperar a extração completa.
+    """
+    cache = None
+    if USAR_CACHE_ANALISE:
+        cache = CacheAnalise(PASTA_CACHE_ANALISE, assinatura_parser(), TAMANHO_MAXIMO_CACHE_MB * 1024 * 1024)
+
+    if MODO_ONLINE and PLANILHA_ABAS_MENSAIS:
+        # Cada envio lê e grava só os meses das linhas que chegaram
+        def ao_atualizar(df_novos, df_inventario):
+            enviado = atualizar_abas_mensais_no_google_sheets(df_novos, df_inventario, NOME_PLANILHA_ONLINE, CAMINHO_CREDENCIAS_JSON)
+            sessao_planilhas(CAMINHO_CREDENCIAS_JSON).imprimir_estatisticas()
+            return bool(enviado)
+    elif MODO_ONLINE:
+        ao_atualizar = EnvioContinuoPlanilha(NOME_PLANILHA_ONLINE, CAMINHO_CREDENCIAS_JSON,
+                                             caminho_indice=CAMINHO_INDICE_LINHAS_PLANILHA, pasta_espelho=PASTA_ESPELHO_PLANILHA)
+    elif ARMAZENAMENTO_LOCAL in ('sqlite', 'parquet'):
+        armazenamento = abrir_armazenamento_local()
+
+        def ao_atualizar(df_novos, df_inventario):
+            armazenamento.gravar_movimentacoes(df_novos)
+            armazenamento.gravar_estoque(df_inventario)
+            return True
+    else:
+        estado = {'movimentacoes': pd.DataFrame()}
+
+        def ao_atualizar(df_novos, df_inventario):
+            # Substitui apenas as linhas dos arquivos que chegaram de novo
+            df_atual = estado['movimentacoes']
+            if not df_atual.empty:
+                df_atual = df_atual[~df_atual['Arquivo Origem'].isin(df_novos['Arquivo Origem'].unique())]
+            estado['movimentacoes'] = pd.concat([df_atual, df_novos], ignore_index=True)
+            with pd.ExcelWriter(CAMINHO_EXCEL_LOCAL, engine='openpyxl') as writer:
+                estado['movimentacoes'].to_excel(writer, sheet_name='Movimentacoes', index=False)
+                df_inventario.to_excel(writer, sheet_name='Estoque', index=False)
+            print(f"  > '{CAMINHO_EXCEL_LOCAL}' atualizado com {len(estado['movimentacoes'])} registros.")
+            return True
+
+    monitor = MonitorRelatorios(pasta_raiz_relatorios, palavra_chave_inventario, ao_atualizar,
+                                segundos_estavel=SEGUNDOS_ARQUIVO_ESTAVEL, cache=cache)
+    monitor.executar(INTERVALO_MONITORAMENTO_S)
+
+
 # =================================================================================
 # BLOCO PRINCIPAL (ORQUESTRADOR)
 # =================================================================================
 if __name__ == "__main__":
     
-    if MODO_ONLINE:
+    if "--monitorar" in sys.argv:
+        # --- MODO CONTÍNUO: processa os PDFs à medida que chegam na pasta ---
+        try:
+            executar_monitoramento(PASTA_RAIZ_RELATORIOS, PALAVRA_CHAVE_INVENTARIO)
+        except RuntimeError as e:
+            print(f"\n--- INTERRUPÇÃO DE SEGURANÇA ---")
+            print(str(e))
+            sys.exit(1)
+
+    elif MODO_ONLINE:
         # --- LÓGICA DO MODO ONLINE (INCREMENTAL) ---
         print("Executando em MODO ONLINE...")
         try:
             try:
-                df_existentes, _ = buscar_dados_existentes(NOME_PLANILHA_ONLINE, CAMINHO_CREDENCIAS_JSON)
+                if PLANILHA_ABAS_MENSAIS:
+                    # Só o manifesto é lido: as abas mensais são abertas na hora de gravar
+                    df_existentes = None
+                    ultima_data = buscar_ultima_data_emissao(NOME_PLANILHA_ONLINE, CAMINHO_CREDENCIAS_JSON)
+                else:
+                    df_existentes, _ = buscar_dados_existentes(NOME_PLANILHA_ONLINE, CAMINHO_CREDENCIAS_JSON, PASTA_ESPELHO_PLANILHA)
+                    datas_existentes = df_existentes['Data Emissão'].dropna() if not df_existentes.empty else pd.Series(dtype=object)
+                    ultima_data = datas_existentes.max() if not datas_existentes.empty else None
             except RuntimeError as e:
                 print(f"\n--- INTERRUPÇÃO DE SEGURANÇA ---")
                 print(str(e))
@@ -75,9 +186,8 @@ if __name__ == "__main__":
 
             # O resto do seu código continua dentro do bloco 'try' principal
             hoje = date.today()
-            if not df_existentes.empty and not df_existentes['Data Emissão'].dropna().empty:
-                ultima_data = df_existentes['Data Emissão'].dropna().max().date()
-                data_inicio_extracao = ultima_data
+            if ultima_data is not None:
+                data_inicio_extracao = ultima_data.date()
             else:
                 data_inicio_extracao = hoje.replace(day=1)
             data_fim_extracao = hoje
@@ -90,10 +200,16 @@ if __name__ == "__main__":
                 raise RuntimeError("A automação (RPA) falhou.")
 
             novos_dados_df, df_inventario_novo = executar_processo_de_dados(PASTA_RAIZ_RELATORIOS, PALAVRA_CHAVE_INVENTARIO)
-            if novos_dados_df is not None and not novos_dados_df.empty:
-                atualizar_dados_no_google_sheets(novos_dados_df, df_existentes, df_inventario_novo, NOME_PLANILHA_ONLINE, CAMINHO_CREDENCIAS_JSON)
+            if novos_dados_df is not None and not novos_dados_df.empty and PLANILHA_ABAS_MENSAIS:
+                atualizar_abas_mensais_no_google_sheets(novos_dados_df, df_inventario_novo, NOME_PLANILHA_ONLINE, CAMINHO_CREDENCIAS_JSON)
+            elif novos_dados_df is not None and not novos_dados_df.empty:
+                # Só as linhas novas são acrescentadas; '--reescrever-planilha' força a reescrita completa da aba
+                atualizar_dados_no_google_sheets(novos_dados_df, df_existentes, df_inventario_novo, NOME_PLANILHA_ONLINE, CAMINHO_CREDENCIAS_JSON,
+                                                 reescrever_tudo="--reescrever-planilha" in sys.argv, caminho_indice=CAMINHO_INDICE_LINHAS_PLANILHA,
+                                                 pasta_espelho=PASTA_ESPELHO_PLANILHA)
             else:
                 print("Nenhum dado novo foi encontrado para adicionar à planilha.")
+            sessao_planilhas(CAMINHO_CREDENCIAS_JSON).imprimir_estatisticas()
 
         except Exception as e:
             print(f"\n--- ERRO NA EXECUÇÃO ONLINE ---")
@@ -114,7 +230,15 @@ if __name__ == "__main__":
 
             df_movimentacoes_final, df_inventario_bruto = executar_processo_de_dados(PASTA_RAIZ_RELATORIOS, PALAVRA_CHAVE_INVENTARIO)
             
-            if df_movimentacoes_final is not None and not df_movimentacoes_final.empty:
+            if df_movimentacoes_final is not None and not df_movimentacoes_final.empty and ARMAZENAMENTO_LOCAL in ('sqlite', 'parquet'):
+                # Acrescenta ao armazenamento: linhas já gravadas em execuções anteriores são substituídas, não duplicadas
+                destino = CAMINHO_SQLITE if ARMAZENAMENTO_LOCAL == 'sqlite' else PASTA_PARQUET_LOCAL
+                print(f"\n--- MODO LOCAL: Gravando resultado ({ARMAZENAMENTO_LOCAL}) em '{destino}' ---")
+                armazenamento = abrir_armazenamento_local()
+                armazenamento.gravar_movimentacoes(df_movimentacoes_final)
+                armazenamento.gravar_estoque(df_inventario_bruto)
+                print(f"SUCESSO! Movimentações e estoque gravados ({ARMAZENAMENTO_LOCAL}).")
+            elif df_movimentacoes_final is not None and not df_movimentacoes_final.empty:
                 print(f"\n--- MODO LOCAL: Salvando resultado com 2 abas em '{CAMINHO_EXCEL_LOCAL}' ---")
                 
                 with pd.ExcelWriter(CAMINHO_EXCEL_LOCAL, engine='openpyxl') as writer:
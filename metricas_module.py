@@ -0,0 +1,78 @@
+# metricas_module.py - Métricas da extração dos PDFs
+# Cada arquivo processado gera um dicionário de métricas (tempos, páginas,
+# blocos, campos que caíram em 'N/A', registros). O histórico é gravado em
+# NDJSON (uma linha por arquivo e execução) para comparar execuções e
+# identificar arquivos lentos ou mudanças no layout dos relatórios.
+
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+COLUNAS_RESUMO = ['arquivo', 'tipo', 'origem', 'paginas', 'tempo_extracao_s', 'tempo_analise_s',
+                  'blocos_encontrados', 'blocos_sem_itens', 'campos_na', 'registros']
+
+
+def nova_metrica_arquivo(nome_arquivo, tipo='movimentacao'):
+    """Cria o dicionário de métricas de um arquivo, com os contadores zerados."""
+    return {
+        'arquivo': nome_arquivo,
+        'tipo': tipo,
+        'origem': 'pdf',
+        'paginas': 0,
+        'tempo_extracao_s': 0.0,
+        'tempo_analise_s': 0.0,
+        'blocos_encontrados': 0,
+        'blocos_sem_itens': 0,
+        'campos_na': {},
+        'registros': 0,
+        'erro': None,
+    }
+
+
+def contar_campos_na(metricas, nomes_campos, valores):
+    """Soma 1 em metricas['campos_na'][campo] para cada campo do cabeçalho que ficou 'N/A'."""
+    for nome_campo, valor in zip(nomes_campos, valores):
+        if valor == 'N/A':
+            metricas['campos_na'][nome_campo] = metricas['campos_na'].get(nome_campo, 0) + 1
+
+
+def salvar_metricas_ndjson(lista_metricas, caminho_arquivo):
+    """Acrescenta as métricas da execução ao arquivo NDJSON, uma linha por arquivo processado."""
+    execucao = datetime.now().isoformat(timespec='seconds')
+    pasta = os.path.dirname(caminho_arquivo)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    with open(caminho_arquivo, 'a', encoding='utf-8') as f:
+        for metricas in lista_metricas:
+            f.write(json.dumps({'execucao': execucao, **metricas}, ensure_ascii=False) + "\n")
+    print(f"  > Métricas de {len(lista_metricas)} arquivo(s) gravadas em '{caminho_arquivo}'.")
+
+
+def ler_metricas_ndjson(caminho_arquivo):
+    """Lê o histórico de métricas como DataFrame (vazio se o arquivo não existir)."""
+    if not os.path.exists(caminho_arquivo):
+        return pd.DataFrame()
+    return pd.read_json(caminho_arquivo, lines=True)
+
+
+def imprimir_resumo_metricas(lista_metricas):
+    """Imprime uma tabela com uma linha por arquivo e os totais da execução."""
+    if not lista_metricas:
+        return
+    resumo = pd.DataFrame(lista_metricas)
+    resumo['campos_na'] = resumo['campos_na'].apply(lambda campos: sum(campos.values()))
+    resumo = resumo[COLUNAS_RESUMO]
+    totais = resumo.drop(columns=['arquivo', 'tipo', 'origem']).sum().to_frame().T
+    totais.insert(0, 'arquivo', 'TOTAL')
+    totais.insert(1, 'tipo', '')
+    totais.insert(2, 'origem', '')
+    resumo = pd.concat([resumo, totais], ignore_index=True)
+    colunas_inteiras = ['paginas', 'blocos_encontrados', 'blocos_sem_itens', 'campos_na', 'registros']
+    resumo[colunas_inteiras] = resumo[colunas_inteiras].astype(int)
+    print("\n--- MÉTRICAS DA EXTRAÇÃO ---")
+    print(resumo.round({'tempo_extracao_s': 2, 'tempo_analise_s': 2}).to_string(index=False))
+    erros = [metricas for metricas in lista_metricas if metricas['erro']]
+    for metricas in erros:
+        print(f"  [ERRO] '{metricas['arquivo']}': {metricas['erro']}")
@@ -0,0 +1,131 @@
+# monitor_module.py - Ingestão contínua da pasta de relatórios
+# Em vez de esperar o RPA terminar e processar tudo de uma vez, acompanha a
+# pasta por polling (funciona em qualquer sistema/pasta de rede) e processa
+# cada PDF novo ou alterado assim que o tamanho dele para de mudar.
+
+import glob
+import os
+import time
+
+from data_processor_module import unir_dataframes
+from pdf_parser_module import orquestrar_extracao_movimentacoes, orquestrar_extracao_inventario, concatenar_tabelas_movimentacoes
+
+
+class MonitorRelatorios:
+    """
+    Acompanha uma pasta de PDFs. Um arquivo é considerado pronto quando o
+    tamanho e a data de modificação não mudam entre duas verificações
+    seguidas nem por 'segundos_estavel' segundos. Cada PDF pronto é analisado uma única vez por versão; as
+    movimentações são unidas ao inventário mais recente e entregues a
+    'ao_atualizar(df_novos, df_inventario)', que grava no destino e retorna
+    True se conseguiu. Os arquivos da entrega só contam como processados
+    depois dela: se 'ao_atualizar' falhar (False ou exceção), eles são
+    processados de novo na próxima verificação.
+    Se o inventário mudar, todas as movimentações já lidas são unidas de novo.
+    """
+
+    def __init__(self, pasta, palavra_chave_inventario, ao_atualizar, segundos_estavel=2.0, cache=None):
+        self.pasta = pasta
+        self.palavra_chave_inventario = palavra_chave_inventario
+        self.ao_atualizar = ao_atualizar
+        self.segundos_estavel = segundos_estavel
+        self.cache = cache
+        self.observados = {}  # caminho -> (assinatura, instante em que a assinatura apareceu)
+        self.processados = {}  # caminho -> assinatura já entregue ao destino (ou ilegível)
+        self.tabelas_movimentacao = {}  # caminho -> movimentações analisadas do arquivo
+        self.df_inventario = None
+
+    def _assinatura(self, caminho):
+        info = os.stat(caminho)
+        return info.st_size, info.st_mtime_ns
+
+    def arquivos_prontos(self, agora=None):
+        """Retorna os PDFs novos ou alterados cujo tamanho já está estável."""
+        agora = time.monotonic() if agora is None else agora
+        prontos = []
+        caminhos_atuais = set(glob.glob(os.path.join(self.pasta, '*.pdf')))
+        for caminho in sorted(caminhos_atuais):
+            try:
+                assinatura = self._assinatura(caminho)
+            except OSError:
+                continue  # Arquivo removido ou ainda bloqueado pelo RPA
+            anterior = self.observados.get(caminho)
+            if anterior is None or anterior[0] != assinatura:
+                # Arquivo novo ou ainda sendo gravado: só fica pronto numa próxima verificação.
+                self.observados[caminho] = (assinatura, agora)
+                continue
+            if assinatura[0] == 0 or self.processados.get(caminho) == assinatura:
+                continue
+            if agora - self.observados[caminho][1] >= self.segundos_estavel:
+                prontos.append(caminho)
+        for caminho in set(self.observados) - caminhos_atuais:
+            del self.observados[caminho]
+        return prontos
+
+    def _eh_inventario(self, caminho):
+        return self.palavra_chave_inventario in os.path.basename(caminho)
+
+    def verificar(self):
+        """Executa um ciclo de verificação da pasta. Retorna os arquivos processados nele."""
+        prontos = self.arquivos_prontos()
+        if not prontos:
+            return []
+        inicio = time.perf_counter()
+        assinaturas = {caminho: self.observados[caminho][0] for caminho in prontos}
+        inventario_atualizado = False
+        movimentacoes_novas = []
+        lidos = []  # Arquivos que entram na entrega ao destino
+        for caminho in prontos:
+            nome_arquivo = os.path.basename(caminho)
+            print(f"\n--- MONITOR: '{nome_arquivo}' pronto para processamento ---")
+            if self._eh_inventario(caminho):
+                df_inventario = orquestrar_extracao_inventario(caminho)
+                lido = df_inventario is not None
+                if lido:
+                    # Mesmos nomes de coluna que o unir_dataframes deixa no inventário (ex: 'Custo Unit'), como no main.py
+                    df_inventario.columns = [col.strip().replace('.', '') for col in df_inventario.columns]
+                    self.df_inventario = df_inventario
+                    inventario_atualizado = True
+            else:
+                tabela = orquestrar_extracao_movimentacoes([caminho], num_processos=1, cache=self.cache)
+                lido = tabela is not None
+                if lido:
+                    self.tabelas_movimentacao[caminho] = tabela
+                    movimentacoes_novas.append(caminho)
+            if lido:
+                lidos.append(caminho)
+            else:
+                self.processados[caminho] = assinaturas[caminho]  # Ilegível: só volta se o arquivo mudar
+
+        if self.df_inventario is None:
+            if movimentacoes_novas:
+                print("  > Aguardando o arquivo de inventário para unir as movimentações.")
+            # As tabelas ficam guardadas e são unidas quando o inventário chegar
+            self.processados.update((caminho, assinaturas[caminho]) for caminho in lidos)
+            return prontos
+        # Com inventário novo, todas as movimentações precisam do custo atualizado.
+        caminhos_a_unir = list(self.tabelas_movimentacao) if inventario_atualizado else movimentacoes_novas
+        if caminhos_a_unir:
+            df_movs = concatenar_tabelas_movimentacoes([self.tabelas_movimentacao[caminho] for caminho in caminhos_a_unir])
+            df_novos = unir_dataframes(df_movs, self.df_inventario.copy())
+            if not self.ao_atualizar(df_novos, self.df_inventario):
+                print(f"  [AVISO] Os dados não foram gravados no destino; {len(lidos)} arquivo(s) serão processados de novo na próxima verificação.")
+                return [caminho for caminho in prontos if caminho not in lidos]
+            print(f"  > {len(df_novos)} registros disponíveis {time.perf_counter() - inicio:.1f}s após o arquivo ficar pronto.")
+        self.processados.update((caminho, assinaturas[caminho]) for caminho in lidos)
+        return prontos
+
+    def executar(self, intervalo_segundos=1.0, max_ciclos=None):
+        """Verifica a pasta a cada 'intervalo_segundos' até Ctrl+C (ou até 'max_ciclos' ciclos)."""
+        print(f"--- MONITOR: acompanhando '{self.pasta}' (verificação a cada {intervalo_segundos}s; Ctrl+C para sair) ---")
+        ciclos = 0
+        try:
+            while max_ciclos is None or ciclos < max_ciclos:
+                try:
+                    self.verificar()
+                except Exception as e:
+                    print(f"  [ERRO] Falha no ciclo do monitor: {e}")
+                ciclos += 1
+                time.sleep(intervalo_segundos)
+        except KeyboardInterrupt:
+            print("\n--- MONITOR: encerrado pelo usuário ---")
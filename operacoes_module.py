@@ -0,0 +1,149 @@
+# operacoes_module.py - Tabela de classificação dos tipos de operação
+# Junta o movimentacao_map e o dre_map do config numa única tabela, montada
+# uma vez na importação. As operações são procuradas pelo nome normalizado
+# (sem acentos, maiúsculas, espaços únicos) e, se o nome não bater, pelo
+# código numérico do início ("321-..."), desde que o código não seja ambíguo.
+
+import ast
+import os
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+import config
+from config import movimentacao_map, dre_map
+
+MOVIMENTACAO_PADRAO = 'Outros'
+DRE_PADRAO = 'Não Classificado'
+RE_CODIGO_OPERACAO = re.compile(r'^(\d+)-')
+
+
+def normalizar_operacao(nome):
+    """'321 - Compra  para comercialização' -> '321-COMPRA PARA COMERCIALIZACAO'."""
+    texto = unicodedata.normalize('NFKD', str(nome)).encode('ascii', 'ignore').decode('ascii')
+    texto = ' '.join(texto.upper().split())
+    return re.sub(r'^(\d+)\s*-\s*', r'\1-', texto)
+
+
+def codigo_operacao(nome_normalizado):
+    """Código numérico da operação, ou None se o nome não começar por 'NNN-'."""
+    encontrado = RE_CODIGO_OPERACAO.match(nome_normalizado)
+    return int(encontrado.group(1)) if encontrado else None
+
+
+def chaves_repetidas_no_config(nome_dicionario, caminho_config=None):
+    """
+    Procura no código-fonte do config.py chaves repetidas no dicionário
+    'nome_dicionario' (num dicionário Python a última ocorrência vence em
+    silêncio). Retorna [(chave, [valores na ordem em que aparecem])].
+    """
+    caminho_config = caminho_config or os.path.splitext(config.__file__)[0] + '.py'
+    try:
+        with open(caminho_config, 'r', encoding='utf-8') as f:
+            arvore = ast.parse(f.read())
+    except (OSError, SyntaxError):
+        return []  # Sem o código-fonte (ex: executável empacotado) não há o que verificar
+    for no in ast.walk(arvore):
+        if (isinstance(no, ast.Assign) and isinstance(no.value, ast.Dict)
+                and any(isinstance(alvo, ast.Name) and alvo.id == nome_dicionario for alvo in no.targets)):
+            valores_por_chave = {}
+            for chave, valor in zip(no.value.keys, no.value.values):
+                if isinstance(chave, ast.Constant) and isinstance(valor, ast.Constant):
+                    valores_por_chave.setdefault(chave.value, []).append(valor.value)
+            return [(chave, valores) for chave, valores in valores_por_chave.items() if len(valores) > 1]
+    return []
+
+
+class TabelaOperacoes:
+    """
+    Uma linha por operação (nome normalizado) com 'Movimentação' e
+    'Classificação DRE'. Levanta ValueError se dois nomes diferentes do mesmo
+    dicionário ficarem iguais depois de normalizados com classificações
+    diferentes. Códigos usados por mais de uma operação (ex: '1-VENDA...' e
+    '1-À VISTA') só são encontrados pelo nome.
+    """
+
+    def __init__(self, mapa_movimentacao, mapa_dre):
+        self.movimentacao = self._normalizar_mapa(mapa_movimentacao, 'movimentacao_map')
+        self.dre = self._normalizar_mapa(mapa_dre, 'dre_map')
+        nomes = sorted(set(self.movimentacao) | set(self.dre))
+        self.por_nome = {nome: (self.movimentacao.get(nome), self.dre.get(nome)) for nome in nomes}
+        nomes_por_codigo = {}
+        for nome in nomes:
+            codigo = codigo_operacao(nome)
+            if codigo is not None:
+                nomes_por_codigo.setdefault(codigo, []).append(nome)
+        self.por_codigo = {codigo: self.por_nome[nomes_do_codigo[0]]
+                           for codigo, nomes_do_codigo in nomes_por_codigo.items() if len(nomes_do_codigo) == 1}
+        self.codigos_ambiguos = sorted(codigo for codigo, nomes_do_codigo in nomes_por_codigo.items() if len(nomes_do_codigo) > 1)
+
+    @staticmethod
+    def _normalizar_mapa(mapa, nome_mapa):
+        normalizado = {}
+        for nome, valor in mapa.items():
+            chave = normalizar_operacao(nome)
+            if chave in normalizado and normalizado[chave] != valor:
+                raise ValueError(f"{nome_mapa}: '{nome}' repete a operação '{chave}' com outra classificação "
+                                 f"('{normalizado[chave]}' x '{valor}').")
+            normalizado[chave] = valor
+        return normalizado
+
+    def classificar_nome(self, nome):
+        """Retorna (movimentação ou None, classificação DRE ou None) de um tipo de operação."""
+        chave = normalizar_operacao(nome)
+        if chave in self.por_nome:
+            return self.por_nome[chave]
+        return self.por_codigo.get(codigo_operacao(chave), (None, None))
+
+    def classificar(self, tipos_operacao):
+        """
+        Classifica uma coluna de tipos de operação: cada valor distinto é
+        procurado uma vez e o resultado é replicado pelos códigos da coluna.
+        Retorna (Movimentação, Classificação DRE) como colunas categóricas, já
+        com os valores padrão para as operações não mapeadas.
+        """
+        if isinstance(tipos_operacao.dtype, pd.CategoricalDtype):
+            distintos, codigos = tipos_operacao.cat.categories, tipos_operacao.cat.codes.to_numpy()
+        else:
+            codigos, distintos = pd.factorize(tipos_operacao)
+        classificados = [self.classificar_nome(nome) for nome in distintos]
+        posicoes = np.where(codigos >= 0, codigos, len(distintos))  # Linhas sem tipo de operação ficam com o valor padrão
+        colunas = []
+        for posicao, valor_padrao in ((0, MOVIMENTACAO_PADRAO), (1, DRE_PADRAO)):
+            por_distinto = [classificacao[posicao] for classificacao in classificados] + [valor_padrao]
+            codigos_classe, classes = pd.factorize(pd.Series(por_distinto, dtype=object).fillna(valor_padrao))
+            categoria = pd.Categorical.from_codes(codigos_classe[posicoes], categories=pd.Index(classes))
+            colunas.append(pd.Series(categoria, index=tipos_operacao.index))
+        return colunas[0], colunas[1]
+
+    def operacoes_nao_mapeadas(self, df, coluna_valor='Total do Item'):
+        """
+        Lista as operações sem classificação em algum dos dicionários, com o
+        número de linhas e o total de 'coluna_valor' de cada uma.
+        """
+        colunas = ['Código', 'Tipo de Operação', 'Falta em', 'Linhas', 'Valor Total']
+        if df.empty:
+            return pd.DataFrame(columns=colunas)
+        resumo = df.groupby('Tipo de Operação', observed=True)[coluna_valor].agg(['size', 'sum'])
+        linhas_relatorio = []
+        for nome, (linhas, valor_total) in resumo.iterrows():
+            movimentacao, classificacao_dre = self.classificar_nome(nome)
+            faltas = [nome_mapa for nome_mapa, valor in (('movimentacao_map', movimentacao), ('dre_map', classificacao_dre)) if valor is None]
+            if faltas:
+                linhas_relatorio.append((codigo_operacao(normalizar_operacao(nome)), nome, ', '.join(faltas), int(linhas), valor_total))
+        relatorio = pd.DataFrame(linhas_relatorio, columns=colunas)
+        return relatorio.sort_values('Valor Total', key=abs, ascending=False, ignore_index=True)
+
+
+def _validar_config():
+    for nome_dicionario in ('movimentacao_map', 'dre_map'):
+        for chave, valores in chaves_repetidas_no_config(nome_dicionario):
+            if len(set(valores)) > 1:
+                raise ValueError(f"config.{nome_dicionario}: a chave '{chave}' aparece {len(valores)} vezes com valores diferentes {valores}.")
+            print(f"  [AVISO] config.{nome_dicionario}: a chave '{chave}' aparece {len(valores)} vezes.")
+
+
+_validar_config()
+TABELA_OPERACOES = TabelaOperacoes(movimentacao_map, dre_map)
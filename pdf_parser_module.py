@@ -1,99 +1,577 @@
 # pdf_parser_module.py (Versão anterior com extração baseada em 'Carga:')
 
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
 from PyPDF2 import PdfReader
 import pdfplumber
 import re
 import os
-from config import movimentacao_map
+import json
+import hashlib
+import time
+from concurrent.futures import ProcessPoolExecutor
+from metricas_module import nova_metrica_arquivo, contar_campos_na
+import operacoes_module
+from operacoes_module import TABELA_OPERACOES
+from config import movimentacao_map, NUM_PROCESSOS_EXTRACAO, PAGINAS_POR_LOTE_EXTRACAO, TAMANHO_LOTE_REGISTROS, PAGINAS_POR_LOTE_INVENTARIO
 
-def extrair_texto_pdf_movimentacao(caminho_arquivo_pdf):
-    try:
-        texto_completo = ""
-        with open(caminho_arquivo_pdf, 'rb') as f:
-            leitor = PdfReader(f)
-            for pagina in leitor.pages:
-                texto_completo += pagina.extract_text() or ""
-        return texto_completo
-    except Exception as e:
-        print(f"  [ERRO] Não foi possível ler o arquivo '{os.path.basename(caminho_arquivo_pdf)}'. Erro: {e}")
-        return ""
-
-def analisar_relatorio_movimentacao(texto, nome_arquivo_origem):
-    dados_finais = []
-    padrao_bloco = r'((?:[\d-]+-?NFSE|[\d-]+)\s*Nota.*?)(?=(?:[\d-]+-?NFSE|[\d-]+)\s*Nota|Total do Dia|Total do Estabelecimento|T o t a l  G e r a l|$)'
-    blocos = re.findall(padrao_bloco, texto, re.DOTALL)
-    for bloco in blocos:
-        # A regra de extração antiga e menos confiável
-        padrao_operacao = re.search(r'Carga:(.*?)\n', bloco)
-        
-        padrao_nota_cliente = re.search(r'([\d-]+(?:-?NFSE)?)\s*Nota(.*?)\s*Cli-', bloco)
-        padrao_cpf_cnpj = re.search(r'(CPF|CNPJ):\s*([\d\.\-\/]+)', bloco)
-        padrao_cidade_data = re.search(r'Cidade:\s*(.*?)\s*UF:\s*(\w{2})Data Emissão:\s*(\d{2}/\d{2}/\d{4})', bloco)
-        padrao_total_nota = re.search(r'Total da Nota\s+[\d.,]+\s+[\d.,]+\s+([\d.,]+)', bloco)
-        padrao_representante = re.search(r'Repre\s*-\s*((?!Unid\.).*?)\n', bloco)
-        padrao_pagamento_com_data = re.search(r'Forma Pagto.*?\n.*?\s(\d{2}/\d{2}/\d{4})\s+[\d-]+\s+\d+\s+([^\n]*)', bloco, re.DOTALL)
-        padrao_pagamento_sem_valor = re.search(r'Forma Pagto.*?\n[\d.,\s]+(\d+\s+Sem valor comercial)', bloco, re.DOTALL)
-        padrao_pagamento_a_vista = re.search(r'Forma Pagto.*?\n.*?\s(\d+\s+À vista.*)', bloco, re.DOTALL)
-        padrao_pagamento_cartao = re.search(r'Forma Pagto.*?\n.*?\s(\d+\s+Cartão[^\n]*)', bloco, re.DOTALL)
-        
-        nota = padrao_nota_cliente.group(1).strip() if padrao_nota_cliente else 'N/A'
-        cliente = padrao_nota_cliente.group(2).strip() if padrao_nota_cliente else 'N/A'
-        tipo_operacao = padrao_operacao.group(1).strip() if padrao_operacao else 'N/A'
-        cpf_cnpj = padrao_cpf_cnpj.group(2).strip() if padrao_cpf_cnpj else 'N/A'
-        representante = padrao_representante.group(1).strip() if padrao_representante and padrao_representante.group(1).strip() else 'N/A'
-        cidade, uf, data_emissao = ('N/A', 'N/A', 'N/A')
+# Incremente ao mudar o layout dos registros gerados; invalida o cache de análise.
+VERSAO_PARSER = 4
+
+def assinatura_parser():
+    """
+    Identifica a versão do analisador para o cache de análise: combina
+    VERSAO_PARSER, o código-fonte deste módulo e do operacoes_module (que
+    preenche a coluna 'Movimentação' das tabelas guardadas) e o
+    movimentacao_map, de modo que qualquer alteração em um deles invalida os
+    resultados guardados.
+    """
+    codigo_fonte = b""
+    for caminho in (__file__, operacoes_module.__file__):
+        with open(caminho, 'rb') as f:
+            codigo_fonte += f.read()
+    conteudo = json.dumps(movimentacao_map, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(str(VERSAO_PARSER).encode() + codigo_fonte + conteudo).hexdigest()
+
+def contar_paginas_pdf(caminho_arquivo_pdf):
+    with open(caminho_arquivo_pdf, 'rb') as f:
+        return len(PdfReader(f).pages)
+
+def iterar_paginas_pdf_movimentacao(caminho_arquivo_pdf, pagina_inicial=0, pagina_final=None):
+    """Gera o texto de cada página em [pagina_inicial, pagina_final), uma por vez. Erros de leitura são propagados."""
+    with open(caminho_arquivo_pdf, 'rb') as f:
+        leitor = PdfReader(f)
+        for pagina in leitor.pages[pagina_inicial:pagina_final]:
+            yield pagina.extract_text() or ""
+
+def _extrair_texto_paginas(caminho_arquivo_pdf, pagina_inicial=0, pagina_final=None):
+    """Extrai o texto das páginas [pagina_inicial, pagina_final). Erros de leitura são propagados."""
+    return "".join(iterar_paginas_pdf_movimentacao(caminho_arquivo_pdf, pagina_inicial, pagina_final))
+
+# --- Padrões do relatório de movimentações (compilados uma única vez) ---
+RE_BLOCO = re.compile(r'((?:[\d-]+-?NFSE|[\d-]+)\s*Nota.*?)(?=(?:[\d-]+-?NFSE|[\d-]+)\s*Nota|Total do Dia|Total do Estabelecimento|T o t a l  G e r a l|$)', re.DOTALL)
+RE_OPERACAO = re.compile(r'Carga:(.*?)\n')
+RE_NOTA_CLIENTE = re.compile(r'([\d-]+(?:-?NFSE)?)\s*Nota(.*?)\s*Cli-')
+RE_CPF_CNPJ = re.compile(r'(CPF|CNPJ):\s*([\d\.\-\/]+)')
+RE_CIDADE_DATA = re.compile(r'Cidade:\s*(.*?)\s*UF:\s*(\w{2})Data Emissão:\s*(\d{2}/\d{2}/\d{4})')
+RE_TOTAL_NOTA = re.compile(r'Total da Nota\s+[\d.,]+\s+[\d.,]+\s+([\d.,]+)')
+RE_REPRESENTANTE = re.compile(r'Repre\s*-\s*((?!Unid\.).*?)\n')
+RE_PAGAMENTO_COM_DATA = re.compile(r'Forma Pagto.*?\n.*?\s(\d{2}/\d{2}/\d{4})\s+[\d-]+\s+\d+\s+([^\n]*)', re.DOTALL)
+RE_PAGAMENTO_SEM_VALOR = re.compile(r'Forma Pagto.*?\n[\d.,\s]+(\d+\s+Sem valor comercial)', re.DOTALL)
+RE_PAGAMENTO_A_VISTA = re.compile(r'Forma Pagto.*?\n.*?\s(\d+\s+À vista.*)', re.DOTALL)
+RE_PAGAMENTO_CARTAO = re.compile(r'Forma Pagto.*?\n.*?\s(\d+\s+Cartão[^\n]*)', re.DOTALL)
+RE_ITENS = re.compile(r'(\d{7,}-.*?)\s+([A-Z]{2,4})\s+([\d.,]+)\s+([\d.,]+)\s+([\d.,]+)\s+(\d{4})\s+Item:\s+\d+\s+([\d.,]+)')
+
+# Variantes usadas pelo varredor de linhas. As de pagamento são os mesmos
+# padrões acima sem o prefixo 'Forma Pagto.*?\n', aplicados a partir da linha
+# seguinte à do 'Forma Pagto'.
+_RE_REPRESENTANTE_LINHA = re.compile(r'Repre\s*-\s*(\S.*)')
+_RE_CAUDA_PAGAMENTO_COM_DATA = re.compile(r'\s(\d{2}/\d{2}/\d{4})\s+[\d-]+\s+\d+\s+([^\n]*)')
+_RE_CAUDA_PAGAMENTO_SEM_VALOR = re.compile(r'[\d.,\s]+(\d+\s+Sem valor comercial)')
+_RE_CAUDA_PAGAMENTO_A_VISTA = re.compile(r'\s(\d+\s+À vista.*)', re.DOTALL)
+_RE_CAUDA_PAGAMENTO_CARTAO = re.compile(r'\s(\d+\s+Cartão[^\n]*)')
+
+def _limpar_forma_pagto(forma_pagto):
+    if forma_pagto != 'N/A':
+        if 'Emissão:' in forma_pagto: forma_pagto = forma_pagto.split('Emissão:')[0]
+        if 'Entradas' in forma_pagto: forma_pagto = forma_pagto.split('Entradas')[0]
+        forma_pagto = re.sub(r'^\d+\s*', '', forma_pagto).strip()
+    return forma_pagto
+
+COLUNAS_CABECALHO_MOVIMENTACAO = ('Nota', 'Tipo de Operação', 'Cliente', 'CPF/CNPJ', 'Representante', 'Cidade', 'UF',
+                                  'Data Emissão', 'Total da Nota', 'Data de Vencimento', 'Forma de Pagto')
+COLUNAS_ITEM_MOVIMENTACAO = ('Item Descrição', 'Unidade', 'Valor Unitário', 'Total do Item', 'Preço de Venda', 'CFOP', 'Quantidade')
+# Colunas de item com poucos valores distintos, guardadas como categorias
+COLUNAS_ITEM_CATEGORICAS = ('Item Descrição', 'Unidade', 'CFOP')
+# Mesma ordem de colunas dos registros do analisador original (benchmark_pipeline)
+ORDEM_COLUNAS_MOVIMENTACAO = (('Arquivo Origem',) + COLUNAS_CABECALHO_MOVIMENTACAO[:8] + COLUNAS_ITEM_MOVIMENTACAO
+                              + COLUNAS_CABECALHO_MOVIMENTACAO[8:])
+
+def _categorica(valores):
+    """Codifica uma lista de strings como Categorical, com as categorias na ordem em que aparecem."""
+    codigos, categorias = pd.factorize(np.array(valores, dtype=object))
+    return pd.Categorical.from_codes(codigos, categories=pd.Index(categorias))
+
+class ConstrutorMovimentacoes:
+    """
+    Acumula os registros de movimentação em colunas. O cabeçalho de cada nota
+    é guardado uma única vez e os itens apontam para ele pelo índice da nota;
+    montar_tabela() gera as colunas de texto repetitivas como categorias.
+    """
+
+    def __init__(self, nome_arquivo_origem):
+        self.nome_arquivo_origem = nome_arquivo_origem
+        self.colunas_cabecalho = tuple([] for _ in COLUNAS_CABECALHO_MOVIMENTACAO)
+        self.nota_do_item = []
+        self.colunas_item = tuple([] for _ in COLUNAS_ITEM_MOVIMENTACAO)
+
+    def __len__(self):
+        return len(self.nota_do_item)
+
+    def adicionar_nota(self, cabecalho, itens_encontrados):
+        indice_nota = len(self.colunas_cabecalho[0])
+        for coluna, valor in zip(self.colunas_cabecalho, cabecalho):
+            coluna.append(valor)
+        descricoes, unidades, valores_unitarios, totais, precos_venda, cfops, quantidades = self.colunas_item
+        for item in itens_encontrados:
+            self.nota_do_item.append(indice_nota)
+            descricoes.append(item[0].strip())
+            unidades.append(item[1])
+            valores_unitarios.append(item[2])
+            totais.append(item[3])
+            precos_venda.append(item[4])
+            cfops.append(item[5])
+            quantidades.append(item[6])
+
+    def montar_tabela(self):
+        """Retorna o DataFrame dos registros acumulados, já com a coluna 'Movimentação'."""
+        if not self.nota_do_item:
+            return pd.DataFrame()
+        nota_do_item = np.array(self.nota_do_item, dtype=np.intp)
+        colunas = {'Arquivo Origem': pd.Categorical.from_codes(np.zeros(len(nota_do_item), dtype=np.int8),
+                                                               categories=pd.Index([self.nome_arquivo_origem]))}
+        for nome_coluna, valores_por_nota in zip(COLUNAS_CABECALHO_MOVIMENTACAO, self.colunas_cabecalho):
+            por_nota = _categorica(valores_por_nota)
+            colunas[nome_coluna] = pd.Categorical.from_codes(por_nota.codes[nota_do_item], categories=por_nota.categories)
+        for nome_coluna, valores in zip(COLUNAS_ITEM_MOVIMENTACAO, self.colunas_item):
+            colunas[nome_coluna] = _categorica(valores) if nome_coluna in COLUNAS_ITEM_CATEGORICAS else pd.array(valores, dtype=str)
+        tabela = pd.DataFrame({nome_coluna: colunas[nome_coluna] for nome_coluna in ORDEM_COLUNAS_MOVIMENTACAO})
+        tabela['Movimentação'], _ = TABELA_OPERACOES.classificar(tabela['Tipo de Operação'])
+        return tabela
+
+def concatenar_tabelas_movimentacoes(tabelas):
+    """
+    Concatena tabelas de movimentação unindo as categorias de cada coluna
+    categórica; um pd.concat direto converteria para texto as colunas cujas
+    categorias diferem entre as tabelas.
+    """
+    tabelas = [tabela for tabela in tabelas if not tabela.empty]
+    if not tabelas:
+        return pd.DataFrame()
+    if len(tabelas) == 1:
+        return tabelas[0]
+    colunas_unidas = {}
+    for nome_coluna, tipo in tabelas[0].dtypes.items():
+        if isinstance(tipo, pd.CategoricalDtype) and all(isinstance(tabela[nome_coluna].dtype, pd.CategoricalDtype) for tabela in tabelas):
+            colunas = [tabela[nome_coluna] for tabela in tabelas]
+            if len({str(coluna.cat.categories.dtype) for coluna in colunas}) > 1:
+                # Tabelas lidas do cache (Parquet) e recém-analisadas podem ter categorias object x str
+                colunas = [coluna.cat.rename_categories(coluna.cat.categories.astype(str)) for coluna in colunas]
+            colunas_unidas[nome_coluna] = union_categoricals(colunas)
+    tabela_final = pd.concat(tabelas, ignore_index=True)
+    for nome_coluna, coluna in colunas_unidas.items():
+        tabela_final[nome_coluna] = coluna
+    return tabela_final
+
+def _inicio_da_nota(texto, posicao_nota):
+    """
+    Dado um 'Nota' do texto, devolve a posição onde o padrão de início de bloco
+    ('[\\d-]+\\s*Nota' ou '[\\d-]+-?NFSE\\s*Nota') começaria, ou None se o
+    número da nota não estiver ali. Equivale ao casamento mais à esquerda do regex.
+    """
+    posicao = posicao_nota
+    while posicao > 0 and texto[posicao - 1].isspace():
+        posicao -= 1
+    if texto.endswith('NFSE', 0, posicao):
+        posicao -= 4
+    inicio = posicao
+    while inicio > 0 and (texto[inicio - 1].isdecimal() or texto[inicio - 1] == '-'):
+        inicio -= 1
+    return inicio if inicio < posicao else None
+
+def _localizar_blocos(texto):
+    """
+    Devolve os intervalos (início, fim) dos blocos de nota, com a mesma
+    segmentação de RE_BLOCO, mas localizando as fronteiras por busca de
+    palavras ('Nota', totais) em vez de testar o lookahead em cada caractere.
+    """
+    fronteiras = []
+    for palavra in ('Total do Dia', 'Total do Estabelecimento', 'T o t a l  G e r a l'):
+        posicao = texto.find(palavra)
+        while posicao != -1:
+            fronteiras.append((posicao, False))
+            posicao = texto.find(palavra, posicao + len(palavra))
+    posicao = texto.find('Nota')
+    while posicao != -1:
+        inicio = _inicio_da_nota(texto, posicao)
+        if inicio is not None:
+            fronteiras.append((inicio, True))
+        posicao = texto.find('Nota', posicao + 4)
+    fronteiras.sort()
+
+    intervalos = []
+    inicio_bloco = None
+    for posicao, abre_bloco in fronteiras:
+        if inicio_bloco is not None:
+            intervalos.append((inicio_bloco, posicao))
+            inicio_bloco = None
+        if abre_bloco:
+            inicio_bloco = posicao
+    if inicio_bloco is not None:
+        # Equivalente ao '$' do lookahead: o bloco final não inclui a última quebra de linha.
+        intervalos.append((inicio_bloco, len(texto) - 1 if texto.endswith('\n') else len(texto)))
+    return intervalos
+
+def _buscar_pagamento(bloco, fim_linha_forma_pagto):
+    """Aplica as quatro regras de pagamento, na ordem original, a partir da linha seguinte à do 'Forma Pagto'."""
+    inicio_cauda = fim_linha_forma_pagto + 1
+    padrao = _RE_CAUDA_PAGAMENTO_COM_DATA.search(bloco, inicio_cauda)
+    if padrao:
+        return padrao.group(2).strip(), padrao.group(1).strip()
+    if bloco.find('Sem valor comercial', inicio_cauda) != -1:
+        fim_linha = fim_linha_forma_pagto
+        while fim_linha != -1:
+            padrao = _RE_CAUDA_PAGAMENTO_SEM_VALOR.match(bloco, fim_linha + 1)
+            if padrao:
+                return padrao.group(1).strip(), 'N/A'
+            fim_linha = bloco.find('\n', fim_linha + 1)
+    if bloco.find('À vista', inicio_cauda) != -1:
+        padrao = _RE_CAUDA_PAGAMENTO_A_VISTA.search(bloco, inicio_cauda)
+        if padrao:
+            return padrao.group(1).strip(), 'N/A'
+    if bloco.find('Cartão', inicio_cauda) != -1:
+        padrao = _RE_CAUDA_PAGAMENTO_CARTAO.search(bloco, inicio_cauda)
+        if padrao:
+            return padrao.group(1).strip(), 'N/A'
+    return 'N/A', 'N/A'
+
+def _fim_da_linha(bloco, posicao):
+    fim = bloco.find('\n', posicao)
+    return len(bloco) if fim == -1 else fim
+
+def _casar_na_linha(padrao, bloco, posicao):
+    """
+    Tenta o padrão ancorado na palavra-chave, limitado à linha dela. Se a linha
+    foge do layout (campo quebrado entre linhas, por exemplo), usa a busca
+    original no bloco inteiro, que dá o mesmo resultado do analisador por regex.
+    """
+    return padrao.match(bloco, posicao, _fim_da_linha(bloco, posicao)) or padrao.search(bloco)
+
+def _buscar_itens(bloco):
+    """
+    Casa o padrão de itens só nas linhas que contêm 'Item:'. Se alguma dessas
+    linhas não render um item por 'Item:' (item quebrado entre linhas), usa o
+    findall no bloco inteiro.
+    """
+    itens_encontrados = []
+    posicao = bloco.find('Item:')
+    while posicao != -1:
+        inicio_linha = bloco.rfind('\n', 0, posicao) + 1
+        fim_linha = _fim_da_linha(bloco, posicao)
+        itens_da_linha = RE_ITENS.findall(bloco, inicio_linha, fim_linha)
+        if len(itens_da_linha) != bloco.count('Item:', inicio_linha, fim_linha):
+            return RE_ITENS.findall(bloco)
+        itens_encontrados.extend(itens_da_linha)
+        posicao = bloco.find('Item:', fim_linha)
+    return itens_encontrados
+
+def _varrer_bloco(bloco):
+    """
+    Extrai o cabeçalho e os itens de um bloco de nota. Cada campo é localizado
+    pela primeira ocorrência da sua palavra-chave e casado só dentro da linha
+    dela, com padrões compilados; o resultado é idêntico ao do analisador
+    original por regex (benchmark_pipeline). Retorna (cabecalho, itens).
+    """
+    itens_encontrados = _buscar_itens(bloco)
+    if not itens_encontrados:
+        return None, []
+
+    padrao_nota_cliente = _casar_na_linha(RE_NOTA_CLIENTE, bloco, 0)
+    nota = padrao_nota_cliente.group(1).strip() if padrao_nota_cliente else 'N/A'
+    cliente = padrao_nota_cliente.group(2).strip() if padrao_nota_cliente else 'N/A'
+
+    tipo_operacao = 'N/A'
+    posicao = bloco.find('Carga:')
+    if posicao != -1 and bloco.find('\n', posicao) != -1:
+        tipo_operacao = bloco[posicao + 6:bloco.find('\n', posicao)].strip()
+
+    cpf_cnpj = 'N/A'
+    posicoes = [p for p in (bloco.find('CPF:'), bloco.find('CNPJ:')) if p != -1]
+    if posicoes:
+        padrao_cpf_cnpj = _casar_na_linha(RE_CPF_CNPJ, bloco, min(posicoes))
+        if padrao_cpf_cnpj: cpf_cnpj = padrao_cpf_cnpj.group(2).strip()
+
+    cidade, uf, data_emissao = ('N/A', 'N/A', 'N/A')
+    posicao = bloco.find('Cidade:')
+    if posicao != -1:
+        padrao_cidade_data = _casar_na_linha(RE_CIDADE_DATA, bloco, posicao)
         if padrao_cidade_data: cidade, uf, data_emissao = [s.strip() for s in padrao_cidade_data.groups()]
-        total_nota = padrao_total_nota.group(1).strip() if padrao_total_nota else 'N/A'
-        forma_pagto, data_vencimento = ('N/A', 'N/A')
-        if padrao_pagamento_com_data:
-            data_vencimento = padrao_pagamento_com_data.group(1).strip()
-            forma_pagto = padrao_pagamento_com_data.group(2).strip()
-        elif padrao_pagamento_sem_valor: forma_pagto = padrao_pagamento_sem_valor.group(1).strip()
-        elif padrao_pagamento_a_vista: forma_pagto = padrao_pagamento_a_vista.group(1).strip()
-        elif padrao_pagamento_cartao: forma_pagto = padrao_pagamento_cartao.group(1).strip()
-        if forma_pagto != 'N/A':
-            if 'Emissão:' in forma_pagto: forma_pagto = forma_pagto.split('Emissão:')[0]
-            if 'Entradas' in forma_pagto: forma_pagto = forma_pagto.split('Entradas')[0]
-            forma_pagto = re.sub(r'^\d+\s*', '', forma_pagto).strip()
-        
-        padrao_itens = re.compile(r'(\d{7,}-.*?)\s+([A-Z]{2,4})\s+([\d.,]+)\s+([\d.,]+)\s+([\d.,]+)\s+(\d{4})\s+Item:\s+\d+\s+([\d.,]+)')
-        
-        itens_encontrados = padrao_itens.findall(bloco)
+
+    total_nota = 'N/A'
+    posicao = bloco.find('Total da Nota')
+    if posicao != -1:
+        padrao_total_nota = _casar_na_linha(RE_TOTAL_NOTA, bloco, posicao)
+        if padrao_total_nota: total_nota = padrao_total_nota.group(1).strip()
+
+    representante = 'N/A'
+    posicao = bloco.find('Repre')
+    if posicao != -1:
+        fim_linha = bloco.find('\n', posicao)
+        padrao = _RE_REPRESENTANTE_LINHA.match(bloco, posicao, fim_linha) if fim_linha != -1 else None
+        if padrao and not padrao.group(1).startswith('Unid.'):
+            representante = padrao.group(1).strip()
+        else:
+            padrao = RE_REPRESENTANTE.search(bloco)
+            if padrao and padrao.group(1).strip(): representante = padrao.group(1).strip()
+
+    forma_pagto, data_vencimento = ('N/A', 'N/A')
+    posicao = bloco.find('Forma Pagto')
+    if posicao != -1 and bloco.find('\n', posicao) != -1:
+        forma_pagto, data_vencimento = _buscar_pagamento(bloco, bloco.find('\n', posicao))
+    forma_pagto = _limpar_forma_pagto(forma_pagto)
+
+    cabecalho = (nota, tipo_operacao, cliente, cpf_cnpj, representante, cidade, uf, data_emissao,
+                 total_nota, data_vencimento, forma_pagto)
+    return cabecalho, itens_encontrados
+
+def iterar_blocos_movimentacao(paginas):
+    """
+    Recebe os textos das páginas (em qualquer iterável) e gera cada bloco de
+    nota assim que ele se fecha, isto é, quando a fronteira seguinte (outra
+    nota ou um total) já apareceu. Só o trecho a partir da última fronteira
+    fica guardado entre uma página e outra, então blocos que atravessam a
+    quebra de página são montados normalmente e a memória não cresce com o
+    tamanho do relatório. A segmentação é a mesma de _localizar_blocos.
+    """
+    pendente = ""
+    for texto_pagina in paginas:
+        pendente += texto_pagina
+        intervalos = _localizar_blocos(pendente)
+        # Um bloco que vai até o fim do texto ainda pode continuar na próxima página.
+        bloco_aberto = bool(intervalos) and intervalos[-1][1] >= len(pendente) - 1
+        for inicio, fim in (intervalos[:-1] if bloco_aberto else intervalos):
+            yield pendente[inicio:fim]
+        corte = intervalos[-1][0] if bloco_aberto else _fim_da_ultima_fronteira(pendente, intervalos)
+        if corte:
+            pendente = pendente[corte:]
+    for inicio, fim in _localizar_blocos(pendente):
+        yield pendente[inicio:fim]
+
+def _fim_da_ultima_fronteira(texto, intervalos):
+    """Sem bloco aberto, o texto até o fim do último total (ou bloco fechado) não é mais necessário."""
+    corte = intervalos[-1][1] if intervalos else 0
+    for palavra in ('Total do Dia', 'Total do Estabelecimento', 'T o t a l  G e r a l'):
+        posicao = texto.rfind(palavra)
+        if posicao != -1:
+            corte = max(corte, posicao + len(palavra))
+    return corte
+
+def iterar_lotes_movimentacao(paginas, nome_arquivo_origem, tamanho_lote=None, metricas=None):
+    """
+    Gera os registros das movimentações em lotes (ConstrutorMovimentacoes) de
+    até 'tamanho_lote' registros (None usa TAMANHO_LOTE_REGISTROS do config),
+    à medida que as páginas são lidas. Se 'metricas' for informado, conta os
+    blocos, os blocos sem itens e os campos do cabeçalho que ficaram 'N/A'.
+    """
+    if tamanho_lote is None:
+        tamanho_lote = TAMANHO_LOTE_REGISTROS
+    lote = ConstrutorMovimentacoes(nome_arquivo_origem)
+    for bloco in iterar_blocos_movimentacao(paginas):
+        cabecalho, itens_encontrados = _varrer_bloco(bloco)
+        if metricas is not None:
+            metricas['blocos_encontrados'] += 1
+            if not itens_encontrados:
+                metricas['blocos_sem_itens'] += 1
+            else:
+                contar_campos_na(metricas, COLUNAS_CABECALHO_MOVIMENTACAO, cabecalho)
         if not itens_encontrados: continue
-        for item in itens_encontrados:
-            dados_item = {
-                'Arquivo Origem': nome_arquivo_origem, 'Nota': nota, 'Tipo de Operação': tipo_operacao, 'Cliente': cliente,
-                'CPF/CNPJ': cpf_cnpj, 'Representante': representante, 'Cidade': cidade, 'UF': uf, 
-                'Data Emissão': data_emissao,
-                'Item Descrição': item[0].strip(), 'Unidade': item[1], 'Valor Unitário': item[2], 
-                'Total do Item': item[3], 'Preço de Venda': item[4], 'CFOP': item[5], 
-                'Quantidade': item[6], 'Total da Nota': total_nota, 
-                'Data de Vencimento': data_vencimento, 'Forma de Pagto': forma_pagto
-            }
-            dados_finais.append(dados_item)
-    return dados_finais
-
-def orquestrar_extracao_movimentacoes(lista_arquivos_pdf):
-    todos_os_dados = []
-    print("--- ETAPA 1: Iniciando Extração das Movimentações (Entradas/Saídas) ---")
+        lote.adicionar_nota(cabecalho, itens_encontrados)
+        if len(lote) >= tamanho_lote:
+            yield lote
+            lote = ConstrutorMovimentacoes(nome_arquivo_origem)
+    if len(lote):
+        yield lote
+
+def _cronometrar_paginas(paginas, metricas):
+    """Repassa as páginas contando quantas foram lidas e o tempo gasto para obtê-las (extração)."""
+    iterador = iter(paginas)
+    while True:
+        inicio = time.perf_counter()
+        try:
+            texto_pagina = next(iterador)
+        except StopIteration:
+            return
+        finally:
+            metricas['tempo_extracao_s'] += time.perf_counter() - inicio
+        metricas['paginas'] += 1
+        yield texto_pagina
+
+def _tabela_de_paginas(paginas, nome_arquivo_origem):
+    """
+    Converte cada lote em DataFrame assim que ele sai do analisador.
+    Retorna (tabela, metricas); o tempo de análise é o total menos o de extração.
+    """
+    metricas = nova_metrica_arquivo(nome_arquivo_origem)
+    inicio = time.perf_counter()
+    lotes = iterar_lotes_movimentacao(_cronometrar_paginas(paginas, metricas), nome_arquivo_origem, metricas=metricas)
+    tabela = concatenar_tabelas_movimentacoes([lote.montar_tabela() for lote in lotes])
+    metricas['tempo_analise_s'] = time.perf_counter() - inicio - metricas['tempo_extracao_s']
+    metricas['registros'] = len(tabela)
+    return tabela, metricas
+
+def _processar_arquivo_movimentacao(caminho_completo_pdf):
+    """Tarefa executada em um processo do pool: lê e analisa um PDF inteiro, página a página."""
+    return _tabela_de_paginas(iterar_paginas_pdf_movimentacao(caminho_completo_pdf), os.path.basename(caminho_completo_pdf))
+
+def _extrair_intervalo_cronometrado(caminho_arquivo_pdf, pagina_inicial, pagina_final):
+    """Tarefa do pool para PDFs divididos: retorna (texto do intervalo, segundos)."""
+    inicio = time.perf_counter()
+    texto_intervalo = _extrair_texto_paginas(caminho_arquivo_pdf, pagina_inicial, pagina_final)
+    return texto_intervalo, time.perf_counter() - inicio
+
+def _metrica_com_erro(nome_arquivo, erro):
+    metricas = nova_metrica_arquivo(nome_arquivo)
+    metricas['erro'] = str(erro)
+    return metricas
+
+def _relatar_registros(tabela):
+    if not tabela.empty:
+        print(f"    -> {len(tabela)} registros encontrados.")
+    else:
+        print("    -> Nenhum registro encontrado com os padrões atuais.")
+
+def _extrair_movimentacoes_em_sequencia(lista_arquivos_pdf):
+    """
+    Retorna, para cada PDF da lista, o par (tabela, metricas); a tabela é None
+    se o arquivo não pôde ser lido.
+    """
+    resultados_por_arquivo = []
     for caminho_completo_pdf in lista_arquivos_pdf:
         nome_arquivo = os.path.basename(caminho_completo_pdf)
         print(f"  > Lendo arquivo: '{nome_arquivo}'...")
-        texto_extraido = extrair_texto_pdf_movimentacao(caminho_completo_pdf)
-        if texto_extraido:
-            dados_do_arquivo = analisar_relatorio_movimentacao(texto_extraido, nome_arquivo)
-            if dados_do_arquivo:
-                print(f"    -> {len(dados_do_arquivo)} registros encontrados.")
-                todos_os_dados.extend(dados_do_arquivo)
+        try:
+            tabela, metricas = _processar_arquivo_movimentacao(caminho_completo_pdf)
+        except Exception as e:
+            print(f"  [ERRO] Não foi possível ler o arquivo '{nome_arquivo}'. Erro: {e}")
+            resultados_por_arquivo.append((None, _metrica_com_erro(nome_arquivo, e)))
+            continue
+        _relatar_registros(tabela)
+        resultados_por_arquivo.append((tabela, metricas))
+    return resultados_por_arquivo
+
+def _extrair_movimentacoes_em_paralelo(lista_arquivos_pdf, num_processos, paginas_por_lote):
+    """
+    Distribui os PDFs em um pool de processos. Arquivos com mais de
+    'paginas_por_lote' páginas têm o texto extraído em intervalos de páginas
+    separados, que são analisados em sequência na ordem original.
+    Um erro em um arquivo descarta apenas aquele arquivo (tabela None no retorno).
+    """
+    futuros_por_arquivo = {}
+    erros_por_arquivo = {}
+    with ProcessPoolExecutor(max_workers=num_processos) as executor:
+        futuros_por_intervalo = {}
+        for indice, caminho_completo_pdf in enumerate(lista_arquivos_pdf):
+            nome_arquivo = os.path.basename(caminho_completo_pdf)
+            try:
+                total_paginas = contar_paginas_pdf(caminho_completo_pdf)
+            except Exception as e:
+                print(f"  [ERRO] Não foi possível ler o arquivo '{nome_arquivo}'. Erro: {e}")
+                erros_por_arquivo[indice] = e
+                continue
+            if total_paginas <= paginas_por_lote:
+                futuros_por_arquivo[indice] = executor.submit(_processar_arquivo_movimentacao, caminho_completo_pdf)
             else:
-                print("    -> Nenhum registro encontrado com os padrões atuais.")
-    if not todos_os_dados:
+                print(f"  > '{nome_arquivo}' tem {total_paginas} páginas; dividindo em lotes de {paginas_por_lote}.")
+                futuros_por_intervalo[indice] = [
+                    executor.submit(_extrair_intervalo_cronometrado, caminho_completo_pdf, inicio, min(inicio + paginas_por_lote, total_paginas))
+                    for inicio in range(0, total_paginas, paginas_por_lote)
+                ]
+
+        extracao_por_arquivo = {}
+        for indice, futuros in futuros_por_intervalo.items():
+            nome_arquivo = os.path.basename(lista_arquivos_pdf[indice])
+            try:
+                resultados_intervalos = [futuro.result() for futuro in futuros]
+            except Exception as e:
+                print(f"  [ERRO] Não foi possível ler o arquivo '{nome_arquivo}'. Erro: {e}")
+                erros_por_arquivo[indice] = e
+                continue
+            extracao_por_arquivo[indice] = sum(tempo for _, tempo in resultados_intervalos)
+            textos_intervalos = [texto for texto, _ in resultados_intervalos]
+            futuros_por_arquivo[indice] = executor.submit(_tabela_de_paginas, textos_intervalos, nome_arquivo)
+
+        # Os resultados são coletados na ordem da lista de entrada, para que o
+        # DataFrame final seja idêntico ao do modo sequencial.
+        resultados_por_arquivo = []
+        for indice, caminho_completo_pdf in enumerate(lista_arquivos_pdf):
+            nome_arquivo = os.path.basename(caminho_completo_pdf)
+            futuro = futuros_por_arquivo.get(indice)
+            if futuro is None:
+                resultados_por_arquivo.append((None, _metrica_com_erro(nome_arquivo, erros_por_arquivo.get(indice))))
+                continue
+            print(f"  > Lendo arquivo: '{nome_arquivo}'...")
+            try:
+                tabela, metricas = futuro.result()
+            except Exception as e:
+                print(f"  [ERRO] Falha ao processar o arquivo '{nome_arquivo}'. Erro: {e}")
+                resultados_por_arquivo.append((None, _metrica_com_erro(nome_arquivo, e)))
+                continue
+            if indice in extracao_por_arquivo:
+                # Nos PDFs divididos, as "páginas" analisadas são os intervalos já extraídos.
+                metricas['paginas'] = contar_paginas_pdf(caminho_completo_pdf)
+                metricas['tempo_extracao_s'] = extracao_por_arquivo[indice]
+            _relatar_registros(tabela)
+            resultados_por_arquivo.append((tabela, metricas))
+    return resultados_por_arquivo
+
+def orquestrar_extracao_movimentacoes(lista_arquivos_pdf, num_processos=None, paginas_por_lote=None, cache=None, metricas=None):
+    """
+    Extrai as movimentações de todos os PDFs. Com 'num_processos' > 1 os
+    arquivos são processados em paralelo; None usa NUM_PROCESSOS_EXTRACAO
+    do config (e, se este também for None, todos os núcleos da máquina).
+    Com um 'cache' (cache_module.CacheAnalise), arquivos já analisados com o
+    mesmo conteúdo são lidos do cache em vez de extraídos de novo.
+    Se 'metricas' for uma lista, recebe um dicionário de métricas por arquivo
+    (veja metricas_module), na ordem de 'lista_arquivos_pdf'.
+    """
+    print("--- ETAPA 1: Iniciando Extração das Movimentações (Entradas/Saídas) ---")
+    if num_processos is None:
+        num_processos = NUM_PROCESSOS_EXTRACAO or os.cpu_count() or 1
+    if paginas_por_lote is None:
+        paginas_por_lote = PAGINAS_POR_LOTE_EXTRACAO
+
+    tabelas = [None] * len(lista_arquivos_pdf)
+    metricas_por_arquivo = [None] * len(lista_arquivos_pdf)
+    indices_pendentes = []
+    for indice, caminho_completo_pdf in enumerate(lista_arquivos_pdf):
+        tabela = cache.buscar(caminho_completo_pdf) if cache is not None else None
+        if tabela is None:
+            indices_pendentes.append(indice)
+            continue
+        nome_arquivo = os.path.basename(caminho_completo_pdf)
+        # O cache é por conteúdo: um mesmo PDF salvo com outro nome reaproveita a entrada
+        tabela['Arquivo Origem'] = pd.Categorical.from_codes(np.zeros(len(tabela), dtype=np.int8),
+                                                             categories=pd.Index([nome_arquivo]))
+        print(f"  > '{nome_arquivo}' sem alterações: {len(tabela)} registros lidos do cache.")
+        tabelas[indice] = tabela
+        metricas_por_arquivo[indice] = nova_metrica_arquivo(nome_arquivo)
+        metricas_por_arquivo[indice].update(origem='cache', registros=len(tabela))
+
+    arquivos_pendentes = [lista_arquivos_pdf[indice] for indice in indices_pendentes]
+    if not arquivos_pendentes:
+        resultados_por_arquivo = []
+    elif num_processos <= 1:
+        resultados_por_arquivo = _extrair_movimentacoes_em_sequencia(arquivos_pendentes)
+    else:
+        print(f"  > Modo paralelo: {num_processos} processos.")
+        resultados_por_arquivo = _extrair_movimentacoes_em_paralelo(arquivos_pendentes, num_processos, paginas_por_lote)
+
+    for indice, (tabela, metricas_arquivo) in zip(indices_pendentes, resultados_por_arquivo):
+        metricas_por_arquivo[indice] = metricas_arquivo
+        if tabela is None:
+            continue
+        tabelas[indice] = tabela
+        if cache is not None:
+            cache.guardar(lista_arquivos_pdf[indice], tabela)
+    if metricas is not None:
+        metricas.extend(metricas_por_arquivo)
+
+    df_movimentacoes = concatenar_tabelas_movimentacoes([tabela for tabela in tabelas if tabela is not None])
+    if df_movimentacoes.empty:
         return None
-    for item in todos_os_dados:
-        item['Movimentação'] = movimentacao_map.get(item.get('Tipo de Operação'), 'Outros')
     print("--- ETAPA 1: Concluída com Sucesso! ---\n")
-    return pd.DataFrame(todos_os_dados)
+    return df_movimentacoes
 
 def processar_texto_inventario_para_tabela(texto):
     dados_processados = []
@@ -114,27 +592,70 @@ def processar_texto_inventario_para_tabela(texto):
             print(f"  -> Linha {numero_linha + 1} do inventário ignorada (formato inesperado): '{linha_limpa}'")
     return dados_processados
 
-def orquestrar_extracao_inventario(caminho_pdf):
+def _extrair_inventario_intervalo(caminho_pdf, pagina_inicial, pagina_final):
+    """
+    Tarefa de um processo do pool: abre o próprio handle do pdfplumber e
+    processa as páginas [pagina_inicial, pagina_final). Retorna (linhas, segundos).
+    """
+    inicio = time.perf_counter()
+    dados_do_intervalo = []
+    with pdfplumber.open(caminho_pdf) as pdf:
+        for pagina in pdf.pages[pagina_inicial:pagina_final]:
+            texto_da_pagina = pagina.extract_text(layout=True, x_tolerance=2)
+            if texto_da_pagina:
+                dados_do_intervalo.extend(processar_texto_inventario_para_tabela(texto_da_pagina))
+    return dados_do_intervalo, time.perf_counter() - inicio
+
+def orquestrar_extracao_inventario(caminho_pdf, num_processos=None, paginas_por_lote=None, metricas=None):
+    """
+    Extrai o inventário. Com 'num_processos' > 1 o PDF é dividido em intervalos
+    de 'paginas_por_lote' páginas, extraídos em paralelo e reunidos na ordem
+    das páginas; None usa NUM_PROCESSOS_EXTRACAO e PAGINAS_POR_LOTE_INVENTARIO do config.
+    Se 'metricas' for uma lista, recebe as métricas do arquivo de inventário.
+    """
     print("--- ETAPA 2: Iniciando Extração do Inventário ---")
     if not os.path.exists(caminho_pdf):
         print(f"  [ERRO FATAL] O arquivo de inventário '{caminho_pdf}' não foi encontrado.")
         return None
+    if num_processos is None:
+        num_processos = NUM_PROCESSOS_EXTRACAO or os.cpu_count() or 1
+    if paginas_por_lote is None:
+        paginas_por_lote = PAGINAS_POR_LOTE_INVENTARIO
     dados_completos = []
+    metricas_arquivo = nova_metrica_arquivo(os.path.basename(caminho_pdf), tipo='inventario')
+    if metricas is not None:
+        metricas.append(metricas_arquivo)
     try:
-        with pdfplumber.open(caminho_pdf) as pdf:
-            print(f"  > Lendo o arquivo: '{os.path.basename(caminho_pdf)}'...")
-            for i, pagina in enumerate(pdf.pages):
-                texto_da_pagina = pagina.extract_text(layout=True, x_tolerance=2)
-                if texto_da_pagina:
-                    dados_da_pagina = processar_texto_inventario_para_tabela(texto_da_pagina)
-                    dados_completos.extend(dados_da_pagina)
+        print(f"  > Lendo o arquivo: '{os.path.basename(caminho_pdf)}'...")
+        total_paginas = contar_paginas_pdf(caminho_pdf)
+        metricas_arquivo['paginas'] = total_paginas
+        intervalos = [(inicio, min(inicio + paginas_por_lote, total_paginas)) for inicio in range(0, total_paginas, paginas_por_lote)]
+        if num_processos <= 1 or len(intervalos) <= 1:
+            resultados = (_extrair_inventario_intervalo(caminho_pdf, inicio, fim) for inicio, fim in intervalos)
+            executor = None
+        else:
+            print(f"  > Modo paralelo: {total_paginas} páginas em {len(intervalos)} intervalos, {num_processos} processos.")
+            executor = ProcessPoolExecutor(max_workers=min(num_processos, len(intervalos)))
+            futuros = [executor.submit(_extrair_inventario_intervalo, caminho_pdf, inicio, fim) for inicio, fim in intervalos]
+            resultados = (futuro.result() for futuro in futuros)
+        try:
+            # Os intervalos são reunidos na ordem das páginas, como no modo sequencial.
+            for (inicio, fim), (dados_do_intervalo, tempo) in zip(intervalos, resultados):
+                print(f"    -> Páginas {inicio + 1}-{fim}: {len(dados_do_intervalo)} linhas em {tempo:.2f}s")
+                dados_completos.extend(dados_do_intervalo)
+                metricas_arquivo['tempo_extracao_s'] += tempo
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
         if not dados_completos:
             print("  -> Nenhum dado de inventário foi extraído.")
             return None
         cabecalhos = ['Item', 'Descrição', 'UN', 'Saldo', 'Custo Unit.', 'Custo Total']
         df_inventario = pd.DataFrame(dados_completos, columns=cabecalhos)
+        metricas_arquivo['registros'] = len(df_inventario)
         print("--- ETAPA 2: Concluída com Sucesso! ---\n")
         return df_inventario
     except Exception as e:
         print(f"  [ERRO INESPERADO] Ocorreu um erro ao processar o PDF de inventário: {e}")
-        return None
\ No newline at end of file
+        metricas_arquivo['erro'] = str(e)
+        return None
@@ -0,0 +1,457 @@
+# planilha_simulada.py - Google Sheets simulado em memória
+# Implementa a parte da API do gspread que o projeto usa (cliente, planilha e
+# aba), guardando as células em memória, para exercitar o envio, a leitura e
+# o google_sheets_module sem conta do Google nem rede. Cada chamada custa uma
+# latência fixa mais um tempo por célula, conta para a cota por minuto de
+# leitura ou de escrita (estourou: erro 429, como a API) e pode falhar com
+# erros injetados. Por padrão o tempo corre num relógio simulado: os
+# resultados são determinísticos e não dependem da máquina (chamadas feitas
+# em paralelo somam o tempo como se fossem seguidas).
+# Exemplo:
+#   servico = ServicoSimulado(latencia_s=0.3, escritas_por_minuto=60, probabilidade_falha=0.02)
+#   planilha = servico.criar_planilha("COMPROP_Dashboard_Data")
+#   sessao = SessaoPlanilhas(lambda: ClienteSimulado(servico), caminho_chaves=None)
+
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import date, datetime, timedelta
+
+import requests
+from gspread.exceptions import APIError, SpreadsheetNotFound, WorksheetNotFound
+
+from envio_planilha_module import letra_coluna
+
+ORIGEM_DATAS = date(1899, 12, 30)  # Dia 0 das datas em número de série, como no Google Sheets
+CELULAS_MAXIMAS_PLANILHA = 10000000  # Limite de células de uma planilha do Google
+CODIGOS_FALHA_PADRAO = (429, 500, 503)
+
+
+class RelogioSimulado:
+    """Relógio que só anda quando alguém 'dorme': latência, esperas de cota e repetições."""
+
+    def __init__(self):
+        self.segundos = 0.0
+        self._trava = threading.Lock()
+
+    def agora(self):
+        return self.segundos
+
+    def dormir(self, segundos):
+        with self._trava:
+            self.segundos += max(segundos, 0.0)
+
+
+class RelogioReal:
+    """Tempo de verdade (as latências viram esperas reais e chamadas em paralelo se sobrepõem)."""
+
+    def agora(self):
+        return time.monotonic()
+
+    def dormir(self, segundos):
+        time.sleep(max(segundos, 0.0))
+
+
+def erro_api(codigo, mensagem=None):
+    """APIError do gspread com o código HTTP pedido, montado como o da API real."""
+    status = {400: 'INVALID_ARGUMENT', 404: 'NOT_FOUND', 429: 'RESOURCE_EXHAUSTED', 500: 'INTERNAL',
+              503: 'UNAVAILABLE'}.get(codigo, 'UNKNOWN')
+    resposta = requests.models.Response()
+    resposta.status_code = codigo
+    resposta._content = json.dumps({'error': {'code': codigo, 'message': mensagem or f"Erro simulado {codigo}",
+                                              'status': status}}).encode()
+    return APIError(resposta)
+
+
+def _numero_coluna(letras):
+    numero = 0
+    for letra in letras:
+        numero = numero * 26 + ord(letra) - 64
+    return numero
+
+
+def _separar_aba(intervalo):
+    """"'Aba'!A1:B2" -> ('Aba', 'A1:B2'); sem aba -> (None, intervalo)."""
+    if '!' not in intervalo:
+        return None, intervalo
+    aba, celulas = intervalo.rsplit('!', 1)
+    if aba.startswith("'") and aba.endswith("'"):
+        aba = aba[1:-1].replace("''", "'")
+    return aba, celulas
+
+
+def _limites(celulas):
+    """Intervalo A1 como (linha inicial, coluna inicial, linha final ou None, coluna final ou None), base 1."""
+    partes = celulas.upper().split(':')
+    inicio = re.fullmatch(r'([A-Z]*)(\d*)', partes[0])
+    fim = re.fullmatch(r'([A-Z]*)(\d*)', partes[-1])
+    if inicio is None or fim is None:
+        raise erro_api(400, f"Intervalo inválido: {celulas}")
+    linha_inicial = int(inicio[2]) if inicio[2] else 1
+    coluna_inicial = _numero_coluna(inicio[1]) if inicio[1] else 1
+    linha_final = int(fim[2]) if fim[2] else None
+    coluna_final = _numero_coluna(fim[1]) if fim[1] else None
+    return linha_inicial, coluna_inicial, linha_final, coluna_final
+
+
+def _valor_digitado(valor):
+    """Conversão do USER_ENTERED: dd/mm/aaaa vira data e texto numérico ('17,000', '4.832,08') vira número (planilha em pt-BR)."""
+    if not isinstance(valor, str):
+        return valor
+    texto = valor.strip()
+    data = re.fullmatch(r'(\d{1,2})/(\d{1,2})/(\d{4})', texto)
+    if data:
+        try:
+            return date(int(data[3]), int(data[2]), int(data[1]))
+        except ValueError:
+            return valor
+    if re.fullmatch(r'-?\d+', texto):
+        return int(texto)
+    if re.fullmatch(r'-?\d+,\d+', texto):
+        return float(texto.replace(',', '.'))
+    # Separador de milhar: '1.234,56' e '1.234' (em pt-BR o ponto nunca é decimal)
+    if re.fullmatch(r'-?\d{1,3}(\.\d{3})+(,\d+)?', texto):
+        numero = texto.replace('.', '').replace(',', '.')
+        return float(numero) if ',' in texto else int(numero)
+    return valor
+
+
+def _valor_lido(valor, formatado, datas_como_numero):
+    if isinstance(valor, date):
+        if formatado or not datas_como_numero:
+            return valor.strftime('%d/%m/%Y')
+        return (valor - ORIGEM_DATAS).days
+    if formatado and isinstance(valor, bool):
+        return 'VERDADEIRO' if valor else 'FALSO'
+    if formatado and isinstance(valor, (int, float)):
+        return (f"{valor:.15g}" if isinstance(valor, float) else str(valor)).replace('.', ',')
+    return valor
+
+
+def _sem_vazios_no_fim(valores):
+    fim = len(valores)
+    while fim and valores[fim - 1] == '':
+        fim -= 1
+    return valores[:fim]
+
+
+class ServicoSimulado:
+    """
+    Estado compartilhado por clientes, planilhas e abas simulados: relógio,
+    cotas, falhas e estatísticas. As cotas valem numa janela de 60s, como as
+    do Google ('leitura' e 'escrita' por minuto; chamadas ao Drive não
+    contam). As falhas vêm de 'falhas' ({número da chamada: código HTTP},
+    contando a partir de 1) e, com 'probabilidade_falha', sorteadas entre
+    'codigos_falha' com a 'semente' dada. As de 'falhas_apos_aplicar' (mesmo
+    formato) só chegam depois de a alteração ser feita, como uma resposta
+    perdida no caminho de volta. Com 'celulas_por_requisicao_max',
+    escritas maiores são recusadas com 400, como a API faz com corpos acima
+    de ~10 MB.
+    """
+
+    def __init__(self, latencia_s=0.2, segundos_por_celula=2e-6, leituras_por_minuto=60, escritas_por_minuto=60,
+                 falhas=None, probabilidade_falha=0.0, codigos_falha=CODIGOS_FALHA_PADRAO, semente=0, relogio=None,
+                 celulas_por_requisicao_max=None, falhas_apos_aplicar=None):
+        self.latencia_s = latencia_s
+        self.celulas_por_requisicao_max = celulas_por_requisicao_max
+        self.segundos_por_celula = segundos_por_celula
+        self.limites = {'leitura': leituras_por_minuto, 'escrita': escritas_por_minuto}
+        self.falhas = dict(falhas or {})
+        self.falhas_apos_aplicar = dict(falhas_apos_aplicar or {})
+        self.probabilidade_falha = probabilidade_falha
+        self.codigos_falha = tuple(codigos_falha)
+        self.acaso = random.Random(semente)
+        self.relogio = relogio or RelogioSimulado()
+        self.planilhas = {}  # Chave -> PlanilhaSimulada
+        self._janelas = {'leitura': deque(), 'escrita': deque()}
+        self._trava = threading.Lock()
+        self.estatisticas = {'chamadas': 0, 'leitura': 0, 'escrita': 0, 'drive': 0, 'celulas_lidas': 0,
+                             'celulas_gravadas': 0, 'erros_por_codigo': {}, 'por_metodo': {}}
+
+    def chamar(self, metodo, tipo):
+        """
+        Uma chamada à API: espera a latência e levanta o erro injetado ou o
+        429 da cota. 'tipo' é 'leitura', 'escrita' ou 'drive'. Retorna o
+        número da chamada, para o responder() das que alteram a planilha.
+        """
+        with self._trava:
+            self.estatisticas['chamadas'] += 1
+            numero = self.estatisticas['chamadas']
+            self.estatisticas['por_metodo'][metodo] = self.estatisticas['por_metodo'].get(metodo, 0) + 1
+            codigo = self.falhas.pop(numero, None)
+            if codigo is None and self.probabilidade_falha and self.acaso.random() < self.probabilidade_falha:
+                codigo = self.acaso.choice(self.codigos_falha)
+        self.relogio.dormir(self.latencia_s)
+        with self._trava:
+            janela = self._janelas.get(tipo)
+            if codigo is None and janela is not None:
+                agora = self.relogio.agora()
+                while janela and janela[0] <= agora - 60:
+                    janela.popleft()
+                if self.limites[tipo] and len(janela) >= self.limites[tipo]:
+                    codigo = 429
+                else:
+                    janela.append(agora)
+            if codigo is not None:
+                chave = str(codigo)
+                self.estatisticas['erros_por_codigo'][chave] = self.estatisticas['erros_por_codigo'].get(chave, 0) + 1
+            else:
+                self.estatisticas[tipo] += 1
+        if codigo is not None:
+            raise erro_api(codigo, "Quota exceeded" if codigo == 429 else None)
+        return numero
+
+    def responder(self, numero):
+        """Fim de uma chamada que alterou a planilha: levanta o erro de 'falhas_apos_aplicar', se houver."""
+        with self._trava:
+            codigo = self.falhas_apos_aplicar.pop(numero, None)
+            if codigo is not None:
+                chave = str(codigo)
+                self.estatisticas['erros_por_codigo'][chave] = self.estatisticas['erros_por_codigo'].get(chave, 0) + 1
+        if codigo is not None:
+            raise erro_api(codigo)
+
+    def transferir(self, celulas, tipo):
+        """Tempo de transferência das células de uma chamada que deu certo."""
+        self.relogio.dormir(celulas * self.segundos_por_celula)
+        with self._trava:
+            self.estatisticas['celulas_lidas' if tipo == 'leitura' else 'celulas_gravadas'] += celulas
+
+    def criar_planilha(self, titulo):
+        """Planilha nova com uma aba 'Página1' (sem passar pela API, para montar o cenário)."""
+        planilha = PlanilhaSimulada(self, titulo, f"simulada-{len(self.planilhas) + 1}")
+        self.planilhas[planilha.id] = planilha
+        return planilha
+
+    def imprimir_estatisticas(self):
+        e = self.estatisticas
+        erros = ", ".join(f"{codigo}: {quantidade}" for codigo, quantidade in sorted(e['erros_por_codigo'].items()))
+        print(f"  > Sheets simulado: {e['chamadas']} chamadas ({e['leitura']} leituras, {e['escrita']} escritas, "
+              f"{e['drive']} Drive) em {self.relogio.agora():.1f}s simulados; erros: {erros or 'nenhum'}.")
+        print(f"    -> {e['celulas_lidas']} células lidas e {e['celulas_gravadas']} gravadas.")
+
+
+class AbaSimulada:
+    """Aba com as células em uma lista de linhas (datas como date, números como int/float)."""
+
+    def __init__(self, planilha, titulo, linhas, colunas, id_aba):
+        self.planilha = planilha
+        self.servico = planilha.servico
+        self.title = titulo
+        self.id = id_aba
+        self.row_count = int(linhas)
+        self.col_count = int(colunas)
+        self.celulas = []
+
+    def __repr__(self):
+        return f"<AbaSimulada '{self.title}' {self.row_count}x{self.col_count}>"
+
+    def preencher(self, valores, value_input_option='USER_ENTERED'):
+        """Substitui o conteúdo sem passar pela API (para montar o cenário), ajustando o tamanho da aba."""
+        converter = _valor_digitado if value_input_option == 'USER_ENTERED' else (lambda valor: valor)
+        self.celulas = [[converter(valor) for valor in linha] for linha in valores]
+        self.row_count = max(self.row_count, len(self.celulas))
+        self.col_count = max([self.col_count] + [len(linha) for linha in self.celulas])
+
+    def _celula(self, linha, coluna):
+        if linha - 1 < len(self.celulas) and coluna - 1 < len(self.celulas[linha - 1]):
+            return self.celulas[linha - 1][coluna - 1]
+        return ''
+
+    def _conferir_tamanho(self, linhas, colunas):
+        outras = sum(aba.row_count * aba.col_count for aba in self.planilha.abas if aba is not self)
+        if outras + linhas * colunas > CELULAS_MAXIMAS_PLANILHA:
+            raise erro_api(400, f"This action would increase the number of cells in the workbook above the limit of "
+                                f"{CELULAS_MAXIMAS_PLANILHA} cells.")
+
+    def update(self, values=None, range_name=None, raw=True, value_input_option=None, **kwargs):
+        # Aceita a ordem antiga do gspread (intervalo primeiro)
+        if isinstance(values, str):
+            values, range_name = range_name, values
+        numero = self.servico.chamar('update', 'escrita')
+        celulas = sum(len(linha) for linha in values)
+        if self.servico.celulas_por_requisicao_max and celulas > self.servico.celulas_por_requisicao_max:
+            raise erro_api(400, f"Request payload size exceeds the limit ({celulas} cells).")
+        linha_inicial, coluna_inicial, _, _ = _limites(range_name or 'A1')
+        ultima_linha = linha_inicial + len(values) - 1
+        ultima_coluna = coluna_inicial + max((len(linha) for linha in values), default=1) - 1
+        if ultima_linha > self.row_count or ultima_coluna > self.col_count:
+            raise erro_api(400, f"Range ('{self.title}'!{range_name}) exceeds grid limits. "
+                                f"Max rows: {self.row_count}, max columns: {self.col_count}")
+        converter = _valor_digitado if (value_input_option or ('RAW' if raw else 'USER_ENTERED')) == 'USER_ENTERED' else (lambda valor: valor)
+        with self.servico._trava:
+            while len(self.celulas) < ultima_linha:
+                self.celulas.append([])
+            for deslocamento, valores_linha in enumerate(values):
+                linha = self.celulas[linha_inicial - 1 + deslocamento]
+                if len(linha) < coluna_inicial - 1 + len(valores_linha):
+                    linha.extend([''] * (coluna_inicial - 1 + len(valores_linha) - len(linha)))
+                for posicao, valor in enumerate(valores_linha):
+                    linha[coluna_inicial - 1 + posicao] = converter(valor)
+            self.planilha._alterada()
+        self.servico.transferir(celulas, 'escrita')
+        self.servico.responder(numero)
+        return {'updatedRange': f"'{self.title}'!{range_name}", 'updatedRows': len(values), 'updatedCells': celulas}
+
+    def resize(self, rows=None, cols=None):
+        numero = self.servico.chamar('resize', 'escrita')
+        linhas = int(rows) if rows is not None else self.row_count
+        colunas = int(cols) if cols is not None else self.col_count
+        self._conferir_tamanho(linhas, colunas)
+        with self.servico._trava:
+            self.row_count, self.col_count = linhas, colunas
+            self.celulas = [linha[:colunas] for linha in self.celulas[:linhas]]
+            self.planilha._alterada()
+        self.servico.responder(numero)
+
+    def add_rows(self, rows):
+        numero = self.servico.chamar('add_rows', 'escrita')
+        self._conferir_tamanho(self.row_count + int(rows), self.col_count)
+        with self.servico._trava:
+            self.row_count += int(rows)
+            self.planilha._alterada()
+        self.servico.responder(numero)
+
+    def update_title(self, title):
+        numero = self.servico.chamar('update_title', 'escrita')
+        if any(aba.title == title for aba in self.planilha.abas if aba is not self):
+            raise erro_api(400, f"A sheet with the name \"{title}\" already exists.")
+        self.title = title
+        self.planilha._alterada()
+        self.servico.responder(numero)
+
+    def row_values(self, row, **kwargs):
+        self.servico.chamar('row_values', 'leitura')
+        linha = self.celulas[row - 1] if row - 1 < len(self.celulas) else []
+        valores = _sem_vazios_no_fim([_valor_lido(valor, True, False) for valor in linha])
+        self.servico.transferir(len(valores), 'leitura')
+        return valores
+
+    def col_values(self, col, **kwargs):
+        self.servico.chamar('col_values', 'leitura')
+        valores = _sem_vazios_no_fim([_valor_lido(self._celula(linha, col), True, False)
+                                      for linha in range(1, len(self.celulas) + 1)])
+        self.servico.transferir(len(valores), 'leitura')
+        return valores
+
+    def ler_intervalo(self, celulas, por_colunas=False, formatado=True, datas_como_numero=False):
+        """Valores de um intervalo A1 (sem chamada à API), sem as linhas e colunas vazias do fim, como a API devolve."""
+        linha_inicial, coluna_inicial, linha_final, coluna_final = _limites(celulas)
+        linha_final = min(linha_final or self.row_count, self.row_count, max(len(self.celulas), linha_inicial - 1))
+        coluna_final = min(coluna_final or self.col_count, self.col_count)
+        linhas = [[_valor_lido(self._celula(linha, coluna), formatado, datas_como_numero)
+                   for coluna in range(coluna_inicial, coluna_final + 1)]
+                  for linha in range(linha_inicial, linha_final + 1)]
+        if por_colunas:
+            linhas = [list(coluna) for coluna in zip(*linhas)]
+        linhas = [_sem_vazios_no_fim(linha) for linha in linhas]
+        while linhas and not linhas[-1]:
+            linhas.pop()
+        return linhas
+
+
+class PlanilhaSimulada:
+    """Planilha com as abas em ordem; registra a hora da última alteração (get_lastUpdateTime)."""
+
+    def __init__(self, servico, titulo, chave):
+        self.servico = servico
+        self.title = titulo
+        self.id = chave
+        self.abas = [AbaSimulada(self, 'Página1', 1000, 26, 0)]
+        self.revisao = 0
+
+    def __repr__(self):
+        return f"<PlanilhaSimulada '{self.title}' id:{self.id}>"
+
+    def _alterada(self):
+        self.revisao += 1
+
+    def _aba(self, titulo):
+        for aba in self.abas:
+            if aba.title == titulo:
+                return aba
+        raise WorksheetNotFound(titulo)
+
+    @property
+    def sheet1(self):
+        self.servico.chamar('fetch_sheet_metadata', 'leitura')
+        return self.abas[0]
+
+    def worksheets(self, exclude_hidden=False):
+        self.servico.chamar('fetch_sheet_metadata', 'leitura')
+        return list(self.abas)
+
+    def worksheet(self, title):
+        self.servico.chamar('fetch_sheet_metadata', 'leitura')
+        return self._aba(title)
+
+    def add_worksheet(self, title, rows, cols, index=None):
+        numero = self.servico.chamar('add_worksheet', 'escrita')
+        if any(aba.title == title for aba in self.abas):
+            raise erro_api(400, f"A sheet with the name \"{title}\" already exists.")
+        aba = AbaSimulada(self, title, rows, cols, max(aba.id for aba in self.abas) + 1 if self.abas else 0)
+        aba._conferir_tamanho(aba.row_count, aba.col_count)
+        self.abas.insert(len(self.abas) if index is None else index, aba)
+        self._alterada()
+        self.servico.responder(numero)
+        return aba
+
+    def get_lastUpdateTime(self):
+        self.servico.chamar('get_lastUpdateTime', 'drive')
+        # Um segundo por alteração a partir de uma data fixa: muda a cada escrita e é igual entre execuções
+        return (datetime(2026, 1, 1) + timedelta(seconds=self.revisao)).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+    def values_batch_get(self, ranges, params=None):
+        params = params or {}
+        self.servico.chamar('values_batch_get', 'leitura')
+        por_colunas = params.get('majorDimension') == 'COLUMNS'
+        formatado = params.get('valueRenderOption', 'FORMATTED_VALUE') == 'FORMATTED_VALUE'
+        datas_como_numero = params.get('dateTimeRenderOption', 'SERIAL_NUMBER') == 'SERIAL_NUMBER'
+        intervalos, celulas = [], 0
+        for intervalo in ranges:
+            titulo, celulas_intervalo = _separar_aba(intervalo)
+            aba = self._aba(titulo) if titulo is not None else self.abas[0]
+            if re.fullmatch(r'\d+:\d+', celulas_intervalo):
+                linha_inicial, linha_final = celulas_intervalo.split(':')
+                celulas_intervalo = f"A{linha_inicial}:{letra_coluna(aba.col_count)}{linha_final}"
+            valores = aba.ler_intervalo(celulas_intervalo, por_colunas, formatado, datas_como_numero)
+            celulas += sum(len(linha) for linha in valores)
+            resposta = {'range': f"'{aba.title}'!{celulas_intervalo}", 'majorDimension': 'COLUMNS' if por_colunas else 'ROWS'}
+            if valores:
+                resposta['values'] = valores
+            intervalos.append(resposta)
+        self.servico.transferir(celulas, 'leitura')
+        return {'spreadsheetId': self.id, 'valueRanges': intervalos}
+
+
+class _ClienteHttpSimulado:
+    def __init__(self):
+        self.session = requests.Session()  # Só para a SessaoPlanilhas montar o pool de conexões
+
+
+class ClienteSimulado:
+    """Substitui o gspread.Client: abre as planilhas do serviço simulado pelo nome ou pela chave."""
+
+    def __init__(self, servico):
+        self.servico = servico
+        self.http_client = _ClienteHttpSimulado()
+
+    def open(self, title, folder_id=None):
+        self.servico.chamar('open', 'drive')
+        for planilha in self.servico.planilhas.values():
+            if planilha.title == title:
+                return planilha
+        raise SpreadsheetNotFound(title)
+
+    def open_by_key(self, key):
+        self.servico.chamar('open_by_key', 'leitura')
+        if key not in self.servico.planilhas:
+            raise SpreadsheetNotFound(key)
+        return self.servico.planilhas[key]
+
+    def create(self, title, folder_id=None):
+        self.servico.chamar('create', 'drive')
+        return self.servico.criar_planilha(title)
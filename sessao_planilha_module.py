@@ -0,0 +1,124 @@
+# sessao_planilha_module.py - Cliente do Google Sheets compartilhado no processo
+# Autenticar a conta de serviço e abrir a planilha pelo nome (uma busca no
+# Drive) custam uma ida e volta cada, e eram refeitos a cada leitura ou envio.
+# A sessão autentica uma vez, guarda a planilha aberta pela chave e reusa a
+# mesma conexão HTTP (com um pool maior, para leituras em paralelo). A chave
+# de cada nome fica gravada em disco: as próximas execuções abrem direto pela
+# chave, sem a busca no Drive.
+
+import json
+import os
+import threading
+import time
+
+import gspread
+from requests.adapters import HTTPAdapter
+
+from config import SHEETS_CONEXOES_HTTP, CAMINHO_CHAVES_PLANILHAS
+
+
+class SessaoPlanilhas:
+    """
+    Um cliente autenticado (criado por 'criar_cliente' na primeira vez que é
+    usado) e as planilhas já abertas. As estatísticas mostram o tempo gasto
+    em autenticação e abertura e quantas vezes elas foram reaproveitadas.
+    """
+
+    def __init__(self, criar_cliente, caminho_chaves=CAMINHO_CHAVES_PLANILHAS):
+        self.criar_cliente = criar_cliente
+        self.caminho_chaves = caminho_chaves
+        self._cliente = None
+        self._planilhas = {}  # Chave da planilha -> Spreadsheet
+        self._chaves = self._ler_chaves()  # Nome -> chave
+        self._trava = threading.Lock()
+        self.estatisticas = {'autenticacoes': 0, 'segundos_autenticacao': 0.0, 'buscas_por_nome': 0, 'aberturas_por_chave': 0,
+                             'segundos_abertura': 0.0, 'reusos_cliente': 0, 'reusos_planilha': 0}
+
+    def _ler_chaves(self):
+        if not self.caminho_chaves or not os.path.exists(self.caminho_chaves):
+            return {}
+        try:
+            with open(self.caminho_chaves, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _gravar_chaves(self):
+        if not self.caminho_chaves:
+            return
+        try:
+            pasta = os.path.dirname(self.caminho_chaves)
+            if pasta:
+                os.makedirs(pasta, exist_ok=True)
+            caminho_temporario = self.caminho_chaves + ".tmp"
+            with open(caminho_temporario, 'w', encoding='utf-8') as f:
+                json.dump(self._chaves, f, ensure_ascii=False)
+            os.replace(caminho_temporario, self.caminho_chaves)
+        except Exception as e:
+            print(f"  [AVISO] Não foi possível gravar as chaves das planilhas. Erro: {e}")
+
+    def cliente(self):
+        """O cliente do gspread, autenticado na primeira chamada."""
+        with self._trava:
+            if self._cliente is not None:
+                self.estatisticas['reusos_cliente'] += 1
+                return self._cliente
+            inicio = time.perf_counter()
+            cliente = self.criar_cliente()
+            # Uma conexão mantida por requisição em paralelo, em vez do pool padrão de 10
+            adaptador = HTTPAdapter(pool_connections=SHEETS_CONEXOES_HTTP, pool_maxsize=SHEETS_CONEXOES_HTTP)
+            # gspread 6 guarda a sessão HTTP em 'http_client'; o 5 direto no cliente
+            sessao_http = getattr(getattr(cliente, 'http_client', cliente), 'session', None)
+            if sessao_http is not None:
+                sessao_http.mount('https://', adaptador)
+            self._cliente = cliente
+            self.estatisticas['autenticacoes'] += 1
+            self.estatisticas['segundos_autenticacao'] += time.perf_counter() - inicio
+            return cliente
+
+    def planilha(self, nome):
+        """Planilha aberta pelo nome; depois da primeira vez, pela chave guardada."""
+        cliente = self.cliente()
+        with self._trava:
+            chave = self._chaves.get(nome)
+            if chave in self._planilhas:
+                self.estatisticas['reusos_planilha'] += 1
+                return self._planilhas[chave]
+            inicio = time.perf_counter()
+            planilha = None
+            if chave:
+                try:
+                    planilha = cliente.open_by_key(chave)
+                    self.estatisticas['aberturas_por_chave'] += 1
+                except (gspread.exceptions.SpreadsheetNotFound, gspread.exceptions.APIError):
+                    planilha = None  # Planilha apagada ou recriada: procura de novo pelo nome
+            if planilha is None or planilha.title != nome:
+                planilha = cliente.open(nome)
+                self.estatisticas['buscas_por_nome'] += 1
+                self._chaves[nome] = planilha.id
+                self._gravar_chaves()
+            self.estatisticas['segundos_abertura'] += time.perf_counter() - inicio
+            self._planilhas[planilha.id] = planilha
+            return planilha
+
+    def imprimir_estatisticas(self):
+        e = self.estatisticas
+        aberturas = e['buscas_por_nome'] + e['aberturas_por_chave']
+        custo_autenticacao = e['segundos_autenticacao'] / max(e['autenticacoes'], 1)
+        custo_abertura = e['segundos_abertura'] / max(aberturas, 1)
+        economia = e['reusos_cliente'] * custo_autenticacao + e['reusos_planilha'] * custo_abertura
+        print(f"  > Sessão do Google Sheets: {e['autenticacoes']} autenticação(ões) em {e['segundos_autenticacao']:.2f}s, "
+              f"{e['buscas_por_nome']} busca(s) por nome e {e['aberturas_por_chave']} abertura(s) pela chave em {e['segundos_abertura']:.2f}s.")
+        print(f"    -> Reaproveitados: cliente {e['reusos_cliente']}x e planilha {e['reusos_planilha']}x (~{economia:.2f}s evitados).")
+
+
+_SESSOES = {}
+_TRAVA_SESSOES = threading.Lock()
+
+
+def sessao_planilhas(credenciais_json):
+    """Sessão compartilhada do processo para o arquivo de credenciais da conta de serviço."""
+    with _TRAVA_SESSOES:
+        if credenciais_json not in _SESSOES:
+            _SESSOES[credenciais_json] = SessaoPlanilhas(lambda: gspread.service_account(filename=credenciais_json))
+        return _SESSOES[credenciais_json]
@@ -0,0 +1,56 @@
+# conftest.py - Fixtures compartilhadas dos testes
+# Os testes rodam contra o Google Sheets simulado (planilha_simulada.py), sem
+# rede nem credenciais: a sessão compartilhada do google_sheets_module passa a
+# abrir a planilha simulada e os baldes de cota usam o relógio simulado.
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import envio_planilha_module
+import sessao_planilha_module
+from envio_planilha_module import BaldeFichas
+from planilha_simulada import ServicoSimulado, ClienteSimulado
+from sessao_planilha_module import SessaoPlanilhas
+
+NOME_PLANILHA = "COMPROP_Dashboard_Data"
+CREDENCIAIS = "credenciais_simuladas.json"
+
+
+def gerar_movimentacoes(num_linhas, inicio=0, data_inicial="2026-10-01", dias=20):
+    """Movimentações como o pipeline entrega: datas tipadas e números em texto no formato brasileiro."""
+    datas = pd.Timestamp(data_inicial) + pd.to_timedelta([(inicio + i) % dias for i in range(num_linhas)], unit="D")
+    quantidades = [(inicio + i) % 7 + 1 for i in range(num_linhas)]
+    unitarios = [1234.5 + (inicio + i) % 13 for i in range(num_linhas)]
+    formatar = lambda valor, casas: f"{valor:,.{casas}f}".replace(',', '#').replace('.', ',').replace('#', '.')
+    return pd.DataFrame({
+        'Nota': [str(100000 + (inicio + i) // 2) for i in range(num_linhas)],
+        'Data Emissão': datas,
+        'Cliente': [f"CLIENTE {(inicio + i) % 5}" for i in range(num_linhas)],
+        'Item Descrição': [f"PRODUTO {(inicio + i) % 2}" for i in range(num_linhas)],
+        'Quantidade': [formatar(quantidade, 3) for quantidade in quantidades],
+        'Valor Unitário': [formatar(unitario, 2) for unitario in unitarios],
+        'Total do Item': [formatar(quantidade * unitario, 2) for quantidade, unitario in zip(quantidades, unitarios)],
+    })
+
+
+@pytest.fixture
+def servico(tmp_path, monkeypatch):
+    """Planilha simulada sem latência nem cota, aberta pela sessão de CREDENCIAIS; arquivos locais em tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    servico = ServicoSimulado(latencia_s=0.0, segundos_por_celula=0.0, leituras_por_minuto=0, escritas_por_minuto=0)
+    servico.criar_planilha(NOME_PLANILHA)
+    monkeypatch.setitem(sessao_planilha_module._SESSOES, CREDENCIAIS,
+                        SessaoPlanilhas(lambda: ClienteSimulado(servico), caminho_chaves=None))
+    for balde in ('BALDE_ESCRITA', 'BALDE_LEITURA'):
+        monkeypatch.setattr(envio_planilha_module, balde, BaldeFichas(60, relogio=servico.relogio.agora, dormir=servico.relogio.dormir))
+    return servico
+
+
+@pytest.fixture
+def planilha(servico):
+    return next(iter(servico.planilhas.values()))
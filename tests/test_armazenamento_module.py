@@ -0,0 +1,28 @@
+import pandas as pd
+import pytest
+
+from armazenamento_module import ArmazenamentoParquet, ArmazenamentoSQLite
+from conftest import gerar_movimentacoes
+
+
+@pytest.fixture(params=['parquet', 'sqlite'])
+def armazenamento(request, tmp_path):
+    if request.param == 'parquet':
+        return ArmazenamentoParquet(str(tmp_path / "parquet"))
+    return ArmazenamentoSQLite(str(tmp_path / "dados.sqlite"))
+
+
+def test_chave_repetida_no_mesmo_lote_fica_uma_vez(armazenamento):
+    df = gerar_movimentacoes(10)
+    repetida = df.iloc[[3]].assign(Cliente="CLIENTE CORRIGIDO")
+    armazenamento.gravar_movimentacoes(pd.concat([df, repetida], ignore_index=True))
+    gravado = armazenamento.ler_movimentacoes()
+    assert len(gravado) == 10
+    assert (gravado['Cliente'] == "CLIENTE CORRIGIDO").sum() == 1  # A última ocorrência vale
+
+
+def test_regravar_linhas_substitui_as_antigas(armazenamento):
+    df = gerar_movimentacoes(10)
+    armazenamento.gravar_movimentacoes(df.iloc[:6])
+    armazenamento.gravar_movimentacoes(df.iloc[4:])
+    assert len(armazenamento.ler_movimentacoes()) == 10
@@ -0,0 +1,11 @@
+from benchmark_pipeline import benchmark_sincronizacao_planilha
+
+
+def test_estrategias_de_sincronizacao_deixam_a_aba_completa(capsys):
+    resultados = benchmark_sincronizacao_planilha(900, 60, 3, latencia_s=0.2, escritas_por_minuto=60,
+                                                  probabilidade_falha=0.05, celulas_por_requisicao_max=None)
+    por_estrategia = {resultado['estrategia']: resultado for resultado in resultados}
+    assert all(resultado['correto'] for resultado in resultados), capsys.readouterr().out
+    # O acréscimo só grava as linhas novas; as reescritas gravam a aba inteira
+    assert por_estrategia['acréscimo']['celulas'] < por_estrategia['reescrita em blocos']['celulas'] / 5
+    assert por_estrategia['reescrita única']['chamadas'] <= por_estrategia['reescrita em blocos']['chamadas']
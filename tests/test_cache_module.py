@@ -0,0 +1,69 @@
+import os
+import time
+
+import pandas as pd
+
+import operacoes_module
+import pdf_parser_module
+from cache_module import CacheAnalise
+
+
+def _pdf(pasta, nome, conteudo):
+    caminho = pasta / nome
+    caminho.write_bytes(conteudo)
+    return str(caminho)
+
+
+def _tabela():
+    return pd.DataFrame({'Nota': ['10001', '10002'], 'Item Descrição': ['RACAO', 'VACINA']})
+
+
+def test_acertos_e_falhas(tmp_path):
+    cache = CacheAnalise(str(tmp_path / "cache"), "assinatura", 1024 ** 2)
+    caminho_pdf = _pdf(tmp_path, "mov.pdf", b"pdf 1")
+    assert cache.buscar(caminho_pdf) is None
+    cache.guardar(caminho_pdf, _tabela())
+    pd.testing.assert_frame_equal(cache.buscar(caminho_pdf), _tabela())
+    # O mesmo conteúdo com outro nome reaproveita a entrada; conteúdo novo no mesmo caminho não
+    assert cache.buscar(_pdf(tmp_path, "copia.pdf", b"pdf 1")) is not None
+    assert cache.buscar(_pdf(tmp_path, "mov.pdf", b"pdf 1 alterado")) is None
+    assert (cache.acertos, cache.falhas, cache.removidos) == (2, 2, 0)
+    assert cache.resumo() == "Cache de análise: 2 acerto(s), 2 falha(s), 0 entrada(s) removida(s)."
+
+
+def test_assinatura_diferente_nao_aproveita_entradas(tmp_path):
+    caminho_pdf = _pdf(tmp_path, "mov.pdf", b"pdf 1")
+    CacheAnalise(str(tmp_path / "cache"), "versao 1", 1024 ** 2).guardar(caminho_pdf, _tabela())
+    assert CacheAnalise(str(tmp_path / "cache"), "versao 1", 1024 ** 2).buscar(caminho_pdf) is not None
+    cache = CacheAnalise(str(tmp_path / "cache"), "versao 2", 1024 ** 2)
+    assert cache.buscar(caminho_pdf) is None
+    assert (cache.acertos, cache.falhas) == (0, 1)
+
+
+def test_remove_a_entrada_usada_ha_mais_tempo(tmp_path):
+    pasta = tmp_path / "cache"
+    cache = CacheAnalise(str(pasta), "assinatura", 1024 ** 2)
+    caminhos = [_pdf(tmp_path, f"mov{numero}.pdf", f"pdf {numero}".encode()) for numero in range(3)]
+    cache.guardar(caminhos[0], _tabela())
+    cache.guardar(caminhos[1], _tabela())
+    entradas = sorted(pasta.iterdir())
+    agora = time.time()
+    for idade, entrada in zip((300, 200), [pasta / f"{cache._chave(caminho)}.parquet" for caminho in caminhos[:2]]):
+        os.utime(entrada, (agora - idade, agora - idade))
+    # Só cabem duas entradas; ler a mais antiga faz da outra a próxima a sair
+    cache.tamanho_maximo_bytes = sum(entrada.stat().st_size for entrada in entradas) * 5 // 4
+    assert cache.buscar(caminhos[0]) is not None
+    cache.guardar(caminhos[2], _tabela())
+    assert cache.removidos == 1
+    assert cache.buscar(caminhos[1]) is None
+    assert cache.buscar(caminhos[0]) is not None
+    assert cache.buscar(caminhos[2]) is not None
+
+
+def test_assinatura_do_parser_muda_com_o_operacoes_module(tmp_path, monkeypatch):
+    assinatura = pdf_parser_module.assinatura_parser()
+    copia = tmp_path / "operacoes_module.py"
+    with open(operacoes_module.__file__, 'rb') as f:
+        copia.write_bytes(f.read() + b"\n# regra nova\n")
+    monkeypatch.setattr(operacoes_module, '__file__', str(copia))
+    assert pdf_parser_module.assinatura_parser() != assinatura
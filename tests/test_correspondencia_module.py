@@ -0,0 +1,72 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+import correspondencia_module
+from correspondencia_module import IndiceAproximado, corresponder_descricoes
+from data_processor_module import ORIGENS_CUSTO, IndiceInventario
+
+DESCRICOES_INVENTARIO = ['RACAO BOVINA 22% PROTEINA 30KG', 'VACINA AFTOSA 50 DOSES', 'ARAME FARPADO 500M',
+                         'SAL MINERAL 25KG', 'ADUBO NPK 10-10-10 50KG', 'SEMENTE MILHO HIBRIDO 20KG']
+
+
+def _sem_indice(monkeypatch):
+    """Faz a montagem do índice falhar: a busca tem de sair toda do cache."""
+    def montar(*args, **kwargs):
+        raise AssertionError("índice montado com o cache válido")
+    monkeypatch.setattr(correspondencia_module, 'IndiceAproximado', montar)
+
+
+def test_limite_de_similaridade_inclusivo():
+    linha, similaridade = IndiceAproximado(DESCRICOES_INVENTARIO).buscar('VACINA AFTOZA 50 DOSE')
+    assert linha == 1 and 0 < similaridade < 1
+    assert corresponder_descricoes(['VACINA AFTOZA 50 DOSE'], DESCRICOES_INVENTARIO, similaridade) == {
+        'VACINA AFTOZA 50 DOSE': (1, similaridade)}
+    assert corresponder_descricoes(['VACINA AFTOZA 50 DOSE'], DESCRICOES_INVENTARIO, np.nextafter(similaridade, 1)) == {}
+
+
+def test_cache_vale_so_para_o_mesmo_inventario(tmp_path, monkeypatch):
+    caminho_cache = str(tmp_path / "correspondencias.json")
+    consultas = ['VACINA AFTOZA 50 DOSE', 'PARAFUSO SEXTAVADO']
+    resultado = corresponder_descricoes(consultas, DESCRICOES_INVENTARIO, 0.6, caminho_cache)
+    assert list(resultado) == ['VACINA AFTOZA 50 DOSE']
+    with open(caminho_cache, encoding='utf-8') as f:
+        # Guarda também o que ficou abaixo do limite, que é aplicado na hora do uso
+        assert set(json.load(f)['correspondencias']) == set(consultas)
+
+    with monkeypatch.context() as contexto:
+        _sem_indice(contexto)
+        # Mesmas descrições em outra ordem: mesma assinatura
+        assert corresponder_descricoes(consultas, DESCRICOES_INVENTARIO[::-1], 0.6, caminho_cache) == {
+            'VACINA AFTOZA 50 DOSE': (len(DESCRICOES_INVENTARIO) - 2, resultado['VACINA AFTOZA 50 DOSE'][1])}
+
+    novo_inventario = DESCRICOES_INVENTARIO[2:] + ['VACINA AFTOSA 50 DOSE']
+    resultado = corresponder_descricoes(consultas, novo_inventario, 0.6, caminho_cache)
+    assert list(resultado) == ['VACINA AFTOZA 50 DOSE']
+    assert resultado['VACINA AFTOZA 50 DOSE'][0] == len(novo_inventario) - 1
+    with open(caminho_cache, encoding='utf-8') as f:
+        assert json.load(f)['correspondencias']['VACINA AFTOZA 50 DOSE'][0] == 'VACINA AFTOSA 50 DOSE'
+
+
+def test_origem_do_custo_por_tipo_de_correspondencia(tmp_path):
+    inventario = pd.DataFrame({
+        'Item': [str(1000100 + numero) for numero in range(len(DESCRICOES_INVENTARIO))],
+        'Descrição': DESCRICOES_INVENTARIO,
+        'Custo Unit': [f"{10 * (numero + 1)},50" for numero in range(len(DESCRICOES_INVENTARIO))],
+    })
+    indice = IndiceInventario(inventario)
+    movimentacoes = pd.Series([
+        '1000100-RACAO BOVINA 22% PROTEINA 30KG',  # Código
+        'VACINA AFTOSA 50 DOSES',  # Descrição igual, sem código
+        'VACINA AFTOZA 50 DOSE',  # Só aproximada
+        '9999999-ARAME FARPADO 500 M',  # Código fora do inventário, descrição parecida
+        'PARAFUSO SEXTAVADO',  # Nada parecido
+    ])
+    linhas, origens, contagens = indice.localizar(movimentacoes)
+    assert contagens == {'por_codigo': 1, 'por_descricao': 1, 'codigo_fora_do_inventario': 1, 'sem_codigo_nem_descricao': 2}
+    assert indice.corresponder_aproximado(movimentacoes, linhas, origens, 0.6, str(tmp_path / "cache.json")) == 2
+    assert [ORIGENS_CUSTO[origem] for origem in origens] == ['Código', 'Descrição', 'Aproximada', 'Aproximada', 'Não encontrado']
+    assert linhas.tolist() == [0, 1, 1, 2, -1]
+    custos = indice.custo_das_linhas(linhas)
+    assert custos[:4].tolist() == [10.5, 20.5, 20.5, 30.5] and np.isnan(custos[4])
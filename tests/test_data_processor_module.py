@@ -0,0 +1,40 @@
+import math
+
+import pandas as pd
+
+from data_processor_module import converter_numero_brasileiro
+
+
+def _valores(serie):
+    return [None if math.isnan(valor) else valor for valor in serie.tolist()]
+
+
+def test_converte_texto_no_formato_brasileiro():
+    falhas = {}
+    serie = pd.Series(['1.234,56', '-0,5', '10,5-', '1.234.567', ' 7 ', '', None, 'nan', 'N/A'], name='Total do Item')
+    assert _valores(converter_numero_brasileiro(serie, valor_padrao=None, falhas=falhas)) == [
+        1234.56, -0.5, -10.5, 1234567.0, 7.0, None, None, None, None]
+    # Vazios não contam como falha
+    assert falhas == {'Total do Item': 0}
+
+
+def test_texto_invalido_recebe_o_valor_padrao_e_conta_como_falha():
+    falhas = {'Quantidade': 2}
+    serie = pd.Series(['abc', '1,2,3', '1.234,5x', '--1', '3,5'], name='Quantidade')
+    assert converter_numero_brasileiro(serie, falhas=falhas).tolist() == [0.0, 0.0, 0.0, 0.0, 3.5]
+    assert falhas == {'Quantidade': 6}
+
+
+def test_valores_ja_numericos_passam_direto():
+    falhas = {}
+    assert converter_numero_brasileiro(pd.Series([1, 2.5, None], name='Custo'), falhas=falhas).tolist() == [1.0, 2.5, 0.0]
+    mista = pd.Series([1.5, '2,5', 3, 'x', None], name='Custo Unit')
+    assert converter_numero_brasileiro(mista, falhas=falhas).tolist() == [1.5, 2.5, 3.0, 0.0, 0.0]
+    assert falhas == {'Custo Unit': 1}
+
+
+def test_coluna_categorica_converte_cada_categoria_uma_vez():
+    falhas = {}
+    serie = pd.Series(['1.234,56', 'x', '1.234,56', None, 'x'], dtype='category', name='Valor Unitário')
+    assert _valores(converter_numero_brasileiro(serie, valor_padrao=None, falhas=falhas)) == [1234.56, None, 1234.56, None, None]
+    assert falhas == {'Valor Unitário': 1}
@@ -0,0 +1,121 @@
+import json
+import os
+import time
+
+import pandas as pd
+import pytest
+from gspread.exceptions import APIError
+
+from envio_planilha_module import BaldeFichas, EscritorPlanilha
+from planilha_simulada import RelogioSimulado
+
+TABELA = pd.DataFrame({'Nota': [str(100 + linha) for linha in range(50)], 'Total': ['1.234,56'] * 50})
+
+
+def _escritor(servico, aba, **kwargs):
+    balde = BaldeFichas(600, relogio=servico.relogio.agora, dormir=servico.relogio.dormir)
+    return EscritorPlanilha(aba, balde=balde, **{'caminho_progresso': None, **kwargs})
+
+
+def _conteudo(aba):
+    return [[str(valor) for valor in linha] for linha in aba.celulas[1:]]
+
+
+def test_erros_temporarios_repetidos_com_espera_exponencial(servico, planilha):
+    aba = planilha.abas[0]
+    escritor = _escritor(servico, aba, celulas_por_bloco=40)
+    proxima = servico.estatisticas['chamadas'] + 1
+    servico.falhas = {proxima + 1: 503, proxima + 2: 429}  # O segundo bloco falha duas vezes seguidas
+    escritor.escrever(TABELA)
+    e = escritor.estatisticas
+    assert e['repeticoes'] == 2 and e['erros_por_codigo'] == {'503': 1, '429': 1}
+    # Esperas de 1s e 2s, cada uma com até 1s de acaso
+    assert 3.0 <= e['segundos_repeticao'] <= 5.0
+    assert _conteudo(aba) == [[nota, '1234.56'] for nota in TABELA['Nota']]
+
+
+def test_erro_permanente_nao_e_repetido(servico, planilha):
+    escritor = _escritor(servico, planilha.abas[0])
+    servico.falhas = {servico.estatisticas['chamadas'] + 2: 400}  # segundo bloco
+    with pytest.raises(APIError):
+        escritor.escrever(TABELA)
+    assert escritor.estatisticas['repeticoes'] == 0
+
+
+def test_desiste_depois_do_maximo_de_tentativas(servico, planilha):
+    escritor = _escritor(servico, planilha.abas[0], max_tentativas=3)
+    proxima = servico.estatisticas['chamadas'] + 1
+    servico.falhas = {proxima + tentativa: 500 for tentativa in range(1, 4)}
+    with pytest.raises(APIError):
+        escritor.escrever(TABELA)
+    assert escritor.estatisticas['repeticoes'] == 2
+    assert escritor.estatisticas['requisicoes'] == 4  # primeiro bloco + 3 tentativas do segundo
+
+
+def test_balde_de_fichas_limita_a_taxa():
+    relogio = RelogioSimulado()
+    balde = BaldeFichas(6, capacidade=1, relogio=relogio.agora, dormir=relogio.dormir)
+    esperas = [balde.aguardar() for _ in range(4)]
+    assert esperas[0] == 0.0
+    assert esperas[1:] == pytest.approx([10.0, 10.0, 10.0])
+    assert relogio.agora() == pytest.approx(30.0)
+
+
+def test_balde_evita_estourar_a_cota(servico, planilha):
+    servico.limites['escrita'] = 10
+    escritor = EscritorPlanilha(planilha.abas[0], celulas_por_bloco=6, caminho_progresso=None,
+                                balde=BaldeFichas(10, relogio=servico.relogio.agora, dormir=servico.relogio.dormir))
+    escritor.escrever(TABELA)  # 17 blocos + redimensionamento final
+    assert escritor.estatisticas['repeticoes'] == 0
+    assert servico.estatisticas['erros_por_codigo'] == {}
+    assert escritor.estatisticas['segundos_cota'] > 60
+
+
+def test_envio_interrompido_continua_do_ultimo_bloco(servico, planilha, tmp_path):
+    aba = planilha.abas[0]
+    caminho_progresso = str(tmp_path / 'progresso.json')
+    proxima = servico.estatisticas['chamadas'] + 1
+    servico.falhas = {proxima + 2: 503}  # Os dois primeiros blocos passam, o terceiro falha
+    primeiro = _escritor(servico, aba, celulas_por_bloco=20, max_tentativas=1, caminho_progresso=caminho_progresso)
+    with pytest.raises(APIError):
+        primeiro.escrever(TABELA)
+    with open(caminho_progresso, encoding='utf-8') as f:
+        assert json.load(f)['blocos_concluidos'] == 2
+
+    segundo = _escritor(servico, aba, celulas_por_bloco=20, caminho_progresso=caminho_progresso)
+    segundo.escrever(TABELA)
+    assert segundo.estatisticas['blocos_retomados'] == 2
+    assert segundo.estatisticas['blocos'] == 4  # 51 linhas em blocos de 10: só os 4 que faltavam
+    assert not os.path.exists(caminho_progresso)
+    assert _conteudo(aba) == [[nota, '1234.56'] for nota in TABELA['Nota']]
+
+
+def test_acrescimo_interrompido_continua_na_mesma_posicao(servico, planilha, tmp_path):
+    aba = planilha.abas[0]
+    _escritor(servico, aba).escrever(TABELA.iloc[:10])
+    caminho_progresso = str(tmp_path / 'progresso.json')
+    proxima = servico.estatisticas['chamadas'] + 1
+    servico.falhas = {proxima + 4: 503}  # col_values, resize e os dois primeiros blocos passam
+    primeiro = _escritor(servico, aba, celulas_por_bloco=20, max_tentativas=1, caminho_progresso=caminho_progresso)
+    with pytest.raises(APIError):
+        primeiro.acrescentar(TABELA.iloc[10:])
+    segundo = _escritor(servico, aba, celulas_por_bloco=20, caminho_progresso=caminho_progresso)
+    segundo.acrescentar(TABELA.iloc[10:])
+    assert segundo.estatisticas['blocos_retomados'] == 2
+    assert _conteudo(aba) == [[nota, '1234.56'] for nota in TABELA['Nota']]
+
+
+def test_acrescimo_com_resposta_perdida_nao_aumenta_a_aba_duas_vezes(servico, planilha):
+    aba = planilha.abas[0]
+    escritor = _escritor(servico, aba)
+    escritor.escrever(TABELA.iloc[:10])
+    # col_values e o aumento da aba, que é aplicado mas tem a resposta perdida
+    servico.falhas_apos_aplicar = {servico.estatisticas['chamadas'] + 2: 503}
+    escritor.acrescentar(TABELA.iloc[10:])
+    assert escritor.estatisticas['repeticoes'] == 1
+    assert aba.row_count == len(TABELA) + 1
+    assert _conteudo(aba) == [[nota, '1234.56'] for nota in TABELA['Nota']]
+
+
+def test_balde_padrao_dorme_de_verdade():
+    assert BaldeFichas(60).dormir is time.sleep
@@ -0,0 +1,49 @@
+import pandas as pd
+
+from conftest import CREDENCIAIS, NOME_PLANILHA, gerar_movimentacoes
+from envio_planilha_module import letra_coluna
+from google_sheets_module import atualizar_dados_no_google_sheets, buscar_dados_existentes
+from planilha_simulada import erro_api
+
+ESTOQUE = pd.DataFrame({'Item': ['1'], 'Descrição': ['PRODUTO 0'], 'Saldo': ['1,5']})
+PASTA_ESPELHO = "espelho"
+
+
+def _enviar_com_espelho(df):
+    assert atualizar_dados_no_google_sheets(df, pd.DataFrame(), ESTOQUE, NOME_PLANILHA, CREDENCIAIS,
+                                            caminho_indice="indice.npz", pasta_espelho=PASTA_ESPELHO)
+
+
+def _editar_cliente_fora_do_pipeline(planilha):
+    """Edita uma célula sem mudar o número de linhas nem as dimensões da aba."""
+    aba = planilha.worksheet('Movimentacoes')
+    coluna = aba.row_values(1).index('Cliente') + 1
+    aba.update(values=[["EDITADO À MÃO"]], range_name=f"{letra_coluna(coluna)}2")
+
+
+def test_espelho_reaproveitado_ate_a_planilha_mudar(servico, planilha, capsys):
+    _enviar_com_espelho(gerar_movimentacoes(50))
+    capsys.readouterr()
+    df_mov, _ = buscar_dados_existentes(NOME_PLANILHA, CREDENCIAIS, PASTA_ESPELHO)
+    assert "lidos do espelho local" in capsys.readouterr().out
+    assert len(df_mov) == 50
+
+    servico.relogio.dormir(1)
+    _editar_cliente_fora_do_pipeline(planilha)
+    df_mov, _ = buscar_dados_existentes(NOME_PLANILHA, CREDENCIAIS, PASTA_ESPELHO)
+    assert "Baixando as abas" in capsys.readouterr().out
+    assert (df_mov['Cliente'] == "EDITADO À MÃO").sum() == 1
+
+
+def test_sem_acesso_ao_drive_sempre_baixa_as_abas(servico, planilha, monkeypatch, capsys):
+    def sem_drive():
+        raise erro_api(403)
+    monkeypatch.setattr(planilha, 'get_lastUpdateTime', sem_drive)
+    _enviar_com_espelho(gerar_movimentacoes(50))
+    buscar_dados_existentes(NOME_PLANILHA, CREDENCIAIS, PASTA_ESPELHO)
+
+    _editar_cliente_fora_do_pipeline(planilha)
+    capsys.readouterr()
+    df_mov, _ = buscar_dados_existentes(NOME_PLANILHA, CREDENCIAIS, PASTA_ESPELHO)
+    assert "sem acesso ao Drive" in capsys.readouterr().out
+    assert (df_mov['Cliente'] == "EDITADO À MÃO").sum() == 1
@@ -0,0 +1,121 @@
+import pandas as pd
+
+from abas_mensais_module import ABA_MANIFESTO, ABA_UNICA, ler_movimentacoes_periodo
+from conftest import CREDENCIAIS, NOME_PLANILHA, gerar_movimentacoes
+from google_sheets_module import (atualizar_abas_mensais_no_google_sheets, atualizar_dados_no_google_sheets,
+                                  buscar_dados_existentes)
+from planilha_simulada import AbaSimulada, PlanilhaSimulada
+
+ESTOQUE = pd.DataFrame({'Item': ['1'], 'Descrição': ['PRODUTO 0'], 'Saldo': ['1,5']})
+
+
+def _enviar(df_novos, caminho_indice='indice.npz', **kwargs):
+    df_existentes, _ = buscar_dados_existentes(NOME_PLANILHA, CREDENCIAIS)
+    assert atualizar_dados_no_google_sheets(df_novos, df_existentes, ESTOQUE, NOME_PLANILHA, CREDENCIAIS,
+                                            caminho_indice=caminho_indice, **kwargs)
+    df_planilha, _ = buscar_dados_existentes(NOME_PLANILHA, CREDENCIAIS)
+    return df_planilha
+
+
+def _chaves(df):
+    return list(zip(df['Nota'].astype(str), df['Item Descrição']))
+
+
+def test_acrescenta_so_as_linhas_novas(servico, capsys):
+    df = gerar_movimentacoes(400)
+    _enviar(df.iloc[:300])
+    celulas_antes = servico.estatisticas['celulas_gravadas']
+    capsys.readouterr()
+    df_planilha = _enviar(df.iloc[250:])
+    saida = capsys.readouterr().out
+    assert "50 de 150 registros já estavam na planilha" in saida
+    assert "Reescrevendo" not in saida
+    assert len(df_planilha) == 400
+    assert sorted(_chaves(df_planilha)) == sorted(_chaves(df))
+    # Só as 100 linhas novas da aba de movimentações (mais a aba 'Estoque') foram gravadas
+    assert servico.estatisticas['celulas_gravadas'] - celulas_antes == 100 * len(df.columns) + 2 * len(ESTOQUE.columns)
+
+
+def test_linha_corrigida_reescreve_a_aba(servico, capsys):
+    df = gerar_movimentacoes(200)
+    _enviar(df.iloc[:150])
+    corrigidas = df.iloc[100:200].copy()
+    corrigidas.loc[corrigidas.index[0], 'Cliente'] = "CLIENTE CORRIGIDO"
+    capsys.readouterr()
+    df_planilha = _enviar(corrigidas)
+    assert "1 registros já enviados foram corrigidos" in capsys.readouterr().out
+    assert len(df_planilha) == 200
+    assert (df_planilha['Cliente'] == "CLIENTE CORRIGIDO").sum() == 1
+    # Em ordem de data depois da reescrita
+    assert df_planilha['Data Emissão'].is_monotonic_increasing
+
+
+def test_cabecalho_diferente_reescreve_a_aba(servico, planilha, capsys):
+    df = gerar_movimentacoes(200)
+    _enviar(df.iloc[:150])
+    com_vendedor = df.iloc[150:].assign(Vendedor="VENDEDOR 1")
+    capsys.readouterr()
+    df_planilha = _enviar(com_vendedor)
+    assert "colunas da aba diferentes das novas" in capsys.readouterr().out
+    assert planilha.worksheet('Movimentacoes').row_values(1) == list(df.columns) + ['Vendedor']
+    assert len(df_planilha) == 200
+    assert df_planilha['Vendedor'].notna().sum() == 50
+
+
+def test_sobreposicao_depois_de_reconstruir_o_indice(servico, tmp_path):
+    # Números em texto brasileiro voltam da planilha como números: a chave tem de ser a mesma
+    df = gerar_movimentacoes(400)
+    _enviar(df.iloc[:300])
+    (tmp_path / 'indice.npz').unlink()
+    df_planilha = _enviar(df.iloc[250:])
+    assert len(df_planilha) == 400
+    assert sorted(_chaves(df_planilha)) == sorted(_chaves(df))
+
+
+def test_abas_mensais_com_sobreposicao(servico, planilha):
+    df = gerar_movimentacoes(400, data_inicial="2026-09-20", dias=20)
+    assert atualizar_abas_mensais_no_google_sheets(df.iloc[:300], ESTOQUE, NOME_PLANILHA, CREDENCIAIS)
+    assert atualizar_abas_mensais_no_google_sheets(df.iloc[250:], ESTOQUE, NOME_PLANILHA, CREDENCIAIS)
+    df_planilha = ler_movimentacoes_periodo(planilha)
+    assert len(df_planilha) == 400
+    assert sorted(_chaves(df_planilha)) == sorted(_chaves(df))
+
+
+def test_sincronizacao_com_falhas_temporarias(servico):
+    df = gerar_movimentacoes(400)
+    _enviar(df.iloc[:300])
+    # Uma chamada sim, outra não falha com 503/429/500 durante a leitura e o envio
+    proxima = servico.estatisticas['chamadas'] + 1
+    servico.falhas = {proxima + 2 * i: (503, 429, 500)[i % 3] for i in range(12)}
+    df_planilha = _enviar(df.iloc[250:])
+    assert servico.estatisticas['erros_por_codigo'] == {'503': 4, '429': 4, '500': 4}
+    assert sorted(_chaves(df_planilha)) == sorted(_chaves(df))
+
+
+def _perder_primeira_resposta(monkeypatch, servico, classe, metodo):
+    """A primeira chamada de classe.metodo é aplicada na planilha, mas a resposta volta com 503."""
+    original = getattr(classe, metodo)
+    pendente = [True]
+
+    def chamar(*args, **kwargs):
+        if pendente:
+            pendente.clear()
+            servico.falhas_apos_aplicar[servico.estatisticas['chamadas'] + 1] = 503
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(classe, metodo, chamar)
+
+
+def test_criar_e_renomear_aba_com_resposta_perdida(servico, planilha, monkeypatch):
+    df = gerar_movimentacoes(300, data_inicial="2026-09-20", dias=20)
+    _enviar(df.iloc[:200])
+    _perder_primeira_resposta(monkeypatch, servico, PlanilhaSimulada, 'add_worksheet')
+    _perder_primeira_resposta(monkeypatch, servico, AbaSimulada, 'update_title')
+    assert atualizar_abas_mensais_no_google_sheets(df.iloc[150:], ESTOQUE, NOME_PLANILHA, CREDENCIAIS)
+    assert servico.estatisticas['erros_por_codigo'] == {'503': 2}
+    # Cada aba foi criada uma única vez e a aba única foi renomeada uma vez só
+    titulos = [aba.title for aba in planilha.abas]
+    assert sorted(titulos) == sorted(['Página1', 'Estoque', f"{ABA_UNICA}_migrada", ABA_MANIFESTO, 'Mov_2026_09', 'Mov_2026_10'])
+    assert servico.estatisticas['por_metodo']['update_title'] == 1
+    df_planilha = ler_movimentacoes_periodo(planilha)
+    assert sorted(_chaves(df_planilha)) == sorted(_chaves(df))
@@ -0,0 +1,67 @@
+import threading
+import time
+
+import pytest
+from gspread.exceptions import APIError
+
+from envio_planilha_module import BaldeFichas
+from leitura_planilha_module import ler_abas
+
+
+def _criar_abas(planilha, quantidade, linhas=20):
+    for numero in range(quantidade):
+        aba = planilha.add_worksheet(title=f"Mov_2026_{numero + 1:02d}", rows=1, cols=1)
+        aba.preencher([['Nota', 'Quantidade', 'Data Emissão']] +
+                      [[str(1000 * numero + linha), '1.234,5', '01/10/2026'] for linha in range(linhas)])
+    return [f"Mov_2026_{numero + 1:02d}" for numero in range(quantidade)]
+
+
+def test_erros_temporarios_sao_repetidos(servico, planilha):
+    abas = _criar_abas(planilha, 6)
+    proxima = servico.estatisticas['chamadas'] + 1
+    servico.falhas = {proxima: 503, proxima + 2: 429, proxima + 5: 500}
+    tabelas = ler_abas(planilha, {aba: None for aba in abas})
+    assert [len(tabelas[aba]) for aba in abas] == [20] * 6
+    assert tabelas[abas[0]]['Quantidade'].eq(1234.5).all()
+    assert servico.estatisticas['erros_por_codigo'] == {'429': 1, '500': 1, '503': 1}
+
+
+def test_erro_permanente_interrompe_a_leitura(servico, planilha):
+    abas = _criar_abas(planilha, 2)
+    servico.falhas = {servico.estatisticas['chamadas'] + 1: 400}
+    with pytest.raises(APIError):
+        ler_abas(planilha, {aba: None for aba in abas})
+
+
+def test_leitura_respeita_a_cota(servico, planilha):
+    # 12 meses = 14 requisições contra uma cota de 10 por minuto: o balde espaça as chamadas em vez de estourar
+    abas = _criar_abas(planilha, 12)
+    servico.limites['leitura'] = 10
+    balde = BaldeFichas(10, relogio=servico.relogio.agora, dormir=servico.relogio.dormir)
+    inicio = servico.relogio.agora()
+    tabelas = ler_abas(planilha, {aba: ['Nota'] for aba in abas}, balde=balde)
+    assert all(len(tabelas[aba]) == 20 for aba in abas)
+    assert servico.estatisticas['erros_por_codigo'] == {}
+    assert servico.relogio.agora() - inicio >= 60
+
+
+def test_abas_lidas_em_paralelo_ate_o_limite(servico, planilha, monkeypatch):
+    abas = _criar_abas(planilha, 8)
+    em_andamento, maximo, trava = [0], [0], threading.Lock()
+    original = planilha.values_batch_get
+
+    def contar(*args, **kwargs):
+        with trava:
+            em_andamento[0] += 1
+            maximo[0] = max(maximo[0], em_andamento[0])
+        time.sleep(0.02)
+        try:
+            return original(*args, **kwargs)
+        finally:
+            with trava:
+                em_andamento[0] -= 1
+
+    monkeypatch.setattr(planilha, 'values_batch_get', contar)
+    tabelas = ler_abas(planilha, {aba: None for aba in abas}, max_paralelo=3)
+    assert all(len(tabelas[aba]) == 20 for aba in abas)
+    assert 1 < maximo[0] <= 3
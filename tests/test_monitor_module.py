@@ -0,0 +1,97 @@
+import os
+
+import pandas as pd
+import pytest
+
+import monitor_module
+from conftest import CREDENCIAIS, NOME_PLANILHA, gerar_movimentacoes
+from esquema_module import COLUNAS_CHAVE_MOVIMENTACOES
+from google_sheets_module import EnvioContinuoPlanilha, buscar_dados_existentes
+from indice_linhas_module import impressoes_digitais
+from monitor_module import MonitorRelatorios
+
+
+@pytest.fixture
+def pasta(tmp_path, monkeypatch):
+    """Pasta com um inventário e uma movimentação; a extração e a união devolvem tabelas fixas."""
+    (tmp_path / "Relatorio_inventario.pdf").write_bytes(b"inventario")
+    (tmp_path / "Relatorio_mov.pdf").write_bytes(b"movimentacao")
+    monkeypatch.setattr(monitor_module, 'orquestrar_extracao_inventario', lambda caminho: pd.DataFrame({'Item': ['1'], ' Custo Unit.': ['2,50']}))
+    monkeypatch.setattr(monitor_module, 'orquestrar_extracao_movimentacoes',
+                        lambda caminhos, num_processos, cache: pd.DataFrame({'Arquivo Origem': caminhos}))
+    monkeypatch.setattr(monitor_module, 'unir_dataframes', lambda df_movs, df_inventario: df_movs)
+    return tmp_path
+
+
+def _monitor(pasta, respostas):
+    entregas = []  # (linhas entregues, colunas do inventário) de cada chamada
+
+    def ao_atualizar(df_novos, df_inventario):
+        entregas.append((len(df_novos), list(df_inventario.columns)))
+        resposta = respostas.pop(0)
+        if isinstance(resposta, Exception):
+            raise resposta
+        return resposta
+
+    monitor = MonitorRelatorios(str(pasta), "inventario", ao_atualizar, segundos_estavel=0.0)
+    assert monitor.verificar() == []  # Primeira verificação só observa os arquivos
+    return monitor, entregas
+
+
+def test_entrega_que_falhou_e_repetida_na_proxima_verificacao(pasta):
+    monitor, entregas = _monitor(pasta, [False, True])
+    assert monitor.verificar() == []
+    assert monitor.processados == {}
+    assert len(monitor.verificar()) == 2
+    assert [linhas for linhas, _ in entregas] == [1, 1]
+    assert monitor.verificar() == []  # Entregues: não voltam mais
+
+
+def test_excecao_na_entrega_deixa_os_arquivos_pendentes(pasta):
+    monitor, entregas = _monitor(pasta, [RuntimeError("destino fora do ar"), True])
+    with pytest.raises(RuntimeError):
+        monitor.verificar()
+    assert monitor.processados == {}
+    assert len(monitor.verificar()) == 2
+    assert [linhas for linhas, _ in entregas] == [1, 1]
+
+
+def test_arquivo_ilegivel_nao_e_repetido(pasta, monkeypatch):
+    monkeypatch.setattr(monitor_module, 'orquestrar_extracao_movimentacoes', lambda caminhos, num_processos, cache: None)
+    monitor, entregas = _monitor(pasta, [])
+    assert len(monitor.verificar()) == 2
+    assert monitor.verificar() == []
+    assert entregas == []
+
+
+def test_inventario_entregue_com_os_nomes_de_coluna_do_lote(pasta):
+    monitor, entregas = _monitor(pasta, [True])
+    monitor.verificar()
+    assert entregas == [(1, ['Item', 'Custo Unit'])]
+
+
+def test_envio_continuo_sem_duplicatas_quando_o_inventario_muda(servico, tmp_path, monkeypatch):
+    pasta = tmp_path / "relatorios"
+    pasta.mkdir()
+    tabelas = {"Relatorio_mov1": gerar_movimentacoes(30), "Relatorio_mov2": gerar_movimentacoes(30, inicio=30)}
+    for nome in tabelas:
+        (pasta / f"{nome}.pdf").write_bytes(nome.encode())
+    monkeypatch.setattr(monitor_module, 'orquestrar_extracao_inventario', lambda caminho: pd.DataFrame({'Item': ['1'], 'Saldo': ['1,5']}))
+    monkeypatch.setattr(monitor_module, 'orquestrar_extracao_movimentacoes',
+                        lambda caminhos, num_processos, cache: tabelas[os.path.splitext(os.path.basename(caminhos[0]))[0]])
+    monkeypatch.setattr(monitor_module, 'concatenar_tabelas_movimentacoes', lambda partes: pd.concat(partes, ignore_index=True))
+    monkeypatch.setattr(monitor_module, 'unir_dataframes', lambda df_movs, df_inventario: df_movs)
+
+    envio = EnvioContinuoPlanilha(NOME_PLANILHA, CREDENCIAIS, caminho_indice="indice.npz", pasta_espelho="espelho")
+    monitor = MonitorRelatorios(str(pasta), "inventario", envio, segundos_estavel=0.0)
+    for versao in range(3):
+        # Cada inventário novo faz o monitor unir e reenviar todas as movimentações
+        (pasta / "Relatorio_inventario.pdf").write_bytes(b"inventario" * (versao + 1))
+        monitor.verificar()
+        assert monitor.verificar()
+
+    chaves = impressoes_digitais(envio.existentes, COLUNAS_CHAVE_MOVIMENTACOES)
+    assert len(envio.existentes) == 60
+    assert len(set(chaves)) == 60
+    df_planilha, _ = buscar_dados_existentes(NOME_PLANILHA, CREDENCIAIS)
+    assert len(df_planilha) == 60
@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+
+import config
+import operacoes_module
+from operacoes_module import DRE_PADRAO, MOVIMENTACAO_PADRAO, TABELA_OPERACOES, TabelaOperacoes
+
+
+@pytest.mark.parametrize("codigo", [1, 3, 6])
+def test_codigos_ambiguos_so_pelo_nome(codigo):
+    assert codigo in TABELA_OPERACOES.codigos_ambiguos
+    assert codigo not in TABELA_OPERACOES.por_codigo
+    # Pelo nome completo cada operação do código tem a sua classificação
+    nomes = [nome for nome in TABELA_OPERACOES.por_nome if nome.startswith(f"{codigo}-")]
+    assert len(nomes) > 1
+    for nome in nomes:
+        assert TABELA_OPERACOES.classificar_nome(nome.lower()) == TABELA_OPERACOES.por_nome[nome]
+    # Um nome desconhecido com o mesmo código não herda nenhuma delas
+    assert TABELA_OPERACOES.classificar_nome(f"{codigo}-OPERACAO NOVA") == (None, None)
+    movimentacao, classificacao_dre = TABELA_OPERACOES.classificar(pd.Series([f"{codigo} - Operação nova"]))
+    assert (movimentacao[0], classificacao_dre[0]) == (MOVIMENTACAO_PADRAO, DRE_PADRAO)
+
+
+def test_codigo_unico_resolve_nome_alterado():
+    tabela = TabelaOperacoes({'321-COMPRA PARA COMERCIALIZAÇÃO': 'Entrada', '1-VENDA': 'Saída', '1-À VISTA': 'Sem Movimentação'},
+                             {'321-COMPRA PARA COMERCIALIZAÇÃO': 'Despesa'})
+    assert tabela.classificar_nome('321 - Compra p/ comercializacao') == ('Entrada', 'Despesa')
+    assert tabela.classificar_nome('1-VENDA A PRAZO') == (None, None)
+    assert tabela.codigos_ambiguos == [1]
+
+
+def test_nomes_iguais_depois_de_normalizar_com_classificacoes_diferentes():
+    with pytest.raises(ValueError, match="dre_map"):
+        TabelaOperacoes({}, {'5-VENDA': 'Receita', '5 - Venda': 'Despesa'})
+    assert TabelaOperacoes({'5-VENDA': 'Saída', '5 - Venda': 'Saída'}, {}).por_nome == {'5-VENDA': ('Saída', None)}
+
+
+def _config_com(tmp_path, monkeypatch, texto):
+    caminho = tmp_path / "config.py"
+    caminho.write_text(texto, encoding='utf-8')
+    monkeypatch.setattr(config, '__file__', str(caminho))
+
+
+def test_chave_repetida_no_dre_map_com_outro_valor(tmp_path, monkeypatch):
+    _config_com(tmp_path, monkeypatch, "movimentacao_map = {'1-VENDA': 'Saída'}\n"
+                                       "dre_map = {'1-VENDA': 'Receita', '2-COMPRA': 'Despesa', '1-VENDA': 'Despesa'}\n")
+    with pytest.raises(ValueError, match=r"config\.dre_map: a chave '1-VENDA' aparece 2 vezes"):
+        operacoes_module._validar_config()
+
+
+def test_chave_repetida_com_o_mesmo_valor_so_avisa(tmp_path, monkeypatch, capsys):
+    _config_com(tmp_path, monkeypatch, "movimentacao_map = {'1-VENDA': 'Saída', '1-VENDA': 'Saída'}\ndre_map = {}\n")
+    operacoes_module._validar_config()
+    assert "[AVISO] config.movimentacao_map: a chave '1-VENDA' aparece 2 vezes." in capsys.readouterr().out
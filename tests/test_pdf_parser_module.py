@@ -0,0 +1,87 @@
+import pandas as pd
+import pytest
+
+from benchmark_pipeline import analisar_relatorio_movimentacao, analisar_relatorio_movimentacao_regex
+from corpus_sintetico import gerar_pdf_movimentacao, gerar_texto_relatorio_movimentacao, iterar_textos_paginas_movimentacao
+from pdf_parser_module import (ConstrutorMovimentacoes, _extrair_texto_paginas, _localizar_blocos, _varrer_bloco,
+                               concatenar_tabelas_movimentacoes, iterar_lotes_movimentacao, orquestrar_extracao_movimentacoes)
+
+
+def _deformar(texto):
+    """Relatório sintético com blocos fora do layout: campos quebrados, linhas faltando e item partido."""
+    linhas = texto.split("\n")
+    for indice, linha in enumerate(linhas):
+        if linha.startswith("Cidade:") and indice % 5 == 0:
+            linhas[indice] = linha.replace(" UF:", "\nUF:")
+        elif linha.startswith("CPF:") and indice % 7 == 0:
+            linhas[indice] = ""
+        elif linha.startswith("Repre - ") and indice % 3 == 0:
+            linhas[indice] = "Repre - "
+        elif linha.startswith("Forma Pagto") and indice % 4 == 0:
+            linhas[indice] = "Forma"
+        elif " Item: " in linha and indice % 11 == 0:
+            linhas[indice] = linha.replace(" 5102 ", "\n5102 ")
+        elif " Item: " in linha and indice % 13 == 0:
+            linhas[indice] = linha.split(" Item: ")[0]
+    return "\n".join(linhas)
+
+
+def _truncar(texto):
+    """Corta o relatório no meio do último item, sem a linha final e sem os totais do fim."""
+    return texto[:texto.rfind(" Item: ") + 4]
+
+
+@pytest.mark.parametrize("texto", [
+    gerar_texto_relatorio_movimentacao(num_notas=150, itens_por_nota=3, semente=7),
+    _deformar(gerar_texto_relatorio_movimentacao(num_notas=150, itens_por_nota=3, semente=8)),
+    _truncar(gerar_texto_relatorio_movimentacao(num_notas=60, itens_por_nota=2, semente=9)),
+    _truncar(gerar_texto_relatorio_movimentacao(num_notas=60, itens_por_nota=2, semente=9)).rsplit("\n", 3)[0] + "\n",
+], ids=["corpus", "deformado", "truncado", "truncado_apos_cabecalho"])
+def test_varredor_igual_ao_analisador_por_regex(texto):
+    esperado = analisar_relatorio_movimentacao_regex(texto, "mov.pdf")
+    assert esperado
+    assert analisar_relatorio_movimentacao(texto, "mov.pdf") == esperado
+
+
+def _tabela_do_texto_inteiro(texto, nome_arquivo_origem):
+    construtor = ConstrutorMovimentacoes(nome_arquivo_origem)
+    for inicio, fim in _localizar_blocos(texto):
+        cabecalho, itens_encontrados = _varrer_bloco(texto[inicio:fim])
+        if itens_encontrados:
+            construtor.adicionar_nota(cabecalho, itens_encontrados)
+    return construtor.montar_tabela()
+
+
+def _registros(tabela):
+    return tabela.astype(str).to_dict('records')
+
+
+def _em_pedacos(texto, tamanho):
+    return [texto[inicio:inicio + tamanho] for inicio in range(0, len(texto), tamanho)]
+
+
+@pytest.mark.parametrize("dividir", [
+    # Páginas de 7 linhas: cada nota de 11 linhas atravessa ao menos uma quebra de página
+    lambda: list(iterar_textos_paginas_movimentacao(num_notas=80, itens_por_nota=3, semente=5, linhas_por_pagina=7)),
+    # Cortes no meio das linhas e das palavras ('No|ta', 'Total do| Dia')
+    lambda: _em_pedacos(gerar_texto_relatorio_movimentacao(num_notas=80, itens_por_nota=3, semente=5, linhas_por_pagina=7), 97),
+], ids=["paginas", "pedacos"])
+def test_lotes_iguais_a_analise_do_texto_inteiro(dividir):
+    paginas = dividir()
+    texto = "".join(paginas)
+    assert any("Nota" in pagina and "Forma Pagto" not in pagina for pagina in paginas)
+    lotes = list(iterar_lotes_movimentacao(paginas, "mov.pdf", tamanho_lote=10))
+    assert len(lotes) > 1
+    tabela = concatenar_tabelas_movimentacoes([lote.montar_tabela() for lote in lotes])
+    assert _registros(tabela) == _registros(_tabela_do_texto_inteiro(texto, "mov.pdf"))
+    assert len(tabela) == len(analisar_relatorio_movimentacao_regex(texto, "mov.pdf"))
+
+
+@pytest.mark.parametrize("num_processos", [1, 2])
+def test_pdf_dividido_em_lotes_de_uma_pagina(tmp_path, num_processos):
+    caminho_pdf = str(gerar_pdf_movimentacao(tmp_path / "Relatorio_mov.pdf", num_notas=40, itens_por_nota=3,
+                                             semente=11, linhas_por_pagina=7))
+    tabela = orquestrar_extracao_movimentacoes([caminho_pdf], num_processos=num_processos, paginas_por_lote=1)
+    esperado = _tabela_do_texto_inteiro(_extrair_texto_paginas(caminho_pdf), "Relatorio_mov.pdf")
+    assert len(esperado) == 120
+    assert _registros(tabela) == _registros(esperado)
@@ -0,0 +1,22 @@
+import requests
+
+from config import SHEETS_CONEXOES_HTTP
+from sessao_planilha_module import SessaoPlanilhas
+
+
+class ClienteGspread5:
+    """Cliente como o do gspread 5: a sessão HTTP fica direto no cliente, sem 'http_client'."""
+
+    def __init__(self):
+        self.session = requests.Session()
+
+
+def test_pool_de_conexoes_montado_tambem_no_gspread_5():
+    cliente = SessaoPlanilhas(ClienteGspread5, caminho_chaves=None).cliente()
+    assert cliente.session.get_adapter('https://sheets.googleapis.com')._pool_maxsize == SHEETS_CONEXOES_HTTP
+
+
+def test_cliente_sem_sessao_http_nao_impede_a_autenticacao():
+    sessao = SessaoPlanilhas(object, caminho_chaves=None)
+    assert sessao.cliente() is sessao.cliente()
+    assert sessao.estatisticas['autenticacoes'] == 1